@@ -0,0 +1,20 @@
+# core/aggregates.py
+from django.contrib.postgres.fields import ArrayField
+from django.db.models import Aggregate, FloatField
+
+
+class PercentileCont(Aggregate):
+    """
+    PostgreSQL's PERCENTILE_CONT for several fractions at once. A single sort of
+    each group returns the interpolated values as a list ordered like ``fractions``.
+    """
+    function = 'PERCENTILE_CONT'
+    template = '%(function)s(%(fractions)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+
+    def __init__(self, expression, fractions, **extra):
+        fractions = [float(fraction) for fraction in fractions]
+        if not fractions or not all(0 <= fraction <= 1 for fraction in fractions):
+            raise ValueError('Percentile fractions must be between 0 and 1')
+        # Validated floats, so they can be inlined into the SQL
+        array = f"ARRAY[{', '.join(repr(fraction) for fraction in fractions)}]::float8[]"
+        super().__init__(expression, fractions=array, output_field=ArrayField(FloatField()), **extra)
@@ -0,0 +1,166 @@
+# core/analytics.py
+from django.db.models import Count, Avg, Sum, Q, FloatField, Min, Max, F
+from django.db.models.functions import Coalesce, Floor
+from rest_framework.response import Response
+
+from .aggregates import PercentileCont
+from .instrumentation import timed_serialization
+from .models import Department, Performance, CurrentSalary
+from .serializers import DepartmentAnalyticsSerializer
+
+SALARY_PERCENTILES = (0.25, 0.5, 0.75, 0.9)
+HISTOGRAM_MAX_BUCKETS = 1000
+
+
+# Each query function below runs exactly one query and returns evaluated rows, so
+# the async views can run several of them concurrently in separate threads.
+
+def department_salary_distribution():
+    """Departments annotated with headcount, average, min/max and percentile salaries."""
+    # Employees and their latest salaries are one-to-one, so the join does not multiply rows
+    amount = 'employees__latest_salary__amount'
+    return list(Department.objects.annotate(
+        employee_count=Count('employees'),
+        average_salary=Coalesce(Avg(amount), 0, output_field=FloatField()),
+        min_salary=Min(amount),
+        max_salary=Max(amount),
+        salary_percentiles=PercentileCont(amount, SALARY_PERCENTILES),
+    ))
+
+
+def salary_histograms(bucket_width):
+    """Return {department id: {bucket number: employee count}} of current salaries."""
+    histograms = {}
+    buckets = CurrentSalary.objects.annotate(
+        bucket=Floor(F('amount') / bucket_width)
+    ).values('employee__department_id', 'bucket').annotate(count=Count('pk')).order_by()
+    for row in buckets:
+        histograms.setdefault(row['employee__department_id'], {})[int(row['bucket'])] = row['count']
+    return histograms
+
+
+def department_headcounts(departments):
+    """``departments`` annotated with headcount, average current salary and total bonus."""
+    return list(departments.annotate(
+        employee_count=Count('employees'),
+        # Employees and their latest salaries are one-to-one, so the join does not multiply rows
+        salaried_employees=Count('employees__latest_salary'),
+        average_salary=Avg('employees__latest_salary__amount'),
+        total_bonus=Sum('employees__latest_salary__bonus'),
+    ).order_by('id'))
+
+
+def attendance_by_department(rollup):
+    """Return {department id: {status: count}} from an attendance rollup queryset."""
+    attendance = {}
+    for row in rollup.filter(count__gt=0).values('department_id', 'status').annotate(
+            count=Sum('count')).order_by():
+        attendance.setdefault(row['department_id'], {})[row['status']] = row['count']
+    return attendance
+
+
+def performance_by_department():
+    """Return {department id: average rating, goals met percentage and review count}."""
+    return {
+        row['employee__department_id']: row
+        for row in Performance.objects.values('employee__department_id').annotate(
+            average_rating=Avg('rating'),
+            goals_met_percentage=Count('id', filter=Q(goals_met=True)) * 100.0 / Count('id'),
+            review_count=Count('id'),
+        ).order_by()
+    }
+
+
+def current_salary_stats():
+    return CurrentSalary.objects.aggregate(
+        average_salary=Avg('amount'),
+        min_salary=Min('amount'),
+        max_salary=Max('amount'),
+        total_bonus_paid=Sum('total_bonus')
+    )
+
+
+def build_salary_analytics(bucket_width, departments, histograms):
+    if any(max(counts) - min(counts) >= HISTOGRAM_MAX_BUCKETS for counts in histograms.values()):
+        raise ValueError(f"bucket_width is too small, histograms are limited to {HISTOGRAM_MAX_BUCKETS} buckets")
+
+    for department in departments:
+        percentiles = department.salary_percentiles or [None] * len(SALARY_PERCENTILES)
+        department.p25_salary, department.median_salary, department.p75_salary, department.p90_salary = (
+            percentiles
+        )
+        counts = histograms.get(department.id, {})
+        # Empty buckets between the lowest and highest salary are listed with a zero count
+        department.salary_histogram = [
+            {
+                'min_salary': bucket * bucket_width,
+                'max_salary': (bucket + 1) * bucket_width,
+                'count': counts.get(bucket, 0),
+            }
+            for bucket in (range(min(counts), max(counts) + 1) if counts else ())
+        ]
+    with timed_serialization():
+        return DepartmentAnalyticsSerializer(departments, many=True).data
+
+
+def department_attendance_summary(rollup):
+    """Non-zero attendance counts per status of an attendance rollup queryset."""
+    return list(rollup.filter(count__gt=0).values('status').annotate(count=Sum('count')).order_by('status'))
+
+
+def department_performance_summary(department_id):
+    return list(Performance.objects.filter(
+        employee__department_id=department_id
+    ).values('employee__department__name').annotate(
+        average_rating=Avg('rating'),
+        goals_met_percentage=Count('id', filter=Q(goals_met=True)) * 100.0 / Count('id'),
+        review_count=Count('id'),
+    ))
+
+
+def department_salary_summary(department_id):
+    return list(CurrentSalary.objects.filter(
+        employee__department_id=department_id
+    ).values('employee__department__name').annotate(
+        average_salary=Avg('amount'),
+        total_employees=Count('employee'),
+        total_bonus=Sum('bonus'),
+    ))
+
+
+def build_dashboard(departments, attendance, performance):
+    dashboard = []
+    for department in departments:
+        reviews = performance.get(department.id, {})
+        dashboard.append({
+            'id': department.id,
+            'name': department.name,
+            'location': department.location,
+            'employee_count': department.employee_count,
+            'salary': {
+                'average_salary': department.average_salary,
+                'total_employees': department.salaried_employees,
+                'total_bonus': department.total_bonus,
+            },
+            'attendance': attendance.get(department.id, {}),
+            'performance': {
+                'average_rating': reviews.get('average_rating'),
+                'goals_met_percentage': reviews.get('goals_met_percentage'),
+                'review_count': reviews.get('review_count', 0),
+            },
+        })
+    return dashboard
+
+
+def run_plan(plan, request):
+    """
+    Answer an action from its plan_<action> method, which validates the request and
+    returns (queries, combine): independent (function, *args) queries and a function
+    combining their results into the response data. The queries run one after the
+    other here; core.async_views runs them concurrently. ValueErrors become 400s.
+    """
+    try:
+        queries, combine = plan(request)
+        return Response(combine(*[func(*args) for func, *args in queries]))
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=400)
@@ -0,0 +1,112 @@
+# core/async_views.py
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.urls import path
+from rest_framework.exceptions import MethodNotAllowed
+from rest_framework.response import Response
+
+from .cache import lookup_cached, store_cached
+
+
+def _run_query(func, *args):
+    try:
+        return func(*args)
+    finally:
+        # Worker threads are not request threads, so release their connection the
+        # way request_finished would (kept open while CONN_MAX_AGE allows)
+        close_old_connections()
+
+
+async def run_concurrently(queries):
+    """
+    Run each (function, *args) of ``queries`` in its own worker thread, and so on
+    its own database connection, and return their results in order.
+    """
+    return await asyncio.gather(*(
+        sync_to_async(_run_query, thread_sensitive=False)(*query) for query in queries
+    ))
+
+
+def async_analytics_view(viewset, basename, name, **initkwargs):
+    """
+    Async view serving action ``name`` of ``viewset`` from its plan_<name> method.
+    Authentication, permissions, throttling, conditional GET and the analytics
+    cache go through the viewset as for the sync action; the independent queries
+    of the plan then run concurrently instead of one after the other.
+    ``initkwargs`` override viewset attributes like as_view()'s.
+    """
+    cached_models = getattr(getattr(viewset, name), 'cached_models', None)
+
+    def finalize(view, request, response):
+        response = view.finalize_response(request, response)
+        # Render in the worker thread; 304s from the conditional GET check are plain responses
+        return response.render() if isinstance(response, Response) else response
+
+    def prepare(request, kwargs):
+        """Return (view, request, cache key, queries, combine), or the final response."""
+        view = viewset(
+            basename=basename, action_map={'get': name, 'head': name}, format_kwarg=None, **initkwargs
+        )
+        view.args, view.kwargs = (), kwargs
+        view.request = request
+        request = view.initialize_request(request, **kwargs)
+        view.request = request
+        view.headers = view.default_response_headers
+        try:
+            if request.method.lower() not in view.action_map:
+                raise MethodNotAllowed(request.method)
+            view.initial(request, **kwargs)
+            key = None
+            if cached_models is not None:
+                key, data = lookup_cached(view, request, name, cached_models, kwargs)
+                if data is not None:
+                    return finalize(view, request, Response(data))
+            queries, combine = getattr(view, f'plan_{name}')(request)
+            if len(queries) < 2:
+                # Nothing to overlap, so skip the extra thread hops
+                return complete(view, request, key, combine, [func(*args) for func, *args in queries])
+        except ValueError as exc:
+            return finalize(view, request, Response({"error": str(exc)}, status=400))
+        except Exception as exc:
+            return finalize(view, request, view.handle_exception(exc))
+        return view, request, key, queries, combine
+
+    def complete(view, request, key, combine, results):
+        try:
+            response = Response(combine(*results))
+        except ValueError as exc:
+            response = Response({"error": str(exc)}, status=400)
+        if key is not None:
+            store_cached(key, response)
+        return finalize(view, request, response)
+
+    async def view(request, **kwargs):
+        prepared = await sync_to_async(prepare)(request, kwargs)
+        if not isinstance(prepared, tuple):
+            return prepared
+        drf_view, drf_request, key, queries, combine = prepared
+        results = await run_concurrently(queries)
+        return await sync_to_async(complete)(drf_view, drf_request, key, combine, results)
+
+    # Like as_view()'s, so the view is labelled <ViewSet>.<action> in metrics
+    view.cls, view.actions = viewset, {'get': name, 'head': name}
+    return view
+
+
+def async_urlpatterns(router):
+    """
+    URL patterns for the async counterpart of every action of ``router`` with a
+    plan_<action> method, at <prefix>/<url path>/ and named async-<basename>-<url name>.
+    """
+    return [
+        path(
+            f'{prefix}/{extra.url_path}/',
+            async_analytics_view(viewset, basename, extra.__name__),
+            name=f'async-{basename}-{extra.url_name}'
+        )
+        for prefix, viewset, basename in router.registry
+        for extra in viewset.get_extra_actions()
+        if hasattr(viewset, f'plan_{extra.__name__}')
+    ]
@@ -0,0 +1,41 @@
+# core/bulk.py
+import csv
+import io
+
+from django.db import connection
+
+# Marker written for NULL values so that empty strings survive the CSV round trip
+COPY_NULL = '\\N'
+
+
+def copy_rows(model, fields, rows, using_connection=None):
+    """
+    Load ``rows`` (tuples ordered like ``fields``, which are attribute names such as
+    ``employee_id``) into ``model``'s table. Uses COPY on PostgreSQL and falls back
+    to bulk_create elsewhere. Returns the number of rows written.
+    """
+    conn = using_connection or connection
+    rows = list(rows)
+    if not rows:
+        return 0
+
+    if conn.vendor != 'postgresql':
+        model.objects.bulk_create([model(**dict(zip(fields, row))) for row in rows])
+        return len(rows)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([COPY_NULL if value is None else value for value in row])
+    buffer.seek(0)
+
+    columns = ', '.join(
+        conn.ops.quote_name(model._meta.get_field(field).column) for field in fields
+    )
+    with conn.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {conn.ops.quote_name(model._meta.db_table)} ({columns}) "
+            f"FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+            buffer
+        )
+    return len(rows)
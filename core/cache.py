@@ -0,0 +1,221 @@
+# core/cache.py
+import calendar
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from .metrics import record_cache_lookup
+from .models import DataVersion
+
+STATS_PREFIX = 'analytics-stats'
+
+
+def get_analytics_cache():
+    return caches[getattr(settings, 'ANALYTICS_CACHE_ALIAS', 'default')]
+
+
+def _bump(labels):
+    table = DataVersion._meta.db_table
+    now = timezone.now()
+    placeholders = ', '.join(['(%s, 1, %s)'] * len(labels))
+    params = [value for label in labels for value in (label, now)]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (label, version, updated_at) VALUES {placeholders} "
+            f"ON CONFLICT (label) DO UPDATE SET version = {table}.version + 1, updated_at = EXCLUDED.updated_at",
+            params
+        )
+
+
+def bump_data_versions(*models):
+    """
+    Increment the data version of ``models`` once the current transaction commits,
+    so readers never pair a new version with data they cannot see yet.
+    """
+    labels = sorted({model._meta.label_lower for model in models})
+    if labels:
+        transaction.on_commit(lambda: _bump(labels))
+
+
+def get_data_versions(models, request=None):
+    """
+    Return {label: (version, updated_at)} for ``models``; models never written are
+    missing. Passing the request reuses the lookup for the rest of that request.
+    """
+    labels = tuple(sorted(model._meta.label_lower for model in models))
+    memo = getattr(request, '_data_versions', None)
+    if memo is not None and labels in memo:
+        return memo[labels]
+
+    versions = {
+        label: (version, updated_at)
+        for label, version, updated_at in DataVersion.objects.filter(label__in=labels).values_list(
+            'label', 'version', 'updated_at'
+        )
+    }
+    if request is not None:
+        if memo is None:
+            memo = request._data_versions = {}
+        memo[labels] = versions
+    return versions
+
+
+def _record(endpoint, outcome):
+    record_cache_lookup(endpoint, outcome)
+    cache = get_analytics_cache()
+    key = f'{STATS_PREFIX}:{endpoint}:{outcome}'
+    # add() is a no-op when the counter exists, so concurrent first requests do not reset it
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+def get_cache_stats(endpoint):
+    cache = get_analytics_cache()
+    hits = cache.get(f'{STATS_PREFIX}:{endpoint}:hit', 0)
+    misses = cache.get(f'{STATS_PREFIX}:{endpoint}:miss', 0)
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_ratio': hits / total if total else None}
+
+
+def make_cache_key(endpoint, kwargs, query_params, versions, labels):
+    params = sorted((name, sorted(query_params.getlist(name))) for name in query_params)
+    version_part = '.'.join(str(versions.get(label, (0, None))[0]) for label in labels)
+    digest = hashlib.md5(repr((sorted(kwargs.items()), params)).encode()).hexdigest()
+    return f'analytics:{endpoint}:{version_part}:{digest}'
+
+
+def lookup_cached(view, request, name, models, kwargs):
+    """
+    Return (cache key, cached data or None) for action ``name`` of ``view``,
+    counting the hit or miss. The async views share the entries of the actions.
+    """
+    endpoint = f"{view.basename}-{name.replace('_', '-')}"
+    labels = sorted(model._meta.label_lower for model in models)
+    versions = get_data_versions(models, request)
+    key = make_cache_key(endpoint, kwargs, request.query_params, versions, labels)
+
+    data = get_analytics_cache().get(key)
+    _record(endpoint, 'miss' if data is None else 'hit')
+    return key, data
+
+
+def store_cached(key, response):
+    if response.status_code == 200:
+        data = response.data
+        if isinstance(data, QuerySet):
+            data = list(data)
+        get_analytics_cache().set(key, data)
+
+
+def cached_analytics(*models, per_department=False):
+    """
+    Cache a viewset action's response under its endpoint, URL kwargs, query
+    parameters and the data versions of ``models``. Any committed write to one of
+    those models bumps its version, so stale entries are never read again and
+    simply age out of the size-bounded analytics cache. Only 200 responses are
+    cached. ``per_department`` tells warm_analytics_cache to warm the action once
+    per ``?department=``.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, request, *args, **kwargs):
+            key, data = lookup_cached(self, request, func.__name__, models, kwargs)
+            if data is not None:
+                return Response(data)
+
+            response = func(self, request, *args, **kwargs)
+            store_cached(key, response)
+            return response
+
+        wrapper.cached_models = models
+        wrapper.warm_per_department = per_department
+        return wrapper
+    return decorator
+
+
+class NotModified(Exception):
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    ETag and Last-Modified validators for ``list``, ``retrieve``, ``export`` and the
+    cached analytics actions, derived from the data versions of the models they
+    read. The check runs after authentication and before the handler, so a
+    matching If-None-Match/If-Modified-Since is answered with 304 without
+    querying or serializing anything. Views list the models their list/detail
+    output reads in ``versioned_models``.
+    """
+    versioned_models = ()
+    conditional_actions = ('list', 'retrieve', 'export')
+
+    def get_versioned_models(self):
+        handler = getattr(self, self.action, None) if self.action else None
+        cached_models = getattr(handler, 'cached_models', None)
+        if cached_models is not None:
+            return cached_models
+        if self.action in self.conditional_actions:
+            return self.versioned_models
+        return ()
+
+    def get_validators(self, request):
+        """Return (weak ETag, Last-Modified timestamp or None), or None when the action has no validators."""
+        models = self.get_versioned_models()
+        if not models:
+            return None
+        versions = get_data_versions(models, request)
+        state = [
+            (label, *versions.get(label, (0, None)))
+            for label in sorted(model._meta.label_lower for model in models)
+        ]
+        renderer = getattr(request, 'accepted_renderer', None)
+        digest = hashlib.md5(repr((state, getattr(renderer, 'format', None))).encode()).hexdigest()
+
+        modified = [updated_at for label, version, updated_at in state if updated_at is not None]
+        last_modified = calendar.timegm(max(modified).utctimetuple()) if modified else None
+        return f'W/"{digest}"', last_modified
+
+    def set_validators(self, response):
+        etag, last_modified = self.validators
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.validators = None
+        if request.method not in ('GET', 'HEAD'):
+            return
+        self.validators = self.get_validators(request)
+        if self.validators is None:
+            return
+        etag, last_modified = self.validators
+        response = get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            self.set_validators(response)
+            raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, 'validators', None) and response.status_code == 200 and not response.has_header('ETag'):
+            self.set_validators(response)
+        return response
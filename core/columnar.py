@@ -0,0 +1,490 @@
+# core/columnar.py
+import threading
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import connections, router
+from django.utils import timezone
+
+from .cache import get_data_versions
+from .models import Attendance, CurrentSalary, Employee, Salary
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the aggregate actions answer 503 without it
+    np = None
+
+STATUS_CODES = [code for code, _ in Attendance.STATUS_CHOICES]
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+EPOCH = date(1970, 1, 1)
+# Marks missing clock times, departments and positions
+MISSING = -1
+# Attendance ids read per COPY during a full load
+LOAD_BATCH_SIZE = 500000
+AGGREGATE_MAX_GROUPS = 10000
+# Keys spanning at most this many values are grouped by counting instead of sorting
+DENSE_KEY_RANGE = 1 << 24
+SALARY_BAND_DEFAULT_WIDTH = 10000
+
+ATTENDANCE_DIMENSIONS = (
+    'department', 'position', 'employee', 'hire_year', 'hire_month', 'salary_band',
+    'year', 'month', 'weekday', 'status',
+)
+SALARY_DIMENSIONS = ('department', 'position', 'hire_year', 'hire_month', 'salary_band')
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+class ColumnarUnavailable(Exception):
+    pass
+
+
+def epoch_days(day):
+    return (day - EPOCH).days
+
+
+def from_epoch_days(days):
+    return EPOCH + timedelta(days=int(days))
+
+
+class Snapshot:
+    """
+    Attendance and current salaries as NumPy columns. ``attendance`` has one entry
+    per row: employee id (int32), days since 1970-01-01 (int32), index into
+    STATUS_CODES (int8) and clock in/out in minutes after midnight (int16, -1 when
+    missing). ``employees`` is indexed by employee id: department id, index into
+    ``positions``, hire date in days, is_active, current salary and total bonus
+    (NaN without a salary). Snapshots are never modified, refreshes build new ones.
+    """
+
+    def __init__(self, attendance, employees, positions, versions, max_id, watermark, previous=None):
+        self.attendance = attendance
+        self.employees = employees
+        self.positions = positions
+        self.versions = versions
+        # Highest attendance id and latest date loaded; a refresh reads the rows above either
+        self.max_id = max_id
+        self.watermark = watermark
+        self.refreshed = timezone.now()
+        # Time of the last full load: now, or that of the snapshot this one refreshes
+        if previous is None:
+            self.full_refreshed, self.full_refreshed_monotonic = self.refreshed, time.monotonic()
+        else:
+            self.full_refreshed = previous.full_refreshed
+            self.full_refreshed_monotonic = previous.full_refreshed_monotonic
+
+    @property
+    def rows(self):
+        return len(self.attendance['employee'])
+
+    def memory(self):
+        """Bytes per column, as {'attendance.<column>': ..., 'employees.<column>': ...}."""
+        return {
+            f'{table}.{name}': int(column.nbytes)
+            for table, columns in (('attendance', self.attendance), ('employees', self.employees))
+            for name, column in columns.items()
+        }
+
+    def describe(self):
+        memory = self.memory()
+        return {
+            'attendance_rows': self.rows,
+            'employees': int(np.count_nonzero(self.employees['department'] != MISSING)),
+            'refreshed_at': self.refreshed,
+            'full_refresh_at': self.full_refreshed,
+            'attendance_through': from_epoch_days(self.watermark) if self.rows else None,
+            'memory_bytes': memory,
+            'total_memory_bytes': sum(memory.values()),
+        }
+
+
+def _read_connection():
+    return connections[router.db_for_read(Attendance)]
+
+
+def _copy_columns(sql, params, count):
+    """Run ``sql`` selecting ``count`` integer columns through COPY; return a (rows, count) int64 array."""
+    conn = _read_connection()
+    with conn.cursor() as cursor:
+        query = cursor.mogrify(sql, params).decode()
+        buffer = _CopyBuffer()
+        cursor.copy_expert(f"COPY ({query}) TO STDOUT", buffer)
+    values = np.fromstring(buffer.getvalue(), dtype=np.int64, sep=' ')
+    return values.reshape(-1, count)
+
+
+class _CopyBuffer:
+    """Write target of copy_expert that joins the chunks only once."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(data if isinstance(data, str) else data.decode())
+
+    def getvalue(self):
+        return ''.join(self.chunks)
+
+
+def _attendance_sql(where):
+    table = Attendance._meta.db_table
+
+    def minutes(column):
+        return f"COALESCE((EXTRACT(HOUR FROM {column}) * 60 + EXTRACT(MINUTE FROM {column}))::int, {MISSING})"
+
+    return (
+        f"SELECT employee_id, date - DATE '{EPOCH}', "
+        f"COALESCE(array_position(%(statuses)s::text[], status::text) - 1, {MISSING}), "
+        f"{minutes('clock_in')}, {minutes('clock_out')} "
+        f"FROM {table} WHERE {where}"
+    )
+
+
+def _attendance_columns(rows):
+    return {
+        'employee': rows[:, 0].astype(np.int32),
+        'date': rows[:, 1].astype(np.int32),
+        'status': rows[:, 2].astype(np.int8),
+        'clock_in': rows[:, 3].astype(np.int16),
+        'clock_out': rows[:, 4].astype(np.int16),
+    }
+
+
+def _concat(parts):
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+
+def load_attendance():
+    """Return (columns, highest id, latest date in days) of the whole attendance table."""
+    conn = _read_connection()
+    with conn.cursor() as cursor:
+        cursor.execute(f"SELECT MIN(id), MAX(id) FROM {Attendance._meta.db_table}")
+        first, last = cursor.fetchone()
+    parts = [_attendance_columns(np.empty((0, 5), dtype=np.int64))]
+    if first is not None:
+        # No batch reads past the highest id read first, which a refresh would read again
+        for start in range(first - 1, last, LOAD_BATCH_SIZE):
+            rows = _copy_columns(
+                _attendance_sql("id > %(start)s AND id <= %(end)s"),
+                {'statuses': STATUS_CODES, 'start': start, 'end': min(start + LOAD_BATCH_SIZE, last)}, 5
+            )
+            parts.append(_attendance_columns(rows))
+    columns = _concat(parts)
+    return columns, last or 0, int(columns['date'].max()) if len(columns['date']) else 0
+
+
+def refresh_attendance(snapshot):
+    """
+    Return (columns, highest id, latest date) of ``snapshot``'s attendance plus the
+    rows with a higher id or a date on or after its latest date, which are re-read
+    in full so their edits and deletions are picked up. Edits of older rows wait
+    for the next full load.
+    """
+    conn = _read_connection()
+    with conn.cursor() as cursor:
+        cursor.execute(f"SELECT MAX(id) FROM {Attendance._meta.db_table}")
+        last = max(cursor.fetchone()[0] or 0, snapshot.max_id)
+    # Only rows up to the id read first: rows committed meanwhile have higher ids
+    # and are read by the next refresh instead of being marked as loaded
+    rows = _copy_columns(
+        _attendance_sql("(id > %(max_id)s OR date >= %(watermark)s) AND id <= %(last)s"),
+        {'statuses': STATUS_CODES, 'max_id': snapshot.max_id, 'last': last,
+         'watermark': from_epoch_days(snapshot.watermark)}, 5
+    )
+    keep = snapshot.attendance['date'] < snapshot.watermark
+    kept = {name: column[keep] for name, column in snapshot.attendance.items()}
+    fresh = _attendance_columns(rows)
+    watermark = max(snapshot.watermark, int(fresh['date'].max())) if len(fresh['date']) else snapshot.watermark
+    return _concat([kept, fresh]), last, watermark
+
+
+def load_employees():
+    """Return (columns indexed by employee id, position labels)."""
+    rows = list(Employee.objects.values_list('id', 'department_id', 'position', 'hire_date', 'is_active'))
+    size = max((row[0] for row in rows), default=-1) + 1
+    positions = sorted({row[2] for row in rows})
+    position_codes = {position: code for code, position in enumerate(positions)}
+    columns = {
+        'department': np.full(size, MISSING, dtype=np.int32),
+        'position': np.full(size, MISSING, dtype=np.int16),
+        'hire_date': np.zeros(size, dtype=np.int32),
+        'is_active': np.zeros(size, dtype=bool),
+        'salary': np.full(size, np.nan),
+        'total_bonus': np.full(size, np.nan),
+    }
+    if rows:
+        ids = np.array([row[0] for row in rows])
+        columns['department'][ids] = [row[1] for row in rows]
+        columns['position'][ids] = [position_codes[row[2]] for row in rows]
+        columns['hire_date'][ids] = [epoch_days(row[3]) for row in rows]
+        columns['is_active'][ids] = [row[4] for row in rows]
+    salaries = list(CurrentSalary.objects.filter(employee_id__lt=size).values_list(
+        'employee_id', 'amount', 'total_bonus'
+    ))
+    if salaries:
+        ids = np.array([row[0] for row in salaries])
+        columns['salary'][ids] = [float(row[1]) for row in salaries]
+        columns['total_bonus'][ids] = [float(row[2]) for row in salaries]
+    return columns, positions
+
+
+def get_snapshot():
+    """
+    Return the process's snapshot, refreshed first when attendance, employees or
+    salaries changed: new and recent attendance rows are read incrementally, the
+    employee columns in full. Everything is reloaded every
+    COLUMNAR_FULL_REFRESH_SECONDS.
+    """
+    global _snapshot
+    if np is None:
+        raise ColumnarUnavailable('Columnar analytics needs NumPy, install it with pip install numpy')
+    with _lock:
+        current = _snapshot
+        versions = get_data_versions((Attendance, Employee, Salary))
+        if current is not None and versions == current.versions:
+            return current
+
+        full = current is None or (
+            time.monotonic() - current.full_refreshed_monotonic >= settings.COLUMNAR_FULL_REFRESH_SECONDS
+        )
+        if full:
+            attendance, max_id, watermark = load_attendance()
+            employees, positions = load_employees()
+        else:
+            if versions.get(Attendance._meta.label_lower) != current.versions.get(Attendance._meta.label_lower):
+                attendance, max_id, watermark = refresh_attendance(current)
+            else:
+                attendance, max_id, watermark = current.attendance, current.max_id, current.watermark
+            if any(versions.get(model._meta.label_lower) != current.versions.get(model._meta.label_lower)
+                   for model in (Employee, Salary)):
+                employees, positions = load_employees()
+            else:
+                employees, positions = current.employees, current.positions
+
+        _snapshot = Snapshot(
+            attendance, employees, positions, versions, max_id, watermark, None if full else current
+        )
+        return _snapshot
+
+
+def forget_snapshot():
+    global _snapshot
+    with _lock:
+        _snapshot = None
+
+
+def _years(days):
+    return days.astype('datetime64[D]').astype('datetime64[Y]').astype(np.int64) + 1970
+
+
+def _months(days):
+    """Months since January 1970."""
+    return days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+
+def _salary_bands(salaries, band_width):
+    bands = np.full(len(salaries), MISSING, dtype=np.int64)
+    known = ~np.isnan(salaries)
+    bands[known] = np.floor(salaries[known] / band_width)
+    return bands
+
+
+def _employee_keys(name, snapshot, employee_ids, band_width):
+    employees = snapshot.employees
+    if name == 'department':
+        return employees['department'][employee_ids]
+    if name == 'position':
+        return employees['position'][employee_ids]
+    if name == 'employee':
+        return employee_ids
+    if name == 'hire_year':
+        return _years(employees['hire_date'][employee_ids])
+    if name == 'hire_month':
+        return _months(employees['hire_date'][employee_ids])
+    return _salary_bands(employees['salary'][employee_ids], band_width)
+
+
+def _label(name, key, snapshot, band_width):
+    key = int(key)
+    if key == MISSING and name in ('department', 'position', 'salary_band', 'status'):
+        return None
+    if name == 'position':
+        return snapshot.positions[key]
+    if name in ('hire_month', 'month'):
+        return str(np.datetime64(key, 'M'))
+    if name == 'salary_band':
+        return key * band_width
+    if name == 'weekday':
+        return WEEKDAYS[key]
+    if name == 'status':
+        return STATUS_CODES[key]
+    return key
+
+
+def _codes(keys):
+    """Return (code per row, sorted distinct keys), in linear time for keys in a small range."""
+    if not len(keys):
+        return np.zeros(0, dtype=np.intp), keys
+    low, high = int(keys.min()), int(keys.max())
+    if high - low > DENSE_KEY_RANGE:
+        distinct, codes = np.unique(keys, return_inverse=True)
+        return codes, distinct
+    shifted = (keys - low).astype(np.intp)
+    present = np.bincount(shifted, minlength=high - low + 1) > 0
+    return (np.cumsum(present) - 1)[shifted], np.flatnonzero(present) + low
+
+
+def _group(keys, rows):
+    """Return (group per row, number of groups, [key of each group per dimension])."""
+    if not keys:
+        return np.zeros(rows, dtype=np.intp), 1 if rows else 0, []
+    codes, distinct = zip(*[_codes(key) for key in keys])
+    shape = [max(len(values), 1) for values in distinct]
+    if np.prod(shape, dtype=float) > 2 ** 62:
+        raise ValueError(f"Too many groups, aggregates are limited to {AGGREGATE_MAX_GROUPS} groups")
+    combined, groups = _codes(np.ravel_multi_index(codes, shape) if rows else np.zeros(0, dtype=np.intp))
+    if len(groups) > AGGREGATE_MAX_GROUPS:
+        raise ValueError(f"Too many groups, aggregates are limited to {AGGREGATE_MAX_GROUPS} groups; add filters")
+    group_keys = [values[dimension_codes] for values, dimension_codes in zip(distinct, np.unravel_index(groups, shape))]
+    return combined, len(groups), group_keys
+
+
+def _employee_mask(snapshot, department=None, position=None, is_active=None):
+    employees = snapshot.employees
+    mask = employees['department'] != MISSING
+    if department is not None:
+        mask &= employees['department'] == department
+    if position is not None:
+        code = snapshot.positions.index(position) if position in snapshot.positions else -2
+        mask &= employees['position'] == code
+    if is_active is not None:
+        mask &= employees['is_active'] == is_active
+    return mask
+
+
+def _mean(sums, counts):
+    return [round(float(total) / count, 2) if count else None for total, count in zip(sums, counts)]
+
+
+def _results(group_by, group_keys, snapshot, band_width, metrics):
+    """Rows of {dimension: label, ..., metric: value} per group."""
+    results = []
+    for index in range(len(next(iter(metrics.values())))):
+        row = {
+            name: _label(name, keys[index], snapshot, band_width) for name, keys in zip(group_by, group_keys)
+        }
+        row.update({metric: values[index] for metric, values in metrics.items()})
+        results.append(row)
+    return results
+
+
+def aggregate_attendance(snapshot, group_by, department=None, position=None, is_active=None,
+                         status=None, start=None, end=None, band_width=SALARY_BAND_DEFAULT_WIDTH):
+    """
+    Attendance day counts, status rates and average clock times per combination
+    of the ``group_by`` dimensions (ATTENDANCE_DIMENSIONS) of the matching rows.
+    Raises ValueError for more than AGGREGATE_MAX_GROUPS groups.
+    """
+    attendance = snapshot.attendance
+    employee_ids = attendance['employee']
+    mask = employee_ids < len(snapshot.employees['department'])
+    if start is not None:
+        mask &= attendance['date'] >= epoch_days(start)
+    if end is not None:
+        mask &= attendance['date'] <= epoch_days(end)
+    if status is not None:
+        mask &= attendance['status'] == STATUS_CODES.index(status)
+    selected = np.flatnonzero(mask)
+    selected = selected[_employee_mask(snapshot, department, position, is_active)[employee_ids[selected]]]
+
+    employee_ids = employee_ids[selected]
+    days, statuses = attendance['date'][selected], attendance['status'][selected]
+    clock_in, clock_out = attendance['clock_in'][selected], attendance['clock_out'][selected]
+    keys = []
+    for name in group_by:
+        if name == 'year':
+            keys.append(_years(days))
+        elif name == 'month':
+            keys.append(_months(days))
+        elif name == 'weekday':
+            # 1970-01-01 was a Thursday
+            keys.append((days.astype(np.int64) + 3) % 7)
+        elif name == 'status':
+            keys.append(statuses.astype(np.int64))
+        else:
+            keys.append(_employee_keys(name, snapshot, employee_ids, band_width))
+    groups, count, group_keys = _group(keys, len(selected))
+
+    total = np.bincount(groups, minlength=count)
+    known = statuses >= 0
+    by_status = np.bincount(
+        groups[known] * len(STATUS_CODES) + statuses[known], minlength=count * len(STATUS_CODES)
+    ).reshape(count, len(STATUS_CODES))
+    present, absent, late = (by_status[:, STATUS_CODES.index(code)] for code in ('present', 'absent', 'late'))
+    clocked_in = clock_in >= 0
+    clocked = clocked_in & (clock_out >= 0)
+    metrics = {
+        'total_days': total.tolist(),
+        'present_count': present.tolist(),
+        'absent_count': absent.tolist(),
+        'late_count': late.tolist(),
+        'attendance_rate': _mean(present * 100.0, total),
+        'late_rate': _mean(late * 100.0, total),
+        'absence_rate': _mean(absent * 100.0, total),
+        'average_clock_in_minutes': _mean(
+            np.bincount(groups[clocked_in], weights=clock_in[clocked_in], minlength=count),
+            np.bincount(groups[clocked_in], minlength=count),
+        ),
+        'average_hours': _mean(
+            np.bincount(groups[clocked], weights=(clock_out[clocked] - clock_in[clocked]) / 60, minlength=count),
+            np.bincount(groups[clocked], minlength=count),
+        ),
+    }
+    return {
+        'group_by': group_by,
+        'rows': len(selected),
+        'results': _results(group_by, group_keys, snapshot, band_width, metrics),
+    }
+
+
+def aggregate_salaries(snapshot, group_by, department=None, position=None, is_active=None,
+                       band_width=SALARY_BAND_DEFAULT_WIDTH):
+    """
+    Headcount and current salary statistics per combination of the ``group_by``
+    dimensions (SALARY_DIMENSIONS) of the matching employees with a salary.
+    Raises ValueError for more than AGGREGATE_MAX_GROUPS groups.
+    """
+    employees = snapshot.employees
+    mask = _employee_mask(snapshot, department, position, is_active) & ~np.isnan(employees['salary'])
+    employee_ids = np.flatnonzero(mask)
+    keys = [_employee_keys(name, snapshot, employee_ids, band_width) for name in group_by]
+    groups, count, group_keys = _group(keys, len(employee_ids))
+
+    salaries = employees['salary'][employee_ids]
+    # Salaries sorted by group, then amount: each group is a run starting at ``starts``
+    order = np.lexsort((salaries, groups))
+    ordered = salaries[order]
+    sizes = np.bincount(groups, minlength=count)
+    starts = np.cumsum(sizes) - sizes
+    last = starts + sizes - 1
+    metrics = {
+        'employee_count': sizes.tolist(),
+        'average_salary': _mean(np.bincount(groups, weights=salaries, minlength=count), sizes),
+        'min_salary': [round(float(value), 2) for value in ordered[starts]] if len(ordered) else [],
+        'max_salary': [round(float(value), 2) for value in ordered[last]] if len(ordered) else [],
+        'median_salary': [
+            round(float(low + high) / 2, 2)
+            for low, high in zip(ordered[starts + (sizes - 1) // 2], ordered[starts + sizes // 2])
+        ] if len(ordered) else [],
+        'total_bonus': [
+            round(float(value), 2)
+            for value in np.bincount(groups, weights=employees['total_bonus'][employee_ids], minlength=count)
+        ],
+    }
+    return {
+        'group_by': group_by,
+        'rows': len(employee_ids),
+        'results': _results(group_by, group_keys, snapshot, band_width, metrics),
+    }
@@ -0,0 +1,158 @@
+# core/db_router.py
+import hashlib
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+# Only the API's own tables are read from the replica; sessions and users stay on
+# the primary so a fresh login is never missing from a lagging replica
+REPLICA_APPS = {'core'}
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+STICKY_PREFIX = 'replica-sticky'
+
+# Routing state of the current request. Context variables follow the request into
+# sync_to_async threads, so the async views' queries are routed the same way.
+_state = ContextVar('replica_state', default=None)
+# time.monotonic() until which this process keeps reads off a failed replica
+_replica_down_until = 0.0
+# time.monotonic() until which a successful connection check is trusted
+_replica_up_until = 0.0
+
+
+class ReplicaState:
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+def replica_configured():
+    return settings.REPLICA_DATABASE_ALIAS in settings.DATABASES
+
+
+def using_replica():
+    """Whether reads of the current request go to the replica."""
+    state = _state.get()
+    return state is not None and state.use_replica
+
+
+def replica_available(fresh=False):
+    """
+    Connect to the replica unless it failed within the last REPLICA_RETRY_SECONDS.
+    A failed connection keeps reads of this process on the primary until then; a
+    successful one is trusted for REPLICA_CHECK_SECONDS, unless ``fresh``.
+    """
+    global _replica_down_until, _replica_up_until
+    now = time.monotonic()
+    if now < _replica_down_until:
+        return False
+    if not fresh and now < _replica_up_until:
+        return True
+    alias = settings.REPLICA_DATABASE_ALIAS
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError as exc:
+        _replica_down_until = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+        _replica_up_until = 0.0
+        logger.warning('Database replica %r is unavailable, reading from the primary: %s', alias, exc)
+        return False
+    _replica_up_until = time.monotonic() + settings.REPLICA_CHECK_SECONDS
+    return True
+
+
+def sticky_key(request):
+    """Cache key of the client sending ``request``: its credentials, session or address."""
+    identity = (
+        request.META.get('HTTP_AUTHORIZATION')
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        or request.META.get('REMOTE_ADDR', '')
+    )
+    return f"{STICKY_PREFIX}:{hashlib.sha256(identity.encode()).hexdigest()}"
+
+
+class ReplicaRouter:
+    """
+    Send reads of the core models to REPLICA_DATABASE_ALIAS while
+    ReplicaRoutingMiddleware marks the current request as read-only, and
+    everything else to the primary. A write switches the rest of the request
+    back to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in REPLICA_APPS and using_replica():
+            return settings.REPLICA_DATABASE_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+            state.use_replica = False
+        # Also for instances read from the replica, which would otherwise be saved there
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, settings.REPLICA_DATABASE_ALIAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replication brings the schema to the replica
+        if db == settings.REPLICA_DATABASE_ALIAS:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Read GET, HEAD and OPTIONS requests from the replica, unless the same client
+    wrote within the last REPLICA_STICKY_SECONDS or the replica is unavailable.
+    Requests that write mark their client so its next reads see the write. The
+    client is identified by its Authorization header, session cookie or address;
+    stickiness spans workers only when the default cache is shared. Removed from
+    the stack when no replica is configured.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not replica_configured():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def eligible(self, request):
+        return request.method in SAFE_METHODS and not cache.get(sticky_key(request))
+
+    def finish(self, request, state):
+        if state.wrote:
+            cache.set(sticky_key(request), True, settings.REPLICA_STICKY_SECONDS)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = ReplicaState(self.eligible(request) and replica_available())
+        token = _state.set(state)
+        try:
+            return self.get_response(request)
+        finally:
+            _state.reset(token)
+            self.finish(request, state)
+
+    async def __acall__(self, request):
+        state = ReplicaState(self.eligible(request) and await sync_to_async(replica_available)())
+        token = _state.set(state)
+        try:
+            return await self.get_response(request)
+        finally:
+            _state.reset(token)
+            self.finish(request, state)
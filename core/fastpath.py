@@ -0,0 +1,174 @@
+# core/fastpath.py
+from functools import lru_cache
+
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .instrumentation import timed_serialization
+
+# Model properties used as serializer sources, expressed as the columns they are built from
+PROPERTY_LOOKUPS = {
+    'full_name': (('first_name', 'last_name'), lambda first_name, last_name: f"{first_name} {last_name}"),
+}
+
+
+def _iso(value):
+    return value.isoformat()
+
+
+def _decimal(value):
+    # Values come back from NUMERIC columns already at the field's scale
+    return format(value, 'f')
+
+
+def _converter(field):
+    if isinstance(field, (serializers.DateField, serializers.TimeField)):
+        return _iso
+    if isinstance(field, serializers.DecimalField) and not field.localize and \
+            getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING):
+        return _decimal
+    if isinstance(field, (serializers.DateTimeField, serializers.DecimalField)):
+        return field.to_representation
+    return None
+
+
+class ReadPlan:
+    """
+    A serializer's output compiled into ``values()`` lookups plus a row builder.
+    ``build(row)`` turns one ``values(*plan.lookups)`` dict into the same dict the
+    serializer would have produced for the model instance.
+    """
+
+    def __init__(self, serializer_class):
+        self.lookups = []
+        self.steps = self._compile(serializer_class(), '')
+
+    def _lookup(self, path):
+        if path not in self.lookups:
+            self.lookups.append(path)
+        return path
+
+    def _compile(self, serializer, prefix):
+        steps = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            source = field.source.replace('.', '__')
+
+            if isinstance(field, serializers.BaseSerializer):
+                nested = self._compile(field, f'{prefix}{source}__')
+                steps.append((name, 'nested', (self._lookup(f'{prefix}{source}__id'), nested)))
+                continue
+
+            relation, _, attribute = source.rpartition('__')
+            if attribute in PROPERTY_LOOKUPS and relation:
+                columns, compute = PROPERTY_LOOKUPS[attribute]
+                paths = [self._lookup(f'{prefix}{relation}__{column}') for column in columns]
+                steps.append((name, 'property', (self._lookup(f'{prefix}{relation}__id'), paths, compute)))
+                continue
+
+            if isinstance(field, serializers.PrimaryKeyRelatedField):
+                steps.append((name, 'value', (self._lookup(f'{prefix}{source}'), None)))
+                continue
+
+            path = self._lookup(f'{prefix}{source}')
+            if relation:
+                # DRF leaves dotted-source fields out of the output when the relation is NULL
+                steps.append((name, 'related', (self._lookup(f'{prefix}{relation}__id'), path, _converter(field))))
+            else:
+                steps.append((name, 'value', (path, _converter(field))))
+        return steps
+
+    def _build(self, steps, row):
+        data = {}
+        for name, kind, spec in steps:
+            if kind == 'value':
+                path, convert = spec
+                value = row[path]
+                data[name] = convert(value) if convert is not None and value is not None else value
+            elif kind == 'nested':
+                pk_path, nested = spec
+                data[name] = None if row[pk_path] is None else self._build(nested, row)
+            elif kind == 'property':
+                pk_path, paths, compute = spec
+                if row[pk_path] is not None:
+                    data[name] = compute(*(row[path] for path in paths))
+            else:
+                pk_path, path, convert = spec
+                if row[pk_path] is not None:
+                    value = row[path]
+                    data[name] = convert(value) if convert is not None and value is not None else value
+        return data
+
+    def build(self, row):
+        return self._build(self.steps, row)
+
+
+@lru_cache(maxsize=None)
+def get_read_plan(serializer_class):
+    return ReadPlan(serializer_class)
+
+
+class FastReadMixin:
+    """
+    Opt-in read path for ``list`` and ``retrieve`` (``?fast=1``, or ``fast_read = True``
+    on the view) that builds responses from ``values()`` rows through a ReadPlan
+    instead of instantiating the serializer per object. The JSON is identical;
+    writes keep using the serializers. Both paths time their serialization for
+    the request instrumentation.
+    """
+    fast_read = False
+
+    def use_fast_read(self, request):
+        requested = request.query_params.get('fast')
+        if requested is None:
+            return self.fast_read
+        return requested.lower() in ('1', 'true', 'yes')
+
+    def serialize(self, instance, many=False):
+        with timed_serialization():
+            return self.get_serializer(instance, many=many).data
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if not self.use_fast_read(request):
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                return self.get_paginated_response(self.serialize(page, many=True))
+            return Response(self.serialize(queryset, many=True))
+
+        plan = get_read_plan(self.get_serializer_class())
+        rows = queryset.values(*plan.lookups)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            with timed_serialization():
+                data = [plan.build(row) for row in page]
+            return self.get_paginated_response(data)
+        with timed_serialization():
+            data = [plan.build(row) for row in rows]
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.use_fast_read(request):
+            return Response(self.serialize(self.get_object()))
+
+        plan = get_read_plan(self.get_serializer_class())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            row = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            ).values(*plan.lookups).first()
+        except (TypeError, ValueError, ValidationError):
+            # A lookup value of the wrong type, like get_object_or_404
+            raise Http404
+        if row is None:
+            raise Http404
+        # Object permissions see the values() row rather than a model instance
+        self.check_object_permissions(request, row)
+        with timed_serialization():
+            data = plan.build(row)
+        return Response(data)
@@ -0,0 +1,204 @@
+# core/ingest.py
+import codecs
+import csv
+import json
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .models import Employee, Attendance
+from .projections import apply_attendance_deltas
+from .signals import bulk_write
+
+CSV_CONTENT_TYPES = ('text/csv',)
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonlines')
+
+# Rows validated and upserted per statement
+CHUNK_SIZE = 1000
+# Only the first errors are reported in full so the response stays small
+MAX_REPORTED_ERRORS = 1000
+
+ATTENDANCE_UPDATE_FIELDS = ['clock_in', 'clock_out', 'status', 'notes']
+STATUS_VALUES = {value for value, label in Attendance.STATUS_CHOICES}
+
+
+def _decoded_lines(stream):
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    for line in stream:
+        yield decoder.decode(line)
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+def iter_records(stream, content_type):
+    """Yield (line number, record dict or None, error message or None) from a CSV or NDJSON body."""
+    if content_type in CSV_CONTENT_TYPES:
+        reader = csv.DictReader(_decoded_lines(stream))
+        for record in reader:
+            yield reader.line_num, record, None
+        return
+
+    for line_number, line in enumerate(_decoded_lines(stream), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_number, None, f'Invalid JSON: {exc}'
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, 'Expected a JSON object'
+            continue
+        yield line_number, record, None
+
+
+def request_body_stream(request):
+    """
+    Return the raw body of a DRF ``request`` as an iterable of lines, or None.
+    Chunked uploads carry no Content-Length, which DRF and Django's WSGI request
+    treat as empty, so they are read from the server's decoded input instead.
+    """
+    if request.stream is not None:
+        return request.stream
+    if 'chunked' in request.META.get('HTTP_TRANSFER_ENCODING', '').lower():
+        if 'wsgi.input' in request.META:
+            # The server decodes the chunks and ends the input after the last one
+            return iter(request.META['wsgi.input'].readline, b'')
+        # Under ASGI the Django request reads the whole spooled body
+        return request._request
+    return None
+
+
+def _clean_field(name, value, errors):
+    field = Attendance._meta.get_field(name)
+    if value in (None, ''):
+        if not field.null:
+            errors[name] = ['This field is required.']
+        return None
+    if not isinstance(value, str):
+        errors[name] = ['Expected a string.']
+        return None
+    try:
+        return field.to_python(value)
+    except (TypeError, ValueError, ValidationError) as exc:
+        errors[name] = exc.messages if isinstance(exc, ValidationError) else [str(exc)]
+        return None
+
+
+def clean_record(record):
+    """Validate one record without building a serializer. Returns (values dict, errors dict)."""
+    errors = {}
+    values = {}
+
+    employee = record.get('employee')
+    try:
+        if isinstance(employee, (bool, float)):
+            raise TypeError
+        values['employee_id'] = int(employee)
+    except (TypeError, ValueError):
+        errors['employee'] = ['A valid integer is required.']
+
+    for name in ('date', 'clock_in', 'clock_out'):
+        values[name] = _clean_field(name, record.get(name), errors)
+
+    status = record.get('status')
+    if not isinstance(status, str) or status not in STATUS_VALUES:
+        errors['status'] = [f'"{status}" is not a valid choice.']
+    values['status'] = status
+
+    notes = record.get('notes')
+    if notes is not None and not isinstance(notes, str):
+        errors['notes'] = ['Expected a string.']
+    values['notes'] = notes or ''
+    return values, errors
+
+
+def upsert_attendance_chunk(chunk):
+    """
+    Upsert a chunk of cleaned rows, keyed by (employee_id, date), and keep the
+    attendance rollup in step. Returns (number of rows upserted, {line: errors}).
+    """
+    errors = {}
+    with transaction.atomic():
+        # Locking the employees serializes concurrent uploads for the same employee:
+        # the attendance rows a chunk is about to create do not exist yet, so they
+        # cannot be locked, and two uploads would both count them as new
+        departments = dict(
+            Employee.objects.select_for_update().filter(id__in={key[0] for key in chunk})
+            .order_by('id').values_list('id', 'department_id')
+        )
+        for key, (line, values) in list(chunk.items()):
+            if key[0] not in departments:
+                errors[line] = {'employee': [f'Employee {key[0]} does not exist.']}
+                del chunk[key]
+        if not chunk:
+            return 0, errors
+
+        existing = Attendance.objects.select_for_update().filter(
+            employee_id__in={key[0] for key in chunk},
+            date__in={key[1] for key in chunk}
+        ).values_list('employee_id', 'date', 'status')
+
+        deltas = {}
+        for employee_id, day, status in existing:
+            if (employee_id, day) in chunk:
+                rollup_key = (departments[employee_id], day, status)
+                deltas[rollup_key] = deltas.get(rollup_key, 0) - 1
+        for (employee_id, day), (line, values) in chunk.items():
+            rollup_key = (departments[employee_id], day, values['status'])
+            deltas[rollup_key] = deltas.get(rollup_key, 0) + 1
+
+        Attendance.objects.bulk_create(
+            [Attendance(**values) for line, values in chunk.values()],
+            update_conflicts=True,
+            unique_fields=['employee', 'date'],
+            update_fields=ATTENDANCE_UPDATE_FIELDS,
+        )
+        apply_attendance_deltas({key: delta for key, delta in deltas.items() if delta})
+        bulk_write.send(sender=Attendance)
+
+    return len(chunk), errors
+
+
+def ingest_attendance(stream, content_type, chunk_size=CHUNK_SIZE):
+    """Validate and upsert a streamed CSV/NDJSON attendance upload, returning the per-row report."""
+    report = {'processed': 0, 'upserted': 0, 'failed': 0, 'errors': [], 'errors_truncated': False}
+
+    def record_error(line, errors):
+        report['failed'] += 1
+        if len(report['errors']) < MAX_REPORTED_ERRORS:
+            report['errors'].append({'line': line, 'errors': errors})
+        else:
+            report['errors_truncated'] = True
+
+    def flush(chunk):
+        upserted, errors = upsert_attendance_chunk(chunk)
+        report['upserted'] += upserted
+        for line, line_errors in sorted(errors.items()):
+            record_error(line, line_errors)
+        chunk.clear()
+
+    chunk = {}
+    for line, record, parse_error in iter_records(stream, content_type):
+        report['processed'] += 1
+        if parse_error:
+            record_error(line, {'non_field_errors': [parse_error]})
+            continue
+
+        values, errors = clean_record(record)
+        if errors:
+            record_error(line, errors)
+            continue
+
+        key = (values['employee_id'], values['date'])
+        if key in chunk:
+            # A single upsert statement cannot touch the same row twice; the later row wins
+            flush(chunk)
+        chunk[key] = (line, values)
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+
+    if chunk:
+        flush(chunk)
+    return report
@@ -0,0 +1,216 @@
+# core/instrumentation.py
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .metrics import observe_request
+
+logger = logging.getLogger(__name__)
+
+SQL_LOG_LENGTH = 2000
+
+# The recorder of the request being instrumented. Context variables follow the
+# request into sync_to_async threads, so queries of async views are counted too.
+_recorder = ContextVar('query_recorder', default=None)
+
+
+class QueryRecorder:
+    """Query count, total and slowest query time, serialize and render time of one request."""
+
+    def __init__(self, request, sampled):
+        self.request = request
+        self.sampled = sampled
+        self.started = time.perf_counter()
+        self.count = 0
+        self.db_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_sql = None
+        self.slow_queries = []
+        self.serialize_time = 0.0
+        self.render_time = 0.0
+        # [(start offset, duration, sql)] of every query once start_query_timeline() asks for it
+        self.timeline = None
+        self.slow_query_seconds = settings.SLOW_QUERY_MS / 1000
+        # Concurrent queries of an async view report from several threads
+        self._lock = threading.Lock()
+
+    def add(self, sql, started, elapsed):
+        with self._lock:
+            if self.timeline is not None:
+                self.timeline.append((started - self.started, elapsed, sql))
+            self.count += 1
+            self.db_time += elapsed
+            if elapsed > self.slowest_time:
+                self.slowest_time, self.slowest_sql = elapsed, sql
+            if elapsed >= self.slow_query_seconds:
+                self.slow_queries.append((elapsed, sql))
+
+    def add_serialize(self, elapsed):
+        with self._lock:
+            self.serialize_time += elapsed
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper installed on every connection; a no-op outside instrumented requests."""
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        recorder.add(sql, started, time.perf_counter() - started)
+
+
+@contextmanager
+def timed_serialization():
+    """
+    Count the enclosed block, such as ``serializer.data``, as serializer work of the
+    instrumented request; a no-op outside instrumented requests. Queries the block
+    runs, like evaluating a lazy queryset, are part of its time too.
+    """
+    recorder = _recorder.get()
+    if recorder is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.add_serialize(time.perf_counter() - started)
+
+
+def start_query_timeline(request):
+    """
+    Record every query of the current request with its start offset, reusing the
+    middleware's recorder when there is one. Returns (recorder, token); pass the
+    token to stop_query_timeline().
+    """
+    recorder, token = _recorder.get(), None
+    if recorder is None:
+        recorder = QueryRecorder(request, sampled=False)
+        token = _recorder.set(recorder)
+    recorder.timeline = []
+    return recorder, token
+
+
+def stop_query_timeline(token):
+    if token is not None:
+        _recorder.reset(token)
+
+
+def install_query_recorder(connection, **kwargs):
+    """connection_created receiver: add record_query to the connection's execute wrappers once."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    For a REQUEST_INSTRUMENTATION_SAMPLE_RATE fraction of requests, count the SQL
+    queries and time them, the slowest one, the serializers and the rendering of
+    the response, and report them in a Server-Timing header. Sampled requests
+    slower than SLOW_REQUEST_MS and their queries slower than SLOW_QUERY_MS are
+    logged as JSON lines. With METRICS_ENABLED every request's latency, DB time and size
+    also feed the Prometheus metrics of core.metrics. Works with DEBUG off;
+    requests that are neither sampled nor measured only draw a random number.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def sampled(self):
+        rate = settings.REQUEST_INSTRUMENTATION_SAMPLE_RATE
+        return rate > 0 and (rate >= 1 or random.random() < rate)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        sampled = self.sampled()
+        if not sampled and not settings.METRICS_ENABLED:
+            return self.get_response(request)
+        recorder = QueryRecorder(request, sampled)
+        token = _recorder.set(recorder)
+        try:
+            response = self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        return self.finish(recorder, response)
+
+    async def __acall__(self, request):
+        sampled = self.sampled()
+        if not sampled and not settings.METRICS_ENABLED:
+            return await self.get_response(request)
+        recorder = QueryRecorder(request, sampled)
+        token = _recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        return self.finish(recorder, response)
+
+    def process_template_response(self, request, response):
+        recorder = _recorder.get()
+        if recorder is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                recorder.render_time += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, recorder, response):
+        total = time.perf_counter() - recorder.started
+        if settings.METRICS_ENABLED:
+            observe_request(recorder.request, response, total, recorder.db_time)
+        if not recorder.sampled:
+            return response
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={_ms(recorder.db_time)};desc="{recorder.count} queries"',
+            f'db-slowest;dur={_ms(recorder.slowest_time)}',
+            f'serialize;dur={_ms(recorder.serialize_time)}',
+            f'render;dur={_ms(recorder.render_time)}',
+            f'total;dur={_ms(total)}',
+        ])
+
+        request = recorder.request
+        match = getattr(request, 'resolver_match', None)
+        context = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+        }
+        for elapsed, sql in recorder.slow_queries:
+            logger.warning(json.dumps({
+                'event': 'slow_query', **context, 'duration_ms': _ms(elapsed), 'sql': sql[:SQL_LOG_LENGTH],
+            }))
+        if total * 1000 >= settings.SLOW_REQUEST_MS:
+            logger.warning(json.dumps({
+                'event': 'slow_request', **context,
+                'duration_ms': _ms(total),
+                'db_ms': _ms(recorder.db_time),
+                'query_count': recorder.count,
+                'slowest_query_ms': _ms(recorder.slowest_time),
+                'slowest_sql': (recorder.slowest_sql or '')[:SQL_LOG_LENGTH] or None,
+                'serialize_ms': _ms(recorder.serialize_time),
+                'render_ms': _ms(recorder.render_time),
+            }))
+        return response
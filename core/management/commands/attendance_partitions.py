@@ -0,0 +1,72 @@
+# core/management/commands/attendance_partitions.py
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from core.models import Attendance
+from core.partitions import (
+    PartitionError, convert_attendance_table, create_partitions, expire_partitions, list_partitions
+)
+from core.signals import bulk_write
+
+
+class Command(BaseCommand):
+    help = 'Convert the attendance table to monthly partitions and manage its partitions'
+
+    operations = ['convert', 'create', 'expire', 'list']
+
+    def add_arguments(self, parser):
+        parser.add_argument('operation', choices=self.operations,
+                            help='convert the table, create upcoming partitions, expire old ones or list them')
+        parser.add_argument('--months-ahead', type=int, default=settings.ATTENDANCE_PARTITION_MONTHS_AHEAD,
+                            help='Months after the current one to create partitions for')
+        parser.add_argument('--retention-months', type=int, default=settings.ATTENDANCE_RETENTION_MONTHS,
+                            help='Full months before the current one whose partitions are kept')
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument('--archive', action='store_true',
+                          help=f'Move expired partitions to the {settings.ATTENDANCE_ARCHIVE_SCHEMA} schema')
+        mode.add_argument('--drop', action='store_true', help='Drop expired partitions')
+        parser.add_argument('--dry-run', action='store_true', help='Only list the partitions that would expire')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Attendance partitioning requires PostgreSQL')
+        try:
+            getattr(self, f"run_{options['operation']}")(options, timezone.localdate())
+        except PartitionError as exc:
+            raise CommandError(str(exc))
+
+    def run_convert(self, options, today):
+        self.stdout.write('Converting the attendance table to monthly partitions...')
+        count = convert_attendance_table(options['months_ahead'], today)
+        self.stdout.write(self.style.SUCCESS(f'Attendance table partitioned into {count} partitions'))
+
+    def run_create(self, options, today):
+        created = create_partitions(options['months_ahead'], today)
+        for name in created:
+            self.stdout.write(f'Created {name}')
+        self.stdout.write(self.style.SUCCESS(f'Created {len(created)} attendance partitions'))
+
+    def run_expire(self, options, today):
+        mode = 'archive' if options['archive'] else 'drop' if options['drop'] else 'detach'
+        expired = expire_partitions(
+            options['retention_months'], today, mode=mode,
+            archive_schema=settings.ATTENDANCE_ARCHIVE_SCHEMA, dry_run=options['dry_run']
+        )
+        verb = 'Would expire' if options['dry_run'] else {'detach': 'Detached', 'archive': 'Archived',
+                                                           'drop': 'Dropped'}[mode]
+        for name in expired:
+            self.stdout.write(f'{verb} {name}')
+        if expired and not options['dry_run']:
+            bulk_write.send(sender=Attendance)
+        self.stdout.write(self.style.SUCCESS(f'{verb} {len(expired)} attendance partitions'))
+
+    def run_list(self, options, today):
+        with connection.cursor() as cursor:
+            partitions = list_partitions(cursor)
+        if not partitions:
+            self.stdout.write('The attendance table is not partitioned')
+        for name, lower, upper in partitions:
+            bounds = 'DEFAULT' if lower is None else f'{lower} to {upper}'
+            self.stdout.write(f'{name:<32}{bounds}')
@@ -0,0 +1,544 @@
+# core/management/commands/benchmark.py
+import asyncio
+import json
+import statistics
+import time
+import tracemalloc
+from datetime import date, timedelta
+from io import StringIO
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_databases, setup_test_environment,
+    teardown_databases, teardown_test_environment
+)
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from core.async_views import async_analytics_view
+from core.fastpath import get_read_plan
+from core.models import Attendance, Department, Employee
+
+
+def best_of(repeat, func):
+    """Run ``func`` ``repeat`` times and return (fastest wall time in seconds, last result)."""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+class APICaller:
+    """Calls viewset actions in-process, authenticated and without throttling."""
+
+    def __init__(self):
+        from employee_analytics.urls import router
+
+        self.viewsets = {basename: viewset for prefix, viewset, basename in router.registry}
+        self.factory = APIRequestFactory()
+        self.user = User(username='benchmark', is_staff=True)
+
+    def __call__(self, basename, name, params=None):
+        view = self.viewsets[basename].as_view({'get': name}, basename=basename, throttle_classes=[])
+        request = self.factory.get(f'/{basename}/{name}/', params or {})
+        force_authenticate(request, user=self.user)
+        response = view(request)
+        if response.status_code != 200:
+            raise CommandError(f'{basename}.{name} {params}: HTTP {response.status_code}')
+        response.render()
+        return response
+
+
+def without_analytics_cache():
+    """Point the analytics cache at a dummy backend so every request computes its response."""
+    return override_settings(
+        CACHES={**settings.CACHES, 'benchmark': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        ANALYTICS_CACHE_ALIAS='benchmark',
+    )
+
+
+# Query parameters of the collection routes that need a department or an employee,
+# or that would otherwise export whole tables
+API_ROUTE_PARAMS = {
+    ('employee', 'export'): {'department': '{department}'},
+    ('attendance', 'export'): {'employee': '{employee}'},
+    ('performance', 'export'): {'employee': '{employee}'},
+    ('salary', 'export'): {'employee': '{employee}'},
+    ('attendance', 'department_attendance'): {'department': '{department}'},
+    ('performance', 'department_performance'): {'department': '{department}'},
+    ('performance', 'rating_trends'): {'department': '{department}'},
+    ('salary', 'department_salaries'): {'department': '{department}'},
+}
+CRUD_ROUTES = (
+    ('list', 'get', False),
+    ('retrieve', 'get', True),
+    ('create', 'post', False),
+    ('update', 'put', True),
+    ('partial_update', 'patch', True),
+    ('destroy', 'delete', True),
+)
+INGEST_ROWS = 100
+# Rows written by the benchmark are dated from here so they never meet seeded ones
+BENCHMARK_DATE = date(2100, 1, 1)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list."""
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+class ApiBenchmark:
+    """
+    Times every CRUD and extra action route of the router through the test client,
+    as a staff user. Writes act on rows the benchmark creates itself, dated from
+    2100 where dates are unique, and those rows are deleted again. Each route runs
+    ``requests`` timed requests plus one under tracemalloc for its peak memory.
+    """
+
+    def __init__(self, requests):
+        from employee_analytics.urls import router
+
+        self.router = router
+        self.requests = max(2, requests)
+        user, _ = User.objects.get_or_create(username='benchmark', defaults={'is_staff': True})
+        self.client = APIClient(raise_request_exception=False)
+        self.client.force_authenticate(user=user)
+        self.department = Department.objects.order_by('id').first()
+        self.employee = Employee.objects.order_by('id').first()
+        self.created = {}
+
+    def routes(self):
+        """Yield (viewset, basename, action, url name, method, detail) of every route."""
+        for prefix, viewset, basename in self.router.registry:
+            for action, method, detail in CRUD_ROUTES:
+                if hasattr(viewset, action):
+                    yield viewset, basename, action, 'detail' if detail else 'list', method, detail
+            for extra in viewset.get_extra_actions():
+                for method in extra.mapping:
+                    yield viewset, basename, extra.__name__, extra.url_name, method, extra.detail
+
+    def create_payload(self, model, index):
+        """Field values of the model's first row, with unique values made unique for ``index``."""
+        instance = model.objects.order_by('id').first()
+        payload = {}
+        for field in model._meta.concrete_fields:
+            if field.primary_key or getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                continue
+            value = getattr(instance, field.attname)
+            if field.unique and isinstance(value, str):
+                value = f'benchmark-{index}-{value}'
+            payload[field.name] = value
+        for fields in model._meta.unique_together:
+            for name in fields:
+                if isinstance(payload[name], date):
+                    payload[name] = BENCHMARK_DATE + timedelta(days=index)
+        return payload
+
+    def ingest_body(self, index):
+        lines = ['employee,date,status']
+        first = BENCHMARK_DATE + timedelta(days=index * INGEST_ROWS)
+        lines += [f'{self.employee.id},{first + timedelta(days=day)},present' for day in range(INGEST_ROWS)]
+        return '\n'.join(lines) + '\n'
+
+    def request(self, viewset, basename, action, url_name, method, detail, index):
+        """Send request ``index`` of a route; returns the response, or None when there is nothing to act on."""
+        model = viewset.queryset.model
+        kwargs = {}
+        if action in ('update', 'partial_update', 'destroy'):
+            created = self.created.get(basename, [])
+            if index >= len(created):
+                return None
+            kwargs['pk'] = created[index]
+        elif detail:
+            sample = self.employee if model is Employee else model.objects.order_by('id').first()
+            if sample is None:
+                return None
+            kwargs['pk'] = sample.pk
+        url = reverse(f'{basename}-{url_name}', kwargs=kwargs)
+
+        if action == 'bulk_ingest':
+            return self.client.post(url, self.ingest_body(index), content_type='text/csv')
+        if action == 'create':
+            response = self.client.post(url, self.create_payload(model, index), format='json')
+            if response.status_code == 201:
+                self.created.setdefault(basename, []).append(response.data['id'])
+            return response
+        if action == 'update':
+            return self.client.put(url, self.create_payload(model, index), format='json')
+        if action == 'partial_update':
+            return self.client.patch(url, {}, format='json')
+        if method == 'delete':
+            return self.client.delete(url)
+        params = {
+            name: value.format(department=self.department.id, employee=self.employee.id)
+            for name, value in API_ROUTE_PARAMS.get((basename, action), {}).items()
+        }
+        return self.client.get(url, params)
+
+    def measure(self, route):
+        timings, queries, statuses = [], 0, set()
+        peak = 0
+        for index in range(self.requests + 1):
+            traced = index == self.requests
+            if traced:
+                tracemalloc.start()
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                response = self.request(*route, index)
+                if response is not None and response.streaming:
+                    b''.join(response.streaming_content)
+                elapsed = (time.perf_counter() - started) * 1000
+            if traced:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            if response is None:
+                return {'error': 'no row to act on'}
+            statuses.add(response.status_code)
+            if not traced:
+                timings.append(elapsed)
+                queries = max(queries, len(context.captured_queries))
+
+        timings.sort()
+        stats = {
+            'method': route[4].upper(),
+            'status': max(statuses),
+            'requests': len(timings),
+            'p50_ms': round(percentile(timings, 0.50), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'p99_ms': round(percentile(timings, 0.99), 3),
+            'queries': queries,
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+        if max(statuses) >= 400:
+            stats['error'] = f'HTTP {max(statuses)}'
+        return stats
+
+    def run(self):
+        """Return {'<basename>.<action>': stats} for every route."""
+        results = {f'{route[1]}.{route[2]}': self.measure(route) for route in self.routes()}
+        # Rows of bulk_ingest and of creates that nothing deleted
+        Attendance.objects.filter(date__gte=BENCHMARK_DATE).delete()
+        return results
+
+
+def api_benchmark_settings():
+    """Dummy default and analytics caches: no throttling, and every analytics response is computed."""
+    dummy = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+    return override_settings(
+        CACHES={**settings.CACHES, 'default': dummy, 'benchmark': dummy},
+        ANALYTICS_CACHE_ALIAS='benchmark',
+    )
+
+
+def compare_results(baseline, current, tolerance, min_delta_ms):
+    """
+    Return regressions of ``current`` against ``baseline`` as (scale, route,
+    metric, baseline value, current value): routes that started failing, more
+    queries, or p95 latency or peak memory up by more than ``tolerance`` (a
+    fraction) and, for latency, by more than ``min_delta_ms``.
+    """
+    regressions = []
+    for scale, result in current['scales'].items():
+        base_routes = baseline.get('scales', {}).get(scale, {}).get('routes', {})
+        for route, stats in result['routes'].items():
+            old = base_routes.get(route)
+            if old is None or 'error' in old:
+                continue
+            if 'error' in stats:
+                regressions.append((scale, route, 'error', None, stats['error']))
+                continue
+            if stats['queries'] > old['queries']:
+                regressions.append((scale, route, 'queries', old['queries'], stats['queries']))
+            if (stats['p95_ms'] > old['p95_ms'] * (1 + tolerance)
+                    and stats['p95_ms'] - old['p95_ms'] > min_delta_ms):
+                regressions.append((scale, route, 'p95_ms', old['p95_ms'], stats['p95_ms']))
+            if stats['peak_memory_kb'] > old['peak_memory_kb'] * (1 + tolerance):
+                regressions.append((scale, route, 'peak_memory_kb', old['peak_memory_kb'], stats['peak_memory_kb']))
+    return regressions
+
+
+def measure(repeat, func):
+    """Run ``func`` ``repeat`` times and return (median ms, best ms, queries of the last run)."""
+    timings = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), min(timings), len(context.captured_queries)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark API code paths against the configured database'
+
+    suites = ['read_path', 'dashboard', 'async', 'api', 'metrics']
+
+    def add_arguments(self, parser):
+        parser.add_argument('suite', choices=self.suites, help='Benchmark suite to run')
+        parser.add_argument('--rows', type=int, default=5000, help='Rows per measurement')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement, the fastest counts')
+        parser.add_argument('--target-ms', type=float, default=200,
+                            help='dashboard: fail when the median dashboard latency is above this')
+        parser.add_argument('--concurrency', type=int, default=8,
+                            help='async: concurrent requests served by the one event loop')
+        parser.add_argument('--scales', default='1000,10000,100000',
+                            help='api: comma-separated employee counts to seed and measure')
+        parser.add_argument('--requests', type=int, default=30, help='api, metrics: timed requests per route')
+        parser.add_argument('--attendance-days', type=int, default=30, help='api: attendance days per employee')
+        parser.add_argument('--departments', type=int, default=10, help='api: departments to seed')
+        parser.add_argument('--seed', type=int, default=42, help='api: random seed of the seeded data')
+        parser.add_argument('--keepdb', action='store_true', help='api: keep the benchmark database afterwards')
+        parser.add_argument('--output', help='api: write the results as JSON to this file')
+        parser.add_argument('--compare', help='api: JSON results of an earlier run; fail on regressions against it')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='api: allowed relative increase of p95 latency and peak memory')
+        parser.add_argument('--min-delta-ms', type=float, default=2,
+                            help='api: p95 increases below this many ms are noise')
+
+    def handle(self, *args, **options):
+        getattr(self, f"run_{options['suite']}")(options)
+
+    def run_read_path(self, options):
+        """Rows/second of the ModelSerializer read path versus the values() fast path."""
+        from employee_analytics.urls import router
+
+        rows, repeat = options['rows'], options['repeat']
+        renderer = JSONRenderer()
+        self.stdout.write(f"{'endpoint':<14}{'rows':>8}{'serializer rows/s':>20}{'fast rows/s':>14}{'speedup':>9}")
+
+        for prefix, viewset, basename in router.registry:
+            queryset = viewset.queryset.order_by('id')
+            serializer_class = viewset.serializer_class
+            plan = get_read_plan(serializer_class)
+
+            serializer_time, expected = best_of(
+                repeat, lambda: serializer_class(list(queryset[:rows]), many=True).data
+            )
+            fast_time, actual = best_of(
+                repeat, lambda: [plan.build(row) for row in queryset.values(*plan.lookups)[:rows]]
+            )
+            if renderer.render(expected) != renderer.render(actual):
+                raise CommandError(f'Fast read path output differs from {serializer_class.__name__}')
+
+            count = len(actual)
+            if not count:
+                self.stdout.write(f'{prefix:<14}{0:>8}  (no rows, seed data with generate_data)')
+                continue
+            self.stdout.write(
+                f'{prefix:<14}{count:>8}{count / serializer_time:>20,.0f}{count / fast_time:>14,.0f}'
+                f'{serializer_time / fast_time:>8.1f}x'
+            )
+
+    def run_dashboard(self, options):
+        """Latency of the department dashboard versus the per-department endpoints it replaces."""
+        call = APICaller()
+        repeat, target = max(1, options['repeat']), options['target_ms']
+        department_ids = list(Department.objects.values_list('id', flat=True))
+
+        def per_department():
+            call('department', 'analytics')
+            for department_id in department_ids:
+                params = {'department': department_id}
+                call('attendance', 'department_attendance', params)
+                call('performance', 'department_performance', params)
+                call('salary', 'department_salaries', params)
+
+        requests = 1 + 3 * len(department_ids)
+        self.stdout.write(f"{'path':<24}{'requests':>9}{'queries':>9}{'median ms':>11}{'best ms':>9}")
+        with without_analytics_cache():
+            for label, count, func in (
+                ('per-department calls', requests, per_department),
+                ('dashboard', 1, lambda: call('department', 'dashboard')),
+            ):
+                median, best, queries = measure(repeat, func)
+                self.stdout.write(f'{label:<24}{count:>9}{queries:>9}{median:>11.1f}{best:>9.1f}')
+
+        if median > target:
+            raise CommandError(
+                f'Dashboard median latency {median:.1f} ms is above the {target:g} ms target '
+                f'for {len(department_ids)} departments'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Dashboard median latency {median:.1f} ms is within the {target:g} ms target'
+        ))
+
+    def run_async(self, options):
+        """
+        Latency and per-worker throughput of the async analytics views versus their
+        sync actions. A sync (WSGI) worker serves one request at a time, so its
+        throughput is 1 / latency; the async worker is one event loop serving
+        --concurrency requests at once, each with its own sync thread as under ASGI.
+        Connections are released after every request like at the end of a real one.
+        """
+        from employee_analytics.urls import router
+
+        call = APICaller()
+        repeat, concurrency = max(1, options['repeat']), max(1, options['concurrency'])
+        department = Department.objects.order_by('id').values_list('id', flat=True).first()
+        endpoints = [
+            (
+                basename, extra.__name__,
+                async_analytics_view(viewset, basename, extra.__name__, throttle_classes=[]),
+                {'department': department} if getattr(extra, 'warm_per_department', False) else {},
+            )
+            for prefix, viewset, basename in router.registry
+            for extra in viewset.get_extra_actions()
+            if hasattr(viewset, f'plan_{extra.__name__}')
+        ]
+
+        async def request_async(view, basename, name, params):
+            request = call.factory.get(f'/async/{basename}/{name}/', params)
+            force_authenticate(request, user=call.user)
+            async with ThreadSensitiveContext():
+                response = await view(request)
+                await sync_to_async(close_old_connections)()
+            if response.status_code != 200:
+                raise CommandError(f'async {basename}.{name}: HTTP {response.status_code}')
+
+        async def measure_async(view, basename, name, params):
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                await request_async(view, basename, name, params)
+                timings.append((time.perf_counter() - started) * 1000)
+            started = time.perf_counter()
+            await asyncio.gather(*(request_async(view, basename, name, params) for _ in range(concurrency)))
+            return statistics.median(timings), concurrency / (time.perf_counter() - started)
+
+        def request_sync(basename, name, params):
+            call(basename, name, params)
+            close_old_connections()
+
+        self.stdout.write(
+            f"{'endpoint':<38}{'sync ms':>9}{'async ms':>10}{'sync req/s':>12}{'async req/s':>13}{'speedup':>9}"
+        )
+        with without_analytics_cache():
+            for basename, name, view, params in endpoints:
+                sync_median, best, queries = measure(repeat, lambda: request_sync(basename, name, params))
+                async_median, async_throughput = asyncio.run(measure_async(view, basename, name, params))
+                sync_throughput = 1000 / sync_median
+                self.stdout.write(
+                    f'{basename + "." + name:<38}{sync_median:>9.1f}{async_median:>10.1f}'
+                    f'{sync_throughput:>12.1f}{async_throughput:>13.1f}{async_throughput / sync_throughput:>8.1f}x'
+                )
+
+    def run_metrics(self, options):
+        """
+        Latency of a few routes through the whole middleware stack with
+        METRICS_ENABLED off and on, alternating request by request.
+        """
+        client = APIClient()
+        client.force_authenticate(user=User(username='benchmark', is_staff=True))
+        department = Department.objects.order_by('id').values_list('id', flat=True).first()
+        routes = [
+            ('department-list', {}),
+            ('employee-list', {'page_size': 100}),
+            ('attendance-department-attendance', {'department': department}),
+            ('salary-salary-stats', {}),
+        ]
+        requests = max(2, options['requests'])
+
+        def timed(url, params):
+            started = time.perf_counter()
+            response = client.get(url, params)
+            elapsed = (time.perf_counter() - started) * 1000
+            if response.status_code != 200:
+                raise CommandError(f'{url}: HTTP {response.status_code}')
+            return elapsed
+
+        self.stdout.write(f"{'route':<36}{'off ms':>9}{'on ms':>9}{'overhead ms':>13}{'overhead':>10}")
+        # Throttling and the analytics cache would otherwise answer most requests
+        dummy = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+        with override_settings(CACHES={**settings.CACHES, 'default': dummy, 'benchmark': dummy},
+                               ANALYTICS_CACHE_ALIAS='benchmark'):
+            for name, params in routes:
+                url = reverse(name)
+                timed(url, params)
+                timings = {False: [], True: []}
+                for _ in range(requests):
+                    for enabled in (False, True):
+                        with override_settings(METRICS_ENABLED=enabled):
+                            timings[enabled].append(timed(url, params))
+                off, on = statistics.median(timings[False]), statistics.median(timings[True])
+                self.stdout.write(
+                    f'{name:<36}{off:>9.2f}{on:>9.2f}{on - off:>13.2f}{(on - off) / off:>10.1%}'
+                )
+
+    def run_api(self, options):
+        """
+        Seed a separate test database at each --scales size with generate_data
+        --bulk and measure every API route on it: p50/p95/p99 latency, queries and
+        peak memory. Throttling and the analytics cache are off.
+        """
+        try:
+            scales = [int(scale) for scale in options['scales'].split(',') if scale.strip()]
+        except ValueError:
+            raise CommandError('--scales must be a comma-separated list of employee counts')
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as handle:
+                baseline = json.load(handle)
+
+        results = {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'requests': options['requests'],
+            'attendance_days': options['attendance_days'],
+            'departments': options['departments'],
+            'seed': options['seed'],
+            'scales': {},
+        }
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=options['keepdb'])
+        try:
+            for scale in scales:
+                started = time.perf_counter()
+                call_command(
+                    'generate_data', bulk=True, clear=True, employees=scale, departments=options['departments'],
+                    attendance_days=options['attendance_days'], seed=options['seed'], stdout=StringIO()
+                )
+                seed_seconds = time.perf_counter() - started
+                with api_benchmark_settings():
+                    routes = ApiBenchmark(options['requests']).run()
+                results['scales'][str(scale)] = {'seed_seconds': round(seed_seconds, 1), 'routes': routes}
+                self.write_api_results(scale, seed_seconds, routes)
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(results, handle, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if baseline is not None:
+            regressions = compare_results(baseline, results, options['tolerance'], options['min_delta_ms'])
+            for scale, route, metric, old, new in regressions:
+                self.stdout.write(self.style.ERROR(f'{scale:>8} {route:<40} {metric}: {old} -> {new}'))
+            if regressions:
+                raise CommandError(f"{len(regressions)} regressions against {options['compare']}")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['compare']}"))
+
+    def write_api_results(self, scale, seed_seconds, routes):
+        self.stdout.write(f'{scale} employees (seeded in {seed_seconds:.1f}s)')
+        self.stdout.write(
+            f"{'route':<40}{'method':>7}{'status':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'queries':>9}{'peak KB':>10}"
+        )
+        for route, stats in routes.items():
+            if 'p50_ms' not in stats:
+                self.stdout.write(f"{route:<40}  {stats['error']}")
+                continue
+            self.stdout.write(
+                f"{route:<40}{stats['method']:>7}{stats['status']:>7}{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}"
+                f"{stats['p99_ms']:>9.1f}{stats['queries']:>9}{stats['peak_memory_kb']:>10.1f}"
+            )
@@ -1,12 +1,241 @@
 # core/management/commands/generate_data.py
+import itertools
+import multiprocessing
+import os
 import random
-from datetime import datetime, time, timedelta
+import time as timer
+from datetime import date, time, timedelta
+from decimal import Decimal
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from faker import Faker
 
-from core.models import Department, Employee, Attendance, Performance, Salary
+from core.bulk import copy_rows
+from core.models import (
+    Department, Employee, Attendance, Performance, Salary, CurrentSalary, AttendanceRollup
+)
+from core.projections import rebuild_current_salaries, rebuild_attendance_rollup
+from core.signals import bulk_write, VERSIONED_MODELS
+
+DEPARTMENT_NAMES = ['Engineering', 'Marketing', 'Sales', 'HR', 'Finance', 'Operations', 'IT']
+LOCATIONS = ['New York', 'San Francisco', 'Chicago', 'Austin', 'Seattle', 'Boston', 'Denver']
+POSITIONS = ['Manager', 'Developer', 'Designer', 'Analyst', 'Specialist', 'Coordinator', 'Director']
+
+STATUS_WEIGHTS = {
+    'present': 0.8,  # 80% present
+    'absent': 0.1,  # 10% absent
+    'late': 0.05,  # 5% late
+    'half_day': 0.03,  # 3% half-day
+    'leave': 0.02,  # 2% leave
+}
+STATUSES = list(STATUS_WEIGHTS.keys())
+STATUS_CUM_WEIGHTS = list(itertools.accumulate(STATUS_WEIGHTS.values()))
+
+# Base salary range depends on position
+BASE_SALARY_RANGES = {
+    'Manager': (85000, 120000),
+    'Director': (120000, 170000),
+    'Developer': (70000, 110000),
+    'Designer': (65000, 95000),
+    'Analyst': (60000, 90000),
+    'Specialist': (55000, 85000),
+    'Coordinator': (50000, 70000),
+}
+
+ATTENDANCE_FIELDS = ['employee_id', 'date', 'clock_in', 'clock_out', 'status', 'notes']
+PERFORMANCE_FIELDS = ['employee_id', 'review_date', 'reviewer_id', 'rating', 'comments',
+                      'goals_met', 'improvement_areas', 'strengths']
+SALARY_FIELDS = ['employee_id', 'amount', 'effective_date', 'bonus', 'salary_type', 'currency', 'notes']
+
+# Faker text is pre-generated once per worker; picking from a pool is far cheaper than a Faker call per row
+TEXT_POOL_SIZE = 500
+
+
+def attendance_status(rng):
+    return rng.choices(STATUSES, cum_weights=STATUS_CUM_WEIGHTS)[0]
+
+
+def attendance_times(rng, status):
+    clock_in = None
+    clock_out = None
+
+    if status in ['present', 'late']:
+        base_clock_in = time(9, 0)  # 9:00 AM
+        base_clock_out = time(17, 0)  # 5:00 PM
+
+        # Adjust clock-in time based on status
+        if status == 'present':
+            hour_variance = rng.randint(-1, 1)
+            minute_variance = rng.randint(-15, 15)
+        else:  # late
+            hour_variance = rng.randint(0, 2)
+            minute_variance = rng.randint(15, 45)
+
+        clock_in_hour = max(7, min(11, base_clock_in.hour + hour_variance))
+        clock_in_minute = max(0, min(59, base_clock_in.minute + minute_variance))
+        clock_in = time(clock_in_hour, clock_in_minute)
+
+        # Adjust clock-out time
+        hour_variance = rng.randint(-1, 2)
+        minute_variance = rng.randint(-15, 30)
+        clock_out_hour = max(16, min(20, base_clock_out.hour + hour_variance))
+        clock_out_minute = max(0, min(59, base_clock_out.minute + minute_variance))
+        clock_out = time(clock_out_hour, clock_out_minute)
+
+    elif status == 'half_day':
+        if rng.random() > 0.5:  # morning half-day
+            clock_in = time(9, rng.randint(0, 30))
+            clock_out = time(13, rng.randint(0, 30))
+        else:  # afternoon half-day
+            clock_in = time(13, rng.randint(0, 30))
+            clock_out = time(17, rng.randint(0, 30))
+
+    return clock_in, clock_out
+
+
+def review_rating(rng):
+    return rng.choices(
+        [1, 2, 3, 4, 5],
+        weights=[0.05, 0.1, 0.2, 0.4, 0.25]  # Weighted towards higher ratings
+    )[0]
+
+
+def review_comment_suffix(rating):
+    if rating <= 2:
+        return "Needs significant improvement."
+    elif rating == 3:
+        return "Meeting expectations but has room for growth."
+    return "Exceeding expectations in most areas."
+
+
+def salary_history(rng, hire_date, position, end_date):
+    """Yield (amount, effective_date, bonus, notes) for the initial salary and 0-3 increases."""
+    low, high = BASE_SALARY_RANGES.get(position, (50000, 100000))
+    base_salary = rng.randint(low, high)
+
+    # Initial salary is 80-100% of base salary
+    initial_salary = base_salary * (0.8 + rng.random() * 0.2)
+    yield initial_salary, hire_date, 0, ''
+
+    num_increases = rng.randint(0, 3)
+    last_salary = initial_salary
+    last_date = hire_date
+
+    for i in range(num_increases):
+        # Increase effective date (6-18 months after previous)
+        months_after = rng.randint(6, 18)
+        effective_date = last_date.replace(year=last_date.year + (last_date.month + months_after) // 12,
+                                           month=((last_date.month + months_after) % 12) or 12,
+                                           day=min(last_date.day, 28))
+
+        # Stop if effective date is in the future
+        if effective_date > end_date:
+            break
+
+        # Calculate increase (3-15%)
+        increase_percentage = 0.03 + rng.random() * 0.12
+        new_salary = last_salary * (1 + increase_percentage)
+
+        # Calculate bonus (0-20% of salary)
+        bonus_percentage = rng.random() * 0.2
+        bonus = last_salary * bonus_percentage
+
+        yield new_salary, effective_date, bonus, f"{increase_percentage:.1%} increase from previous salary"
+
+        last_salary = new_salary
+        last_date = effective_date
+
+
+def money(value):
+    return Decimal(value).quantize(Decimal('0.01'))
+
+
+def working_days(start_date, end_date):
+    current_date = start_date
+    while current_date <= end_date:
+        # Skip weekends
+        if current_date.weekday() < 5:  # 5=Saturday, 6=Sunday
+            yield current_date
+        current_date += timedelta(days=1)
+
+
+# Bulk mode workers. They run in forked processes, each with its own database
+# connection, and derive their random state from (seed, chunk) so that a given
+# seed reproduces the same rows regardless of worker scheduling.
+
+_reviewer_ids = []
+_sentences = []
+_paragraphs = []
+
+
+def _init_worker(reviewer_ids, seed):
+    global _reviewer_ids, _sentences, _paragraphs
+    _reviewer_ids = reviewer_ids
+    fake = Faker()
+    fake.seed_instance(seed)
+    _sentences = [fake.sentence() for _ in range(TEXT_POOL_SIZE)]
+    _paragraphs = [fake.paragraph(nb_sentences=3) for _ in range(TEXT_POOL_SIZE)]
+
+
+def _load_activity(task):
+    chunk_index, employees, seed, start_date, end_date, batch_size = task
+    rng = random.Random(f'{seed}:{chunk_index}')
+    days = list(working_days(start_date, end_date))
+
+    counts = {'attendance': 0, 'performance': 0, 'salary': 0}
+    attendance_rows, performance_rows, salary_rows = [], [], []
+
+    def flush(force=False):
+        if force or len(attendance_rows) >= batch_size:
+            counts['attendance'] += copy_rows(Attendance, ATTENDANCE_FIELDS, attendance_rows)
+            attendance_rows.clear()
+        if force or len(performance_rows) >= batch_size:
+            counts['performance'] += copy_rows(Performance, PERFORMANCE_FIELDS, performance_rows)
+            performance_rows.clear()
+        if force or len(salary_rows) >= batch_size:
+            counts['salary'] += copy_rows(Salary, SALARY_FIELDS, salary_rows)
+            salary_rows.clear()
+
+    for employee_id, hire_date, position in employees:
+        for day in days:
+            status = attendance_status(rng)
+            clock_in, clock_out = attendance_times(rng, status)
+            notes = rng.choice(_sentences) if rng.random() > 0.7 else ''
+            attendance_rows.append((employee_id, day, clock_in, clock_out, status, notes))
+
+        # Create 1-3 performance reviews per employee, never reviewed by themselves
+        review_window = (end_date - timedelta(days=730)).toordinal(), end_date.toordinal()
+        review_dates = sorted(
+            review_window[0] + rng.randrange(review_window[1] - review_window[0] + 1)
+            for _ in range(rng.randint(1, 3))
+        )
+        for review_ordinal in review_dates:
+            reviewer_id = None
+            while len(_reviewer_ids) > 1 and reviewer_id in (None, employee_id):
+                reviewer_id = rng.choice(_reviewer_ids)
+            rating = review_rating(rng)
+            performance_rows.append((
+                employee_id,
+                date.fromordinal(review_ordinal),
+                reviewer_id,
+                rating,
+                f"{rng.choice(_paragraphs)}\n{review_comment_suffix(rating)}",
+                rating >= 3,
+                rng.choice(_paragraphs) if rating < 5 else "",
+                rng.choice(_paragraphs),
+            ))
+
+        for amount, effective_date, bonus, notes in salary_history(rng, hire_date, position, end_date):
+            salary_rows.append((employee_id, money(amount), effective_date, money(bonus), 'annual', 'USD', notes))
+
+        flush()
+
+    flush(force=True)
+    return counts
 
 
 class Command(BaseCommand):
@@ -16,32 +245,66 @@ class Command(BaseCommand):
         parser.add_argument('--employees', type=int, default=5, help='Number of employees to generate')
         parser.add_argument('--departments', type=int, default=3, help='Number of departments to generate')
         parser.add_argument('--attendance_days', type=int, default=30, help='Number of attendance days to generate')
-        parser.add_argument('--clear', action='store_true', help='Clear existing data before generation')
+        parser.add_argument('--clear', action='store_true', help='Truncate existing data before generation')
+        parser.add_argument('--seed', type=int, help='Random seed for reproducible data')
+        parser.add_argument('--start-date', help='First attendance date (YYYY-MM-DD), defaults to '
+                                                 'attendance_days before today')
+        parser.add_argument('--bulk', action='store_true',
+                            help='Generate rows in batches across a process pool and load them with COPY')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Rows per COPY batch in bulk mode')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Worker processes in bulk mode')
 
     def handle(self, *args, **options):
         if options['clear']:
             self.stdout.write('Clearing existing data...')
-            Salary.objects.all().delete()
-            Performance.objects.all().delete()
-            Attendance.objects.all().delete()
-            Employee.objects.all().delete()
-            Department.objects.all().delete()
+            self.truncate_tables()
 
+        attendance_days = options['attendance_days']
+        if options['start_date']:
+            start_date = parse_date(options['start_date'])
+            if start_date is None:
+                raise CommandError('--start-date must be formatted as YYYY-MM-DD')
+            end_date = start_date + timedelta(days=attendance_days)
+        else:
+            end_date = timezone.now().date()
+            start_date = end_date - timedelta(days=attendance_days)
+
+        if options['bulk']:
+            self.generate_bulk(options, start_date, end_date)
+        else:
+            self.generate(options, start_date, end_date)
+
+    def truncate_tables(self):
+        models = [AttendanceRollup, CurrentSalary, Salary, Performance, Attendance, Employee, Department]
+        statements = connection.ops.sql_flush(
+            no_style(),
+            [model._meta.db_table for model in models],
+            reset_sequences=True,
+            allow_cascade=True,
+        )
+        connection.ops.execute_sql_flush(statements)
+        for model in VERSIONED_MODELS:
+            bulk_write.send(sender=model)
+
+    def generate(self, options, start_date, end_date):
+        seed = options['seed']
+        if seed is not None:
+            random.seed(seed)
         fake = Faker()
+        if seed is not None:
+            fake.seed_instance(seed)
         num_employees = options['employees']
         num_departments = options['departments']
-        attendance_days = options['attendance_days']
 
         # Create departments
         self.stdout.write('Creating departments...')
         departments = []
-        department_names = ['Engineering', 'Marketing', 'Sales', 'HR', 'Finance', 'Operations', 'IT']
-        locations = ['New York', 'San Francisco', 'Chicago', 'Austin', 'Seattle', 'Boston', 'Denver']
 
-        for i in range(min(num_departments, len(department_names))):
+        for i in range(min(num_departments, len(DEPARTMENT_NAMES))):
             department = Department.objects.create(
-                name=department_names[i],
-                location=random.choice(locations)
+                name=DEPARTMENT_NAMES[i],
+                location=random.choice(LOCATIONS)
             )
             departments.append(department)
             self.stdout.write(f'Created department: {department.name}')
@@ -49,7 +312,6 @@ class Command(BaseCommand):
         # Create employees
         self.stdout.write('Creating employees...')
         employees = []
-        positions = ['Manager', 'Developer', 'Designer', 'Analyst', 'Specialist', 'Coordinator', 'Director']
 
         for i in range(num_employees):
             first_name = fake.first_name()
@@ -60,9 +322,9 @@ class Command(BaseCommand):
                 first_name=first_name,
                 last_name=last_name,
                 email=f"{first_name.lower()}.{last_name.lower()}@example.com",
-                phone_number=fake.phone_number(),
-                hire_date=fake.date_between(start_date='-5y', end_date='today'),
-                position=random.choice(positions),
+                phone_number=fake.phone_number()[:20],
+                hire_date=fake.date_between(start_date=end_date - timedelta(days=5 * 365), end_date=end_date),
+                position=random.choice(POSITIONS),
                 department=department,
                 is_active=random.random() > 0.1,  # 90% active
             )
@@ -80,63 +342,11 @@ class Command(BaseCommand):
 
         # Create attendance records
         self.stdout.write('Creating attendance records...')
-        end_date = timezone.now().date()
-        start_date = end_date - timedelta(days=attendance_days)
-        current_date = start_date
-
-        while current_date <= end_date:
-            # Skip weekends
-            if current_date.weekday() >= 5:  # 5=Saturday, 6=Sunday
-                current_date += timedelta(days=1)
-                continue
-
+        for current_date in working_days(start_date, end_date):
             for employee in employees:
                 # Randomize attendance status
-                status_weights = {
-                    'present': 0.8,  # 80% present
-                    'absent': 0.1,  # 10% absent
-                    'late': 0.05,  # 5% late
-                    'half_day': 0.03,  # 3% half-day
-                    'leave': 0.02,  # 2% leave
-                }
-                status = random.choices(
-                    list(status_weights.keys()),
-                    weights=list(status_weights.values())
-                )[0]
-
-                clock_in = None
-                clock_out = None
-
-                if status in ['present', 'late']:
-                    base_clock_in = time(9, 0)  # 9:00 AM
-                    base_clock_out = time(17, 0)  # 5:00 PM
-
-                    # Adjust clock-in time based on status
-                    if status == 'present':
-                        hour_variance = random.randint(-1, 1)
-                        minute_variance = random.randint(-15, 15)
-                    else:  # late
-                        hour_variance = random.randint(0, 2)
-                        minute_variance = random.randint(15, 45)
-
-                    clock_in_hour = max(7, min(11, base_clock_in.hour + hour_variance))
-                    clock_in_minute = max(0, min(59, base_clock_in.minute + minute_variance))
-                    clock_in = time(clock_in_hour, clock_in_minute)
-
-                    # Adjust clock-out time
-                    hour_variance = random.randint(-1, 2)
-                    minute_variance = random.randint(-15, 30)
-                    clock_out_hour = max(16, min(20, base_clock_out.hour + hour_variance))
-                    clock_out_minute = max(0, min(59, base_clock_out.minute + minute_variance))
-                    clock_out = time(clock_out_hour, clock_out_minute)
-
-                elif status == 'half_day':
-                    if random.random() > 0.5:  # morning half-day
-                        clock_in = time(9, random.randint(0, 30))
-                        clock_out = time(13, random.randint(0, 30))
-                    else:  # afternoon half-day
-                        clock_in = time(13, random.randint(0, 30))
-                        clock_out = time(17, random.randint(0, 30))
+                status = attendance_status(random)
+                clock_in, clock_out = attendance_times(random, status)
 
                 Attendance.objects.create(
                     employee=employee,
@@ -147,8 +357,6 @@ class Command(BaseCommand):
                     notes=fake.sentence() if random.random() > 0.7 else ''
                 )
 
-            current_date += timedelta(days=1)
-
         self.stdout.write(f'Created attendance records from {start_date} to {end_date}')
 
         # Create performance reviews
@@ -156,30 +364,23 @@ class Command(BaseCommand):
         for employee in employees:
             # Create 1-3 performance reviews per employee
             num_reviews = random.randint(1, 3)
-            review_dates = sorted([fake.date_between(start_date='-2y', end_date='today') for _ in range(num_reviews)])
+            review_dates = sorted([
+                fake.date_between(start_date=end_date - timedelta(days=730), end_date=end_date)
+                for _ in range(num_reviews)
+            ])
 
             for review_date in review_dates:
                 # Avoid self-review
                 potential_reviewers = [e for e in employees if e != employee]
                 reviewer = random.choice(potential_reviewers) if potential_reviewers else None
 
-                rating = random.choices(
-                    [1, 2, 3, 4, 5],
-                    weights=[0.05, 0.1, 0.2, 0.4, 0.25]  # Weighted towards higher ratings
-                )[0]
-
+                rating = review_rating(random)
                 goals_met = rating >= 3
 
-                comments = []
-                if rating <= 2:
-                    comments.append(fake.paragraph(nb_sentences=2, variable_nb_sentences=True))
-                    comments.append("Needs significant improvement.")
-                elif rating == 3:
-                    comments.append(fake.paragraph(nb_sentences=2, variable_nb_sentences=True))
-                    comments.append("Meeting expectations but has room for growth.")
-                else:
-                    comments.append(fake.paragraph(nb_sentences=2, variable_nb_sentences=True))
-                    comments.append("Exceeding expectations in most areas.")
+                comments = [
+                    fake.paragraph(nb_sentences=2, variable_nb_sentences=True),
+                    review_comment_suffix(rating),
+                ]
 
                 Performance.objects.create(
                     employee=employee,
@@ -197,65 +398,97 @@ class Command(BaseCommand):
         # Create salary records
         self.stdout.write('Creating salary records...')
         for employee in employees:
-            # Base salary depends on position
-            base_salary = {
-                'Manager': random.randint(85000, 120000),
-                'Director': random.randint(120000, 170000),
-                'Developer': random.randint(70000, 110000),
-                'Designer': random.randint(65000, 95000),
-                'Analyst': random.randint(60000, 90000),
-                'Specialist': random.randint(55000, 85000),
-                'Coordinator': random.randint(50000, 70000),
-            }.get(employee.position, random.randint(50000, 100000))
-
-            # Create initial salary
-            hire_date = employee.hire_date
-            initial_salary = base_salary * (0.8 + random.random() * 0.2)  # 80-100% of base salary
-
-            Salary.objects.create(
-                employee=employee,
-                amount=initial_salary,
-                effective_date=hire_date,
-                bonus=0,
-                salary_type='annual'
-            )
-
-            # Create salary increases (0-3 per employee)
-            num_increases = random.randint(0, 3)
-            last_salary = initial_salary
-            last_date = hire_date
-
-            for i in range(num_increases):
-                # Increase effective date (6-18 months after previous)
-                months_after = random.randint(6, 18)
-                effective_date = last_date.replace(year=last_date.year + (last_date.month + months_after) // 12,
-                                                   month=((last_date.month + months_after) % 12) or 12,
-                                                   day=min(last_date.day, 28))
-
-                # Stop if effective date is in the future
-                if effective_date > datetime.now().date():
-                    break
-
-                # Calculate increase (3-15%)
-                increase_percentage = 0.03 + random.random() * 0.12
-                new_salary = last_salary * (1 + increase_percentage)
-
-                # Calculate bonus (0-20% of salary)
-                bonus_percentage = random.random() * 0.2
-                bonus = last_salary * bonus_percentage
-
+            num_records = 0
+            history = salary_history(random, employee.hire_date, employee.position, end_date)
+            for amount, effective_date, bonus, notes in history:
                 Salary.objects.create(
                     employee=employee,
-                    amount=new_salary,
+                    amount=money(amount),
                     effective_date=effective_date,
-                    bonus=bonus,
+                    bonus=money(bonus),
                     salary_type='annual',
-                    notes=f"{increase_percentage:.1%} increase from previous salary"
+                    notes=notes
                 )
+                num_records += 1
+
+            self.stdout.write(f'Created {num_records} salary records for {employee.full_name}')
 
-                last_salary = new_salary
-                last_date = effective_date
+        self.stdout.write(self.style.SUCCESS('Successfully generated employee data'))
 
-            self.stdout.write(f'Created {num_increases + 1} salary records for {employee.full_name}')
+    def generate_bulk(self, options, start_date, end_date):
+        seed = options['seed'] if options['seed'] is not None else random.randrange(2 ** 32)
+        batch_size = options['batch_size']
+        workers = max(1, options['workers'])
+        rng = random.Random(seed)
+        fake = Faker()
+        fake.seed_instance(seed)
+        started = timer.perf_counter()
+        self.stdout.write(f'Generating data in bulk mode with seed {seed} and {workers} workers...')
+
+        departments = Department.objects.bulk_create([
+            Department(name=DEPARTMENT_NAMES[i], location=rng.choice(LOCATIONS))
+            for i in range(min(options['departments'], len(DEPARTMENT_NAMES)))
+        ])
+
+        # Employee rows are cheap to generate; doing it here keeps emails unique across chunks
+        employees = Employee.objects.bulk_create([
+            Employee(
+                first_name=first_name,
+                last_name=last_name,
+                email=f"{first_name.lower()}.{last_name.lower()}.{i}@example.com",
+                phone_number=fake.phone_number()[:20],
+                hire_date=fake.date_between(start_date=end_date - timedelta(days=5 * 365), end_date=end_date),
+                position=rng.choice(POSITIONS),
+                department=rng.choice(departments),
+                is_active=rng.random() > 0.1,  # 90% active
+            )
+            for i, (first_name, last_name) in enumerate(
+                (fake.first_name(), fake.last_name()) for _ in range(options['employees'])
+            )
+        ], batch_size=batch_size)
+        self.stdout.write(f'Created {len(departments)} departments and {len(employees)} employees')
 
-        self.stdout.write(self.style.SUCCESS('Successfully generated employee data'))
\ No newline at end of file
+        managers = []
+        for department in departments:
+            department_employees = [e for e in employees if e.department_id == department.id]
+            if department_employees:
+                department.manager = rng.choice(department_employees)
+                managers.append(department)
+        Department.objects.bulk_update(managers, ['manager'])
+
+        # Split employees so each task holds roughly batch_size attendance rows
+        days_per_employee = max(1, sum(1 for _ in working_days(start_date, end_date)))
+        chunk_size = max(1, batch_size // days_per_employee)
+        employee_rows = [(e.id, e.hire_date, e.position) for e in employees]
+        tasks = [
+            (index, employee_rows[offset:offset + chunk_size], seed, start_date, end_date, batch_size)
+            for index, offset in enumerate(range(0, len(employee_rows), chunk_size))
+        ]
+
+        totals = {'attendance': 0, 'performance': 0, 'salary': 0}
+        # Forked children must not share the parent's database socket
+        connections.close_all()
+        reviewer_ids = [e.id for e in employees]
+        with multiprocessing.get_context('fork').Pool(
+                workers, initializer=_init_worker, initargs=(reviewer_ids, seed)) as pool:
+            for done, counts in enumerate(pool.imap_unordered(_load_activity, tasks), start=1):
+                for key, value in counts.items():
+                    totals[key] += value
+                if done % max(1, len(tasks) // 10) == 0 or done == len(tasks):
+                    self.stdout.write(f'Loaded {done}/{len(tasks)} employee chunks')
+
+        self.stdout.write('Rebuilding salary projection and attendance rollup...')
+        rebuild_current_salaries()
+        rebuild_attendance_rollup()
+        for model in VERSIONED_MODELS:
+            bulk_write.send(sender=model)
+
+        elapsed = timer.perf_counter() - started
+        total_rows = len(departments) + len(employees) + sum(totals.values())
+        self.stdout.write(
+            f"Created {totals['attendance']} attendance, {totals['performance']} performance "
+            f"and {totals['salary']} salary records from {start_date} to {end_date}"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully generated {total_rows} rows in {elapsed:.1f}s ({total_rows / elapsed:,.0f} rows/s)'
+        ))
@@ -0,0 +1,59 @@
+# core/management/commands/profiles.py
+import io
+import pstats
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.profiling import get_profile_dir, list_profiles, load_profile
+
+
+class Command(BaseCommand):
+    help = 'List the request profiles captured with X-Profile: 1 or ?profile=1, or summarize one of them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('profile_id', nargs='?', help='Profile to summarize; lists recent profiles without it')
+        parser.add_argument('--limit', type=int, default=20, help='Number of recent profiles to list')
+        parser.add_argument('--top', type=int, default=25, help='Functions and queries to show in a summary')
+        parser.add_argument('--sort', choices=['cumulative', 'tottime', 'ncalls'], default='cumulative',
+                            help='Order of the functions in a summary')
+
+    def handle(self, *args, **options):
+        if options['profile_id']:
+            self.summarize(options['profile_id'], options['top'], options['sort'])
+        else:
+            self.list(options['limit'])
+
+    def list(self, limit):
+        profiles = list_profiles(limit)
+        if not profiles:
+            self.stdout.write(f'No profiles in {get_profile_dir()}')
+            return
+        self.stdout.write(f"{'id':<26}{'status':>7}{'ms':>10}{'queries':>9}{'db ms':>9}  request")
+        for profile in profiles:
+            self.stdout.write(
+                f"{profile['id']:<26}{profile['status']:>7}{profile['duration_ms']:>10.1f}"
+                f"{profile['query_count']:>9}{profile['db_ms']:>9.1f}  {profile['method']} {profile['path']}"
+            )
+
+    def summarize(self, profile_id, top, sort):
+        try:
+            summary, path = load_profile(profile_id)
+        except FileNotFoundError:
+            raise CommandError(f'No profile {profile_id} in {get_profile_dir()}')
+
+        self.stdout.write(
+            f"{summary['method']} {summary['path']} ({summary['view']}) by {summary['user']} "
+            f"at {summary['created']}: HTTP {summary['status']} in {summary['duration_ms']:.1f} ms, "
+            f"{summary['query_count']} queries in {summary['db_ms']:.1f} ms"
+        )
+
+        output = io.StringIO()
+        pstats.Stats(path, stream=output).strip_dirs().sort_stats(sort).print_stats(top)
+        self.stdout.write(output.getvalue())
+
+        queries = sorted(summary['queries'], key=lambda query: query['duration_ms'], reverse=True)[:top]
+        if queries:
+            self.stdout.write(f"Slowest queries ({len(queries)} of {summary['query_count']}):")
+            self.stdout.write(f"{'start ms':>10}{'ms':>10}  sql")
+            for query in queries:
+                self.stdout.write(f"{query['start_ms']:>10.1f}{query['duration_ms']:>10.1f}  {' '.join(query['sql'].split())}")
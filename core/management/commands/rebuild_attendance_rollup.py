@@ -0,0 +1,52 @@
+# core/management/commands/rebuild_attendance_rollup.py
+from argparse import ArgumentTypeError
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from core.models import Attendance
+from core.projections import frozen_rollup_before, rebuild_attendance_rollup, check_attendance_rollup
+from core.signals import bulk_write
+
+
+def _date_argument(value):
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ArgumentTypeError(f"'{value}' is not a valid date (YYYY-MM-DD)")
+    return parsed
+
+
+class Command(BaseCommand):
+    help = 'Backfill, rebuild or verify the attendance rollup used by the attendance analytics'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=_date_argument, help='First date to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--end', type=_date_argument, help='Last date to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--check', action='store_true',
+                            help='Only verify the rollup against the attendance table, do not rebuild')
+
+    def handle(self, *args, **options):
+        start, end = options['start'], options['end']
+        if start and end and start > end:
+            raise CommandError('--start must not be after --end')
+        retained = frozen_rollup_before(start)
+        if retained != start:
+            self.stdout.write(self.style.WARNING(
+                f'Attendance before {retained} was expired; its rollup counts are kept as they are'
+            ))
+
+        if options['check']:
+            mismatched = check_attendance_rollup(start, end)
+            if mismatched:
+                for department_id, day, status, expected, actual in mismatched[:20]:
+                    self.stderr.write(
+                        f'department {department_id} {day} {status}: expected {expected}, found {actual}'
+                    )
+                raise CommandError(f'Attendance rollup has {len(mismatched)} mismatched rows')
+            self.stdout.write(self.style.SUCCESS('Attendance rollup is consistent'))
+            return
+
+        self.stdout.write('Rebuilding attendance rollup...')
+        rows = rebuild_attendance_rollup(start, end)
+        bulk_write.send(sender=Attendance)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt attendance rollup with {rows} rows'))
@@ -0,0 +1,30 @@
+# core/management/commands/rebuild_salary_projection.py
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Salary
+from core.projections import rebuild_current_salaries, check_current_salaries
+from core.signals import bulk_write
+
+
+class Command(BaseCommand):
+    help = 'Rebuild or verify the current salary projection used by the salary analytics'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help='Only verify the projection against the salary table, do not rebuild')
+
+    def handle(self, *args, **options):
+        if options['check']:
+            mismatched = check_current_salaries()
+            if mismatched:
+                preview = ', '.join(str(employee_id) for employee_id in mismatched[:20])
+                raise CommandError(
+                    f'Current salary projection is out of sync for {len(mismatched)} employees: {preview}'
+                )
+            self.stdout.write(self.style.SUCCESS('Current salary projection is consistent'))
+            return
+
+        self.stdout.write('Rebuilding current salary projection...')
+        rows = rebuild_current_salaries()
+        bulk_write.send(sender=Salary)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt current salary projection with {rows} rows'))
@@ -0,0 +1,79 @@
+# core/management/commands/search_indexes.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, transaction
+
+from core.models import Attendance, Employee, Performance, Salary
+from core.search import TRIGRAM_INDEXES, forget_trigram_support, trigram_available
+
+# Indexes of the models' Meta that back the search, for databases created before them
+SEARCH_INDEXES = {
+    Employee: [
+        'employee_first_name_prefix_idx', 'employee_last_name_prefix_idx',
+        'employee_email_prefix_idx', 'employee_position_prefix_idx',
+    ],
+    Attendance: ['attendance_notes_search_idx'],
+    Performance: ['performance_search_idx'],
+    Salary: ['salary_notes_search_idx'],
+}
+
+
+def index_exists(cursor, name):
+    cursor.execute("SELECT 1 FROM pg_class WHERE relname = %s AND relkind IN ('i', 'I')", [name])
+    return cursor.fetchone() is not None
+
+
+def is_partitioned(cursor, model):
+    cursor.execute("SELECT relkind = 'p' FROM pg_class WHERE oid = %s::regclass", [model._meta.db_table])
+    return cursor.fetchone()[0]
+
+
+class Command(BaseCommand):
+    help = 'Install pg_trgm if possible and create the missing search indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Only list missing indexes, do not create them')
+
+    def wanted_indexes(self):
+        indexes = [
+            (model, index)
+            for model, names in SEARCH_INDEXES.items()
+            for index in model._meta.indexes if index.name in names
+        ]
+        if trigram_available(connection.alias):
+            indexes += [(model, index) for model, model_indexes in TRIGRAM_INDEXES.items() for index in model_indexes]
+        return indexes
+
+    def install_trigram(self):
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except DatabaseError as exc:
+            self.stdout.write(self.style.WARNING(
+                f'pg_trgm is not available, names are matched by prefix only: {str(exc).strip()}'
+            ))
+        forget_trigram_support()
+
+    def handle(self, *args, **options):
+        if options['check']:
+            with connection.cursor() as cursor:
+                missing = [index.name for model, index in self.wanted_indexes() if not index_exists(cursor, index.name)]
+            if not trigram_available(connection.alias):
+                self.stdout.write(self.style.WARNING('pg_trgm is not installed, names are matched by prefix only'))
+            if missing:
+                raise CommandError(f"Missing search indexes: {', '.join(missing)}")
+            self.stdout.write(self.style.SUCCESS('All search indexes exist'))
+            return
+
+        self.install_trigram()
+        created = 0
+        with connection.cursor() as cursor, connection.schema_editor(atomic=False) as editor:
+            for model, index in self.wanted_indexes():
+                if index_exists(cursor, index.name):
+                    continue
+                # Build without blocking writes, unless that is impossible: inside a
+                # transaction or on a partitioned table
+                concurrently = not connection.in_atomic_block and not is_partitioned(cursor, model)
+                self.stdout.write(f'Creating {index.name}...')
+                editor.execute(index.create_sql(model, editor, concurrently=concurrently))
+                created += 1
+        self.stdout.write(self.style.SUCCESS(f'Created {created} search indexes'))
@@ -0,0 +1,75 @@
+# core/management/commands/warm_analytics_cache.py
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.cache import get_analytics_cache, get_cache_stats
+from core.models import Department
+
+# Backends whose entries live in, and die with, the process that wrote them
+PROCESS_LOCAL_BACKENDS = ('LocMemCache', 'DummyCache')
+
+
+def cached_actions():
+    """Yield (viewset, basename, action, warm per department) for every cached analytics action."""
+    from employee_analytics.urls import router
+
+    for prefix, viewset, basename in router.registry:
+        for extra in viewset.get_extra_actions():
+            if hasattr(extra, 'cached_models'):
+                yield viewset, basename, extra, extra.warm_per_department
+
+
+class Command(BaseCommand):
+    help = 'Precompute the cached analytics responses, or report their cache hit/miss counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stats', action='store_true',
+                            help='Only print the hit/miss counters of the cached endpoints')
+        parser.add_argument('--local', action='store_true',
+                            help='Run even though the analytics cache is local to this process')
+
+    def handle(self, *args, **options):
+        backend = type(get_analytics_cache()).__name__
+        if backend in PROCESS_LOCAL_BACKENDS and not options['local']:
+            # The web workers would neither see the warmed entries nor share their counters
+            raise CommandError(
+                f'The analytics cache ({backend}) is local to each process, so this command can '
+                'neither warm nor inspect the web workers\' cache. Set ANALYTICS_CACHE_BACKEND to a '
+                'shared backend such as Redis, Memcached or the database cache, or pass --local.'
+            )
+        if not options['stats']:
+            self.warm()
+
+        self.stdout.write(f"{'endpoint':<36}{'hits':>8}{'misses':>8}{'hit ratio':>11}")
+        for viewset, basename, extra, per_department in cached_actions():
+            endpoint = f'{basename}-{extra.url_name}'
+            stats = get_cache_stats(endpoint)
+            ratio = '-' if stats['hit_ratio'] is None else f"{stats['hit_ratio']:.1%}"
+            self.stdout.write(f"{endpoint:<36}{stats['hits']:>8}{stats['misses']:>8}{ratio:>11}")
+
+    def warm(self):
+        factory = APIRequestFactory()
+        # Requests are authenticated as an unsaved user; the actions do not depend on who asks
+        user = User(username='analytics-cache-warmer', is_staff=True)
+        department_ids = list(Department.objects.values_list('id', flat=True))
+
+        started = time.perf_counter()
+        warmed = 0
+        for viewset, basename, extra, per_department in cached_actions():
+            endpoint = f'{basename}-{extra.url_name}'
+            view = viewset.as_view({'get': extra.__name__}, basename=basename, throttle_classes=[])
+            params_list = [{'department': pk} for pk in department_ids] if per_department else [{}]
+            for params in params_list:
+                request = factory.get(f'/{endpoint}/', params)
+                force_authenticate(request, user=user)
+                response = view(request)
+                if response.status_code != 200:
+                    self.stderr.write(f'{endpoint} {params}: HTTP {response.status_code}')
+                    continue
+                warmed += 1
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Warmed {warmed} analytics responses in {elapsed:.2f}s'))
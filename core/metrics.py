@@ -0,0 +1,68 @@
+# core/metrics.py
+import os
+
+from django.conf import settings
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+)
+
+# In multiprocess mode every gunicorn worker writes its samples to files in this
+# directory and /metrics aggregates them (see gunicorn.conf.py)
+MULTIPROCESS_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+if MULTIPROCESS_DIR:
+    os.makedirs(MULTIPROCESS_DIR, exist_ok=True)
+
+RESPONSE_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+REQUEST_LATENCY = Histogram(
+    'api_request_duration_seconds', 'Time to serve a request', ['view', 'method']
+)
+REQUEST_DB_TIME = Histogram(
+    'api_request_db_duration_seconds', 'Time spent in SQL queries per request', ['view', 'method']
+)
+RESPONSE_SIZE = Histogram(
+    'api_response_size_bytes', 'Size of response bodies', ['view', 'method'], buckets=RESPONSE_SIZE_BUCKETS
+)
+REQUESTS = Counter('api_requests_total', 'Requests served', ['view', 'method', 'status'])
+THROTTLED = Counter('api_throttled_requests_total', 'Requests rejected by throttling', ['view'])
+CACHE_REQUESTS = Counter(
+    'analytics_cache_requests_total', 'Analytics cache lookups', ['endpoint', 'outcome']
+)
+
+
+def view_label(request):
+    """'<ViewSet>.<action>' for viewset actions, else the URL name of the view."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    cls, actions = getattr(match.func, 'cls', None), getattr(match.func, 'actions', None)
+    if cls is not None and actions:
+        return f"{cls.__name__}.{actions.get(request.method.lower(), request.method.lower())}"
+    return match.view_name or f'{match.func.__module__}.{match.func.__name__}'
+
+
+def observe_request(request, response, duration, db_time):
+    view, method = view_label(request), request.method
+    REQUEST_LATENCY.labels(view, method).observe(duration)
+    REQUEST_DB_TIME.labels(view, method).observe(db_time)
+    REQUESTS.labels(view, method, str(response.status_code)).inc()
+    if response.status_code == 429:
+        THROTTLED.labels(view).inc()
+    if not response.streaming:
+        RESPONSE_SIZE.labels(view, method).observe(len(response.content))
+
+
+def record_cache_lookup(endpoint, outcome):
+    if settings.METRICS_ENABLED:
+        CACHE_REQUESTS.labels(endpoint, outcome).inc()
+
+
+def metrics_view(request):
+    """Prometheus text exposition of the metrics of every worker."""
+    if MULTIPROCESS_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -1,7 +1,15 @@
 # core/models.py
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector
 from django.db import models
+from django.db.models.functions import Upper
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+# Text search configuration of the full-text indexes below; core.search must query
+# the very same to_tsvector() expressions for PostgreSQL to use them
+SEARCH_CONFIG = 'english'
+
 
 class Department(models.Model):
     name = models.CharField(max_length=100)
@@ -25,6 +33,16 @@ class Employee(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['hire_date', 'id'], name='employee_hire_date_id_idx'),
+            # Case-insensitive prefix (type-ahead) matches of the searched fields
+            models.Index(OpClass(Upper('first_name'), name='text_pattern_ops'), name='employee_first_name_prefix_idx'),
+            models.Index(OpClass(Upper('last_name'), name='text_pattern_ops'), name='employee_last_name_prefix_idx'),
+            models.Index(OpClass(Upper('email'), name='text_pattern_ops'), name='employee_email_prefix_idx'),
+            models.Index(OpClass(Upper('position'), name='text_pattern_ops'), name='employee_position_prefix_idx'),
+        ]
+
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
@@ -50,7 +68,14 @@ class Attendance(models.Model):
     notes = models.TextField(blank=True)
 
     class Meta:
+        # On PostgreSQL the table can be range partitioned by month with
+        # `manage.py attendance_partitions convert`; the database primary key is
+        # then (id, date), which is why every unique constraint here includes date
         unique_together = ['employee', 'date']
+        indexes = [
+            models.Index(fields=['date', 'id'], name='attendance_date_id_idx'),
+            GinIndex(SearchVector('notes', config=SEARCH_CONFIG), name='attendance_notes_search_idx'),
+        ]
 
     def __str__(self):
         return f"{self.employee} - {self.date} - {self.status}"
@@ -66,6 +91,15 @@ class Performance(models.Model):
     improvement_areas = models.TextField(blank=True)
     strengths = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['review_date', 'id'], name='performance_review_date_id_idx'),
+            GinIndex(
+                SearchVector('comments', 'strengths', 'improvement_areas', config=SEARCH_CONFIG),
+                name='performance_search_idx'
+            ),
+        ]
+
     def __str__(self):
         return f"{self.employee} - {self.review_date} - Rating: {self.rating}"
 
@@ -82,6 +116,56 @@ class Salary(models.Model):
     class Meta:
         ordering = ['-effective_date']
         verbose_name_plural = 'Salaries'
+        indexes = [
+            models.Index(fields=['employee', 'effective_date'], name='salary_employee_date_idx'),
+            models.Index(fields=['effective_date', 'id'], name='salary_effective_date_id_idx'),
+            GinIndex(SearchVector('notes', config=SEARCH_CONFIG), name='salary_notes_search_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.employee} - ${self.amount} from {self.effective_date}"
+
+
+class CurrentSalary(models.Model):
+    """One row per employee holding their latest and first Salary amounts, kept in sync by core.signals."""
+    employee = models.OneToOneField(Employee, on_delete=models.CASCADE, primary_key=True,
+                                    related_name='latest_salary')
+    salary = models.OneToOneField(Salary, on_delete=models.CASCADE, related_name='+')
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    bonus = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    effective_date = models.DateField()
+    total_bonus = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    initial_amount = models.DecimalField(max_digits=10, decimal_places=2)
+
+    class Meta:
+        verbose_name_plural = 'Current salaries'
+
+    def __str__(self):
+        return f"{self.employee_id} - ${self.amount} since {self.effective_date}"
+
+
+class AttendanceRollup(models.Model):
+    """Attendance counts per (department, date, status), kept in sync by core.signals."""
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, related_name='attendance_rollups')
+    date = models.DateField()
+    status = models.CharField(max_length=10, choices=Attendance.STATUS_CHOICES)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ['department', 'date', 'status']
+        indexes = [
+            models.Index(fields=['date', 'status'], name='attendance_rollup_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.department_id} - {self.date} - {self.status}: {self.count}"
+
+
+class DataVersion(models.Model):
+    """Per-model change counter, bumped after every committed write to that model's table."""
+    label = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
 
     def __str__(self):
-        return f"{self.employee} - ${self.amount} from {self.effective_date}"
\ No newline at end of file
+        return f"{self.label} v{self.version}"
@@ -0,0 +1,295 @@
+# core/pagination.py
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+# Counts above this are never computed exactly
+COUNT_CAP = 10000
+
+
+def estimate_count(queryset, cap=COUNT_CAP):
+    """
+    Return (count, exact) for ``queryset`` without an unbounded COUNT(*). Unfiltered
+    querysets use the planner's row estimate for large tables; filtered ones are
+    counted up to ``cap`` rows.
+    """
+    connection = connections[queryset.db]
+    if not queryset.query.where and connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            # A partitioned table has no rows of its own; its partitions hold the statistics
+            cursor.execute("""
+                SELECT CASE WHEN p.relkind = 'p' THEN (
+                    SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)
+                    FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = p.oid
+                ) ELSE p.reltuples END
+                FROM pg_class p WHERE p.oid = %s::regclass
+            """, [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        if row and row[0] > cap:
+            return int(row[0]), False
+
+    count = queryset.order_by()[:cap + 1].count()
+    if count > cap:
+        return cap, False
+    return count, True
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    Page number pagination that never runs an unbounded COUNT(*). ``count`` comes
+    from estimate_count and is only displayed; whether a next page exists is
+    decided by fetching one row more than the page holds, so every row stays
+    reachable however far the estimate is off.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    # The browsable API's page controls need the exact number of pages
+    display_page_controls = False
+
+    def get_page_number(self, request, paginator=None):
+        value = request.query_params.get(self.page_query_param) or 1
+        if value in self.last_page_strings:
+            raise NotFound('The last page is not supported, follow the next links instead.')
+        try:
+            number = int(value)
+        except (TypeError, ValueError):
+            number = 0
+        if number < 1:
+            raise NotFound('Invalid page.')
+        return number
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        self.request = request
+        self.number = self.get_page_number(request)
+        offset = (self.number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        if not rows and self.number > 1:
+            raise NotFound('Invalid page.')
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        if self.has_next or self.number > 1:
+            count = estimate_count(queryset)[0]
+        else:
+            # A single page holds every row
+            count = len(rows)
+        # At least the rows up to this page exist, whatever the estimate says
+        self.count = max(count, offset + len(rows) + int(self.has_next))
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.page_query_param, self.number + 1)
+
+    def get_previous_link(self):
+        if self.number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.number - 1)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on a composite, index-backed ordering such as (date, id).
+    Each page is a range scan starting after the last row of the previous page,
+    so deep pages cost the same as the first one.
+
+    Views opt in with ``keyset_fields`` (orderable fields that have an index
+    ending in ``id``) and ``keyset_default`` (the ordering used when no
+    ``?ordering=`` is given).
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    count_query_param = 'include_count'
+
+    def get_ordering(self, request, view):
+        """Return the ordering as a tuple of field names, or None if it is not keyset-capable."""
+        keyset_fields = list(getattr(view, 'keyset_fields', [])) + ['id']
+        requested = request.query_params.get(api_settings.ORDERING_PARAM)
+        if not requested:
+            return tuple(getattr(view, 'keyset_default', ('-id',)))
+        if ',' in requested or requested.lstrip('-') not in keyset_fields:
+            return None
+        if requested.lstrip('-') == 'id':
+            return (requested,)
+        tiebreak = '-id' if requested.startswith('-') else 'id'
+        return requested, tiebreak
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, values, reverse):
+        payload = json.dumps({'v': values, 'r': reverse}, cls=DjangoJSONEncoder)
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            values = [
+                model._meta.get_field(name.lstrip('-')).to_python(value)
+                for name, value in zip(self.ordering, payload['v'])
+            ]
+            if len(values) != len(self.ordering):
+                raise ValueError
+            return values, bool(payload['r'])
+        except (TypeError, ValueError, KeyError, ValidationError, FieldDoesNotExist):
+            raise NotFound('Invalid cursor')
+
+    def _seek(self, values, reverse):
+        # Lexicographic "after this row" predicate: (a > x) OR (a = x AND b > y) ...
+        condition = Q()
+        for index, name in enumerate(self.ordering):
+            field = name.lstrip('-')
+            descending = name.startswith('-') != reverse
+            step = Q(**{f'{field}__{"lt" if descending else "gt"}': values[index]})
+            for previous, value in zip(self.ordering[:index], values[:index]):
+                step &= Q(**{previous.lstrip('-'): value})
+            condition |= step
+        return condition
+
+    @staticmethod
+    def _row_value(row, field):
+        return row[field] if isinstance(row, dict) else getattr(row, field)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = self.get_ordering(request, view)
+        self.page_size = self.get_page_size(request)
+        values, reverse = self.decode_cursor(request, queryset.model)
+
+        order_by = self.ordering
+        if reverse:
+            order_by = [name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering]
+        queryset = queryset.order_by(*order_by)
+
+        self.count = None
+        if request.query_params.get(self.count_query_param):
+            self.count = estimate_count(queryset)[0]
+
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, reverse))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        fields = [name.lstrip('-') for name in self.ordering]
+        self.next_position = self.previous_position = None
+        if rows:
+            first = [self._row_value(rows[0], field) for field in fields]
+            last = [self._row_value(rows[-1], field) for field in fields]
+            if has_more or reverse:
+                self.next_position = last
+            if values is not None and (has_more or not reverse):
+                self.previous_position = first
+        return rows
+
+    def get_link(self, position, reverse):
+        if position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(position, reverse))
+
+    def get_paginated_response(self, data):
+        response = OrderedDict([
+            ('next', self.get_link(self.next_position, False)),
+            ('previous', self.get_link(self.previous_position, True)),
+        ])
+        if self.count is not None:
+            response['count'] = self.count
+        response['results'] = data
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'count': {'type': 'integer', 'description': 'Estimated, only with ?include_count=1'},
+                'results': schema,
+            },
+        }
+
+
+class AdaptivePagination(BasePagination):
+    """
+    Chooses keyset or page number pagination per request. ``?paginate=keyset`` or a
+    ``cursor`` parameter select keyset pagination, ``?paginate=page`` or a ``page``
+    parameter page numbers; otherwise the view's ``pagination_mode`` decides.
+    Keyset pagination is only used when the view declares it and the requested
+    ordering is index-backed; anything else falls back to page numbers with an
+    estimated count.
+    """
+
+    def __init__(self):
+        self.delegate = EstimatedCountPagination()
+
+    def select(self, request, view):
+        if not getattr(view, 'keyset_fields', None) and not getattr(view, 'keyset_default', None):
+            return self.delegate
+
+        mode = request.query_params.get('paginate')
+        if mode is None:
+            if KeysetPagination.cursor_query_param in request.query_params:
+                mode = 'keyset'
+            elif PageNumberPagination.page_query_param in request.query_params:
+                mode = 'page'
+            else:
+                mode = getattr(view, 'pagination_mode', 'page')
+
+        keyset = KeysetPagination()
+        if mode == 'keyset' and keyset.get_ordering(request, view) is not None:
+            return keyset
+        return self.delegate
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.delegate = self.select(request, view)
+        return self.delegate.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.delegate.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.delegate.get_paginated_response_schema(schema)
+
+    def __getattr__(self, name):
+        # Template rendering hooks (to_html, display_page_controls...) of the chosen paginator
+        if name == 'delegate':
+            raise AttributeError(name)
+        return getattr(self.delegate, name)
@@ -0,0 +1,209 @@
+# core/partitions.py
+import re
+from datetime import date
+
+from django.db import connection, transaction
+
+from .models import Attendance
+
+DEFAULT_SUFFIX = 'default'
+BOUND_PATTERN = re.compile(r"FROM \('(\d{4}-\d{2}-\d{2})'\) TO \('(\d{4}-\d{2}-\d{2})'\)")
+
+
+class PartitionError(Exception):
+    pass
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _table():
+    return Attendance._meta.db_table
+
+
+def _qn(name):
+    return connection.ops.quote_name(name)
+
+
+def partition_name(month):
+    return f'{_table()}_p{month:%Y_%m}'
+
+
+def is_partitioned(cursor):
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = %s::regclass", [_table()])
+    row = cursor.fetchone()
+    return bool(row) and row[0] == 'p'
+
+
+def list_partitions(cursor):
+    """Return [(name, first day, day after the last)] of the attendance partitions; the default one has no bounds."""
+    cursor.execute("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = %s::regclass
+        ORDER BY pg_get_expr(c.relpartbound, c.oid) = 'DEFAULT', c.relname
+    """, [_table()])
+    partitions = []
+    for name, bound in cursor.fetchall():
+        match = BOUND_PATTERN.search(bound)
+        if match:
+            partitions.append((name, date.fromisoformat(match.group(1)), date.fromisoformat(match.group(2))))
+        else:
+            partitions.append((name, None, None))
+    return partitions
+
+
+def retained_start(cursor):
+    """
+    First day of the earliest monthly partition, or None when attendance is not
+    partitioned. Rows of earlier months were expired, only the rollup still counts them.
+    """
+    if not is_partitioned(cursor):
+        return None
+    return min((first for name, first, after in list_partitions(cursor) if first is not None), default=None)
+
+
+def _create_partition(cursor, month, has_default):
+    table, name = _table(), partition_name(month)
+    upper = add_months(month, 1)
+    default = f'{table}_{DEFAULT_SUFFIX}'
+    # A new range may not overlap rows already sitting in the default partition, so
+    # take the default partition out while its rows for the month are moved over
+    if has_default:
+        cursor.execute(f"ALTER TABLE {_qn(table)} DETACH PARTITION {_qn(default)}")
+    cursor.execute(
+        f"CREATE TABLE {_qn(name)} PARTITION OF {_qn(table)} FOR VALUES FROM (%s) TO (%s)",
+        [month, upper]
+    )
+    if has_default:
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {_qn(default)} WHERE date >= %s AND date < %s RETURNING *) "
+            f"INSERT INTO {_qn(table)} SELECT * FROM moved",
+            [month, upper]
+        )
+        cursor.execute(f"ALTER TABLE {_qn(table)} ATTACH PARTITION {_qn(default)} DEFAULT")
+    return name
+
+
+def convert_attendance_table(months_ahead, today):
+    """
+    Rebuild the attendance table as a PARTITION BY RANGE (date) table with one
+    partition per month from the oldest row to ``months_ahead`` months after
+    ``today`` plus a default partition. The primary key becomes (id, date), as a
+    partitioned table's unique constraints must include the partition key;
+    (employee, date) stays unique. Runs in one transaction holding an exclusive
+    lock on the table. Returns the number of partitions created.
+    """
+    table = _table()
+    legacy = f'{table}_unpartitioned'
+    sequence = f'{table}_id_seq'
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if is_partitioned(cursor):
+            raise PartitionError(f'{table} is already partitioned')
+        cursor.execute(f"LOCK TABLE {_qn(table)} IN ACCESS EXCLUSIVE MODE")
+        # Deferred foreign key checks queued earlier in the transaction would block the DROP below
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+        # Everything but the primary key is recreated on the partitioned table as it was
+        cursor.execute("""
+            SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+            WHERE conrelid = %s::regclass AND contype IN ('u', 'f', 'c')
+            ORDER BY conname
+        """, [table])
+        constraints = cursor.fetchall()
+        cursor.execute("""
+            SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i
+            WHERE i.indrelid = %s::regclass AND NOT i.indisprimary
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+            ORDER BY i.indexrelid
+        """, [table])
+        indexes = [row[0] for row in cursor.fetchall()]
+        cursor.execute(f"SELECT MIN(date), MAX(id) FROM {_qn(table)}")
+        first, max_id = cursor.fetchone()
+
+        cursor.execute(f"ALTER TABLE {_qn(table)} RENAME TO {_qn(legacy)}")
+        cursor.execute(
+            f"CREATE TABLE {_qn(table)} (LIKE {_qn(legacy)} INCLUDING DEFAULTS) PARTITION BY RANGE (date)"
+        )
+
+        month = month_start(min(first or today, today))
+        last = add_months(month_start(today), months_ahead)
+        created = 0
+        while month <= last:
+            _create_partition(cursor, month, has_default=False)
+            month = add_months(month, 1)
+            created += 1
+        cursor.execute(f"CREATE TABLE {_qn(f'{table}_{DEFAULT_SUFFIX}')} PARTITION OF {_qn(table)} DEFAULT")
+
+        cursor.execute(f"INSERT INTO {_qn(table)} SELECT * FROM {_qn(legacy)}")
+        # Dropping the old table frees its index names and its identity sequence
+        cursor.execute(f"DROP TABLE {_qn(legacy)}")
+
+        cursor.execute(f"CREATE SEQUENCE {_qn(sequence)} OWNED BY {_qn(table)}.id")
+        cursor.execute(f"ALTER TABLE {_qn(table)} ALTER COLUMN id SET DEFAULT nextval(%s)", [sequence])
+        cursor.execute("SELECT setval(%s, %s, false)", [sequence, (max_id or 0) + 1])
+
+        cursor.execute(f"ALTER TABLE {_qn(table)} ADD CONSTRAINT {_qn(f'{table}_pkey')} PRIMARY KEY (id, date)")
+        for name, definition in constraints:
+            cursor.execute(f"ALTER TABLE {_qn(table)} ADD CONSTRAINT {_qn(name)} {definition}")
+        for definition in indexes:
+            cursor.execute(definition)
+        cursor.execute(f"ANALYZE {_qn(table)}")
+    return created + 1
+
+
+def create_partitions(months_ahead, today):
+    """Create the missing monthly partitions from ``today``'s month to ``months_ahead`` months later."""
+    with transaction.atomic(), connection.cursor() as cursor:
+        if not is_partitioned(cursor):
+            raise PartitionError(f'{_table()} is not partitioned, run the convert operation first')
+        partitions = list_partitions(cursor)
+        existing = {name for name, lower, upper in partitions}
+        has_default = any(lower is None for name, lower, upper in partitions)
+
+        created = []
+        month = month_start(today)
+        last = add_months(month, months_ahead)
+        while month <= last:
+            if partition_name(month) not in existing:
+                created.append(_create_partition(cursor, month, has_default))
+            month = add_months(month, 1)
+    return created
+
+
+def expire_partitions(retention_months, today, mode='detach', archive_schema='archive', dry_run=False):
+    """
+    Remove the monthly partitions that end before the first day of the month
+    ``retention_months`` months before ``today``. ``mode`` is 'detach' (leave a
+    standalone table), 'archive' (detach and move it to ``archive_schema``) or
+    'drop'. Returns the names of the expired partitions.
+    """
+    table = _table()
+    cutoff = add_months(month_start(today), -retention_months)
+    with transaction.atomic(), connection.cursor() as cursor:
+        if not is_partitioned(cursor):
+            raise PartitionError(f'{table} is not partitioned, run the convert operation first')
+        expired = [
+            name for name, lower, upper in list_partitions(cursor)
+            if upper is not None and upper <= cutoff
+        ]
+        if dry_run:
+            return expired
+
+        if expired and mode == 'archive':
+            cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {_qn(archive_schema)}")
+        for name in expired:
+            cursor.execute(f"ALTER TABLE {_qn(table)} DETACH PARTITION {_qn(name)}")
+            if mode == 'archive':
+                cursor.execute(f"ALTER TABLE {_qn(name)} SET SCHEMA {_qn(archive_schema)}")
+            elif mode == 'drop':
+                cursor.execute(f"DROP TABLE {_qn(name)}")
+    return expired
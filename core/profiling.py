@@ -0,0 +1,163 @@
+# core/profiling.py
+import cProfile
+import json
+import os
+import time
+import uuid
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .instrumentation import start_query_timeline, stop_query_timeline
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_PARAM = 'profile'
+SQL_LENGTH = 2000
+
+
+def get_profile_dir():
+    return str(settings.PROFILE_DIR)
+
+
+def is_staff_request(request):
+    """Authenticate ``request`` the way the API views will and tell whether it comes from a staff user."""
+    drf_request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+    try:
+        return drf_request.user.is_staff
+    except APIException:
+        return False
+
+
+def save_profile(profiler, summary):
+    """Write <id>.prof (cProfile stats) and <id>.json (request summary and SQL timeline); return the id."""
+    directory = get_profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    profiler.dump_stats(os.path.join(directory, f'{profile_id}.prof'))
+    with open(os.path.join(directory, f'{profile_id}.json'), 'w') as handle:
+        json.dump({'id': profile_id, **summary}, handle, indent=2)
+    return profile_id
+
+
+def list_profiles(limit=None):
+    """Summaries of the stored profiles, most recent first."""
+    directory = get_profile_dir()
+    if not os.path.isdir(directory):
+        return []
+    names = sorted((name for name in os.listdir(directory) if name.endswith('.json')), reverse=True)
+    profiles = []
+    for name in names[:limit]:
+        with open(os.path.join(directory, name)) as handle:
+            profiles.append(json.load(handle))
+    return profiles
+
+
+def load_profile(profile_id):
+    """Return (summary, path of the .prof file); raises FileNotFoundError for unknown ids."""
+    directory = get_profile_dir()
+    with open(os.path.join(directory, f'{profile_id}.json')) as handle:
+        summary = json.load(handle)
+    return summary, os.path.join(directory, f'{profile_id}.prof')
+
+
+class ProfilingMiddleware:
+    """
+    Run requests carrying an ``X-Profile: 1`` header or ``?profile=1`` under
+    cProfile when they come from a staff user, and store the profile with the
+    request's SQL timeline under PROFILE_DIR; the response names it in the
+    X-Profile-Id header. Other requests go straight through. Only the request
+    thread is profiled, so under ASGI, work done in sync_to_async threads is
+    missing and other requests served by the event loop meanwhile are included.
+    Removed from the stack when PROFILING_ENABLED is off.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def requested(self, request):
+        return request.headers.get(PROFILE_HEADER) == '1' or request.GET.get(PROFILE_PARAM) == '1'
+
+    def start(self, request):
+        """Start recording the SQL timeline and profiling; returns None if another profiler is active."""
+        recorder, token = start_query_timeline(request)
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is active in this thread
+            stop_query_timeline(token)
+            return None
+        return recorder, token, profiler, started
+
+    def stop(self, profiling):
+        recorder, token, profiler, started = profiling
+        profiler.disable()
+        stop_query_timeline(token)
+
+    def finish(self, request, response, profiling):
+        recorder, token, profiler, started = profiling
+        duration = time.perf_counter() - started
+
+        offset = started - recorder.started
+        queries = [
+            {
+                'start_ms': round((query_start - offset) * 1000, 3),
+                'duration_ms': round(elapsed * 1000, 3),
+                'sql': sql[:SQL_LENGTH],
+            }
+            for query_start, elapsed, sql in recorder.timeline
+        ]
+        match = getattr(request, 'resolver_match', None)
+        profile_id = save_profile(profiler, {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'view': match.view_name if match else None,
+            'user': request.user.get_username(),
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 3),
+            'query_count': len(queries),
+            'db_ms': round(sum(query['duration_ms'] for query in queries), 3),
+            'queries': queries,
+        })
+        response['X-Profile-Id'] = profile_id
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.requested(request) or not is_staff_request(request):
+            return self.get_response(request)
+
+        profiling = self.start(request)
+        if profiling is None:
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            self.stop(profiling)
+        return self.finish(request, response, profiling)
+
+    async def __acall__(self, request):
+        if not self.requested(request) or not await sync_to_async(is_staff_request)(request):
+            return await self.get_response(request)
+
+        profiling = self.start(request)
+        if profiling is None:
+            return await self.get_response(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.stop(profiling)
+        return await sync_to_async(self.finish)(request, response, profiling)
@@ -0,0 +1,235 @@
+# core/projections.py
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+
+from .models import Employee, Attendance, Salary, CurrentSalary, AttendanceRollup
+from .partitions import retained_start
+
+
+def refresh_current_salary(employee_id):
+    """Recompute the CurrentSalary row of a single employee from their salary history."""
+    with transaction.atomic():
+        # Lock the employee so concurrent salary writes for them apply one at a time
+        if not Employee.objects.select_for_update().filter(id=employee_id).exists():
+            return
+
+        salaries = Salary.objects.filter(employee_id=employee_id)
+        latest = salaries.order_by('-effective_date', '-id').first()
+        initial = salaries.order_by('effective_date', 'id').first()
+
+        if latest is None:
+            CurrentSalary.objects.filter(employee_id=employee_id).delete()
+            return
+
+        total_bonus = salaries.aggregate(total=Coalesce(Sum('bonus'), Decimal('0')))['total']
+        CurrentSalary.objects.update_or_create(
+            employee_id=employee_id,
+            defaults={
+                'salary': latest,
+                'amount': latest.amount,
+                'bonus': latest.bonus,
+                'effective_date': latest.effective_date,
+                'total_bonus': total_bonus,
+                'initial_amount': initial.amount,
+            }
+        )
+
+
+# Latest salary per employee (ties on effective_date go to the newest row) plus
+# the bonus total and the first salary over the whole history, in a single scan
+# and sort of the salary table.
+LATEST_SALARIES_SQL = """
+    SELECT DISTINCT ON (s.employee_id)
+           s.employee_id, s.id, s.amount, s.bonus, s.effective_date,
+           SUM(s.bonus) OVER (PARTITION BY s.employee_id) AS total_bonus,
+           LAST_VALUE(s.amount) OVER (
+               PARTITION BY s.employee_id ORDER BY s.effective_date DESC, s.id DESC
+               ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+           ) AS initial_amount
+    FROM {salary} s
+    ORDER BY s.employee_id, s.effective_date DESC, s.id DESC
+"""
+
+
+def _latest_salaries_sql():
+    return LATEST_SALARIES_SQL.format(salary=Salary._meta.db_table)
+
+
+def rebuild_current_salaries():
+    """Rebuild the whole projection from the salary table. Returns the number of rows written."""
+    projection = CurrentSalary._meta.db_table
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {projection}")
+        cursor.execute(
+            f"INSERT INTO {projection} "
+            f"(employee_id, salary_id, amount, bonus, effective_date, total_bonus, initial_amount) "
+            f"{_latest_salaries_sql()}"
+        )
+        return cursor.rowcount
+
+
+def check_current_salaries():
+    """
+    Compare the projection with the salary table and return the ids of employees whose
+    projected row is missing, stale or orphaned. An empty list means the projection is consistent.
+    """
+    projection = CurrentSalary._meta.db_table
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT COALESCE(expected.employee_id, actual.employee_id)
+            FROM ({_latest_salaries_sql()}) expected
+            FULL OUTER JOIN {projection} actual ON actual.employee_id = expected.employee_id
+            WHERE expected.employee_id IS NULL
+               OR actual.employee_id IS NULL
+               OR actual.salary_id <> expected.id
+               OR actual.amount <> expected.amount
+               OR actual.bonus <> expected.bonus
+               OR actual.effective_date <> expected.effective_date
+               OR actual.total_bonus <> expected.total_bonus
+               OR actual.initial_amount <> expected.initial_amount
+            ORDER BY 1
+        """)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def apply_attendance_deltas(deltas):
+    """
+    Apply count changes to the attendance rollup. ``deltas`` maps
+    (department_id, date, status) to the number of rows added (positive) or removed (negative).
+    """
+    rollup = AttendanceRollup._meta.db_table
+    increments = [(key, delta) for key, delta in deltas.items() if delta > 0]
+    decrements = [(key, delta) for key, delta in deltas.items() if delta < 0]
+
+    with connection.cursor() as cursor:
+        if increments:
+            placeholders = ', '.join(['(%s, %s, %s, %s)'] * len(increments))
+            params = [value for (department_id, day, status), delta in increments
+                      for value in (department_id, day, status, delta)]
+            cursor.execute(
+                f"INSERT INTO {rollup} (department_id, date, status, count) VALUES {placeholders} "
+                f"ON CONFLICT (department_id, date, status) "
+                f"DO UPDATE SET count = {rollup}.count + EXCLUDED.count",
+                params
+            )
+        # Removals only ever touch existing rows, so a cascading department delete
+        # cannot resurrect a rollup row for the department being removed
+        for (department_id, day, status), delta in decrements:
+            cursor.execute(
+                f"UPDATE {rollup} SET count = count + %s "
+                f"WHERE department_id = %s AND date = %s AND status = %s",
+                [delta, department_id, day, status]
+            )
+
+
+def move_employee_attendance(employee_id, old_department_id, new_department_id):
+    """Move an employee's attendance counts to another department after a transfer."""
+    deltas = {}
+    history = Attendance.objects.filter(employee_id=employee_id).values('date', 'status').annotate(
+        total=Count('id')
+    ).order_by()
+    for row in history:
+        deltas[(old_department_id, row['date'], row['status'])] = -row['total']
+        deltas[(new_department_id, row['date'], row['status'])] = row['total']
+    apply_attendance_deltas(deltas)
+
+
+def _attendance_counts_sql(start, end):
+    conditions, params = [], []
+    if start:
+        conditions.append("a.date >= %s")
+        params.append(start)
+    if end:
+        conditions.append("a.date <= %s")
+        params.append(end)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    sql = f"""
+        SELECT e.department_id, a.date, a.status, COUNT(*) AS count
+        FROM {Attendance._meta.db_table} a
+        JOIN {Employee._meta.db_table} e ON e.id = a.employee_id
+        {where}
+        GROUP BY e.department_id, a.date, a.status
+    """
+    return sql, params
+
+
+def _rollup_range_filter(start, end):
+    conditions, params = [], []
+    if start:
+        conditions.append("date >= %s")
+        params.append(start)
+    if end:
+        conditions.append("date <= %s")
+        params.append(end)
+    return ' AND '.join(conditions) or 'TRUE', params
+
+
+def frozen_rollup_before(start=None):
+    """
+    Return ``start`` moved past the expired attendance months, whose rollup counts
+    are frozen: their rows are gone, so rebuilding them would erase the counts.
+    """
+    with connection.cursor() as cursor:
+        retained = retained_start(cursor)
+    if retained is None or (start is not None and start >= retained):
+        return start
+    return retained
+
+
+def rebuild_attendance_rollup(start=None, end=None):
+    """
+    Rebuild the attendance rollup from the attendance table, optionally only for
+    dates between ``start`` and ``end``. Months whose partitions were expired are
+    kept as they are. Returns the number of rollup rows written.
+    """
+    start = frozen_rollup_before(start)
+    if start is not None and end is not None and start > end:
+        return 0
+    rollup = AttendanceRollup._meta.db_table
+    counts_sql, counts_params = _attendance_counts_sql(start, end)
+    range_sql, range_params = _rollup_range_filter(start, end)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {rollup} WHERE {range_sql}", range_params)
+        cursor.execute(
+            f"INSERT INTO {rollup} (department_id, date, status, count) {counts_sql}",
+            counts_params
+        )
+        return cursor.rowcount
+
+
+def check_attendance_rollup(start=None, end=None):
+    """
+    Compare the rollup with the attendance table and return the mismatching
+    (department_id, date, status, expected, actual) tuples. Rows counted as zero are
+    ignored, and so are the frozen counts of expired months.
+    """
+    start = frozen_rollup_before(start)
+    if start is not None and end is not None and start > end:
+        return []
+    rollup = AttendanceRollup._meta.db_table
+    counts_sql, counts_params = _attendance_counts_sql(start, end)
+    range_sql, range_params = _rollup_range_filter(start, end)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT COALESCE(expected.department_id, actual.department_id),
+                   COALESCE(expected.date, actual.date),
+                   COALESCE(expected.status, actual.status),
+                   COALESCE(expected.count, 0),
+                   COALESCE(actual.count, 0)
+            FROM ({counts_sql}) expected
+            FULL OUTER JOIN (SELECT * FROM {rollup} WHERE {range_sql}) actual
+              ON actual.department_id = expected.department_id
+             AND actual.date = expected.date
+             AND actual.status = expected.status
+            WHERE COALESCE(expected.count, 0) <> COALESCE(actual.count, 0)
+            ORDER BY 2, 1, 3
+        """, counts_params + range_params)
+        return cursor.fetchall()
@@ -0,0 +1,83 @@
+# core/scorecards.py
+from decimal import Decimal
+
+from django.db.models import Avg, Count, Q, F, Func, Value
+from django.db.models import FloatField, IntegerField, ExpressionWrapper
+from django.db.models.functions import Cast, Coalesce, Greatest, NullIf, Power
+
+from .models import Attendance, Performance
+
+
+class DaysSince(Func):
+    """Whole days from a date expression to today."""
+    template = '(CURRENT_DATE - %(expressions)s)'
+    output_field = IntegerField()
+
+
+def with_salary_growth(queryset):
+    """
+    Annotate employees with initial_salary, current_salary, growth_percentage,
+    salary_cagr (compound annual growth since hire, in percent) and total_bonus.
+    Everything comes from one join to the current salary projection, so the whole
+    company is ranked in a single query. Employees without salaries get NULLs.
+    """
+    years_employed = Cast(Greatest(DaysSince('hire_date'), Value(0)), FloatField()) / Value(365.25)
+    salary_ratio = Cast(F('current_salary'), FloatField()) / Cast(NullIf(F('initial_salary'), Value(0)), FloatField())
+    return queryset.annotate(
+        initial_salary=F('latest_salary__initial_amount'),
+        current_salary=F('latest_salary__amount'),
+        total_bonus=Coalesce(F('latest_salary__total_bonus'), Value(Decimal('0'))),
+    ).annotate(
+        growth_percentage=ExpressionWrapper(
+            (F('current_salary') - F('initial_salary')) * Value(Decimal('100')) / NullIf(F('initial_salary'), Value(0)),
+            output_field=FloatField()
+        ),
+        salary_cagr=ExpressionWrapper(
+            (Power(salary_ratio, Value(1.0) / NullIf(years_employed, Value(0.0))) - Value(1.0)) * Value(100.0),
+            output_field=FloatField()
+        ),
+    )
+
+
+def attach_scorecards(employees):
+    """
+    Set the attendance and performance metrics of the detail analytics actions on
+    each of ``employees``; salary growth comes from with_salary_growth(). Runs two
+    grouped queries whatever the number of employees.
+    """
+    ids = [employee.id for employee in employees]
+
+    attendance = {
+        row['employee_id']: row
+        for row in Attendance.objects.filter(employee_id__in=ids).values('employee_id').annotate(
+            present_count=Count('id', filter=Q(status='present')),
+            absent_count=Count('id', filter=Q(status='absent')),
+            late_count=Count('id', filter=Q(status='late')),
+            total_days=Count('id'),
+        ).order_by()
+    }
+    performance = {
+        row['employee_id']: row
+        for row in Performance.objects.filter(employee_id__in=ids).values('employee_id').annotate(
+            average_rating=Avg('rating'),
+            goals_met_count=Count('id', filter=Q(goals_met=True)),
+            total_reviews=Count('id'),
+        ).order_by()
+    }
+
+    for employee in employees:
+        counts = attendance.get(employee.id, {})
+        employee.present_count = counts.get('present_count', 0)
+        employee.absent_count = counts.get('absent_count', 0)
+        employee.late_count = counts.get('late_count', 0)
+        employee.total_days = counts.get('total_days', 0)
+        employee.attendance_rate = (
+            employee.present_count * 100.0 / employee.total_days if employee.total_days else 0.0
+        )
+
+        reviews = performance.get(employee.id, {})
+        employee.average_rating = float(reviews.get('average_rating') or 0)
+        employee.goals_met_count = reviews.get('goals_met_count', 0)
+        employee.total_reviews = reviews.get('total_reviews', 0)
+
+    return employees
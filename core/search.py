@@ -0,0 +1,152 @@
+# core/search.py
+import re
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db import connections
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.functions import Greatest
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+from .models import SEARCH_CONFIG, Employee
+
+TERM_PATTERN = re.compile(r'[^\W_]+')
+MAX_TERMS = 10
+# Stems of a word lose at most this many characters, and keep at least MIN_STEM_LENGTH
+STEM_SUFFIX_LENGTH = 4
+MIN_STEM_LENGTH = 3
+
+# Fuzzy, indexed matching of names and email; needs the pg_trgm extension, so
+# `manage.py search_indexes` creates them instead of syncdb
+TRIGRAM_INDEXES = {
+    Employee: [
+        GinIndex(
+            fields=['first_name', 'last_name', 'email', 'position'],
+            opclasses=['gin_trgm_ops'] * 4,
+            name='employee_name_trgm_idx',
+        ),
+    ],
+}
+
+# {database alias: whether pg_trgm is installed}
+_trigram_support = {}
+
+
+def trigram_available(using):
+    if using not in _trigram_support:
+        with connections[using].cursor() as cursor:
+            cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+            _trigram_support[using] = cursor.fetchone()[0]
+    return _trigram_support[using]
+
+
+def forget_trigram_support():
+    _trigram_support.clear()
+
+
+def search_terms(text):
+    return TERM_PATTERN.findall(text)[:MAX_TERMS]
+
+
+def prefix_query(terms):
+    """Full-text query matching all ``terms``, the last one as a prefix of what is still being typed."""
+    last = terms[-1]
+    # The index holds stems, which can be shorter than the typed prefix ('communicat'
+    # of 'communication' is stored as 'communic'), so shorter prefixes match exactly
+    stems = [last[:length] for length in range(len(last) - 1, max(MIN_STEM_LENGTH, len(last) - STEM_SUFFIX_LENGTH) - 1, -1)]
+    raw = ' & '.join([*terms[:-1], '(' + ' | '.join([f'{last}:*', *stems]) + ')'])
+    return SearchQuery(raw, search_type='raw', config=SEARCH_CONFIG)
+
+
+class RankedSearchFilter(filters.SearchFilter):
+    """
+    Indexed, relevance-ranked ``?search=``. Every term must match the start of one
+    of ``search_fields`` (names, email), or, with pg_trgm installed, be similar to
+    a word of one, which tolerates typos; or all terms must match the full-text
+    ``search_vector_fields``, the last term as a prefix. Results are ordered by
+    relevance unless ``?ordering=`` is given. Matches through a relation are
+    found with a subquery on the related table, so each part can use its own
+    indexes.
+    """
+
+    def get_search_vector_fields(self, view):
+        return getattr(view, 'search_vector_fields', ())
+
+    def name_condition(self, fields, terms, trigram):
+        condition = Q()
+        for term in terms:
+            matches = Q()
+            for field in fields:
+                matches |= Q(**{f'{field}__istartswith': term})
+                if trigram:
+                    matches |= Q(**{f'{field}__trigram_word_similar': term})
+            condition &= matches
+        return condition
+
+    def filter_queryset(self, request, queryset, view):
+        terms = search_terms(request.query_params.get(self.search_param, ''))
+        if not terms:
+            return queryset
+        trigram = trigram_available(queryset.db)
+        name_fields = self.get_search_fields(view, request) or ()
+        vector_fields = self.get_search_vector_fields(view)
+
+        # Local fields, and fields per relation, are matched with one condition each
+        groups = {}
+        for field in name_fields:
+            relation, _, name = field.rpartition('__')
+            groups.setdefault(relation, []).append(name)
+        parts = []
+        for relation, fields in groups.items():
+            if not relation:
+                parts.append(self.name_condition(fields, terms, trigram))
+                continue
+            related = queryset.model._meta.get_field(relation).related_model
+            parts.append(Q(**{
+                f'{relation}__in': related._default_manager.filter(
+                    self.name_condition(fields, terms, trigram)
+                ).values('pk')
+            }))
+        vector = query = None
+        if vector_fields:
+            vector, query = SearchVector(*vector_fields, config=SEARCH_CONFIG), prefix_query(terms)
+            parts.append(Q(search_vector=query))
+
+        if len(parts) == 1:
+            queryset = queryset.alias(search_vector=vector) if vector is not None else queryset
+            queryset = queryset.filter(parts[0])
+        else:
+            # OR-ing conditions on different indexes or tables makes PostgreSQL scan
+            # the whole table; a union of the keys each of them matches does not
+            matches = queryset.model._default_manager.all()
+            if vector is not None:
+                matches = matches.alias(search_vector=vector)
+            keys = [matches.filter(part).values('pk') for part in parts]
+            queryset = queryset.filter(pk__in=keys[0].union(*keys[1:]))
+
+        queryset = queryset.annotate(search_rank=self.rank(name_fields, terms, trigram, vector, query))
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by('-search_rank', 'pk')
+        return queryset
+
+    def rank(self, name_fields, terms, trigram, vector, query):
+        ranks = []
+        if name_fields:
+            if trigram:
+                # Mean over the terms of their best word similarity to one of the fields
+                best = [
+                    Greatest(*[TrigramWordSimilarity(term, field) for field in name_fields])
+                    if len(name_fields) > 1 else TrigramWordSimilarity(term, name_fields[0])
+                    for term in terms
+                ]
+                ranks.append(sum(best[1:], best[0]) / len(terms))
+            else:
+                ranks.append(Case(
+                    When(self.name_condition(name_fields, terms, False), then=Value(1.0)),
+                    default=Value(0.0), output_field=FloatField()
+                ))
+        if vector is not None:
+            ranks.append(SearchRank(vector, query))
+        return sum(ranks[1:], ranks[0])
+
@@ -44,13 +44,28 @@ class SalarySerializer(serializers.ModelSerializer):
 
 
 # Serializers for analytics
+class SalaryBucketSerializer(serializers.Serializer):
+    min_salary = serializers.DecimalField(max_digits=12, decimal_places=2)
+    max_salary = serializers.DecimalField(max_digits=12, decimal_places=2)
+    count = serializers.IntegerField()
+
+
 class DepartmentAnalyticsSerializer(serializers.ModelSerializer):
     employee_count = serializers.IntegerField()
     average_salary = serializers.DecimalField(max_digits=10, decimal_places=2)
+    min_salary = serializers.DecimalField(max_digits=10, decimal_places=2)
+    max_salary = serializers.DecimalField(max_digits=10, decimal_places=2)
+    p25_salary = serializers.DecimalField(max_digits=12, decimal_places=2)
+    median_salary = serializers.DecimalField(max_digits=12, decimal_places=2)
+    p75_salary = serializers.DecimalField(max_digits=12, decimal_places=2)
+    p90_salary = serializers.DecimalField(max_digits=12, decimal_places=2)
+    salary_histogram = SalaryBucketSerializer(many=True)
 
     class Meta:
         model = Department
-        fields = ('id', 'name', 'location', 'employee_count', 'average_salary')
+        fields = ('id', 'name', 'location', 'employee_count', 'average_salary',
+                  'min_salary', 'max_salary', 'p25_salary', 'median_salary', 'p75_salary', 'p90_salary',
+                  'salary_histogram')
 
 
 class EmployeeAttendanceAnalyticsSerializer(serializers.ModelSerializer):
@@ -85,4 +100,37 @@ class SalaryGrowthSerializer(serializers.ModelSerializer):
     class Meta:
         model = Employee
         fields = ('id', 'first_name', 'last_name', 'initial_salary',
-                  'current_salary', 'growth_percentage', 'total_bonus')
\ No newline at end of file
+                  'current_salary', 'growth_percentage', 'total_bonus')
+
+
+class SalaryLeaderboardSerializer(SalaryGrowthSerializer):
+    department_name = serializers.ReadOnlyField(source='department.name')
+    salary_cagr = serializers.FloatField()
+
+    class Meta:
+        model = Employee
+        fields = ('id', 'first_name', 'last_name', 'department', 'department_name', 'hire_date',
+                  'initial_salary', 'current_salary', 'growth_percentage', 'salary_cagr', 'total_bonus')
+
+
+class EmployeeScorecardSerializer(serializers.ModelSerializer):
+    department_name = serializers.ReadOnlyField(source='department.name')
+    present_count = serializers.IntegerField()
+    absent_count = serializers.IntegerField()
+    late_count = serializers.IntegerField()
+    total_days = serializers.IntegerField()
+    attendance_rate = serializers.FloatField()
+    average_rating = serializers.FloatField()
+    goals_met_count = serializers.IntegerField()
+    total_reviews = serializers.IntegerField()
+    initial_salary = serializers.DecimalField(max_digits=10, decimal_places=2)
+    current_salary = serializers.DecimalField(max_digits=10, decimal_places=2)
+    growth_percentage = serializers.FloatField()
+    total_bonus = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+    class Meta:
+        model = Employee
+        fields = ('id', 'first_name', 'last_name', 'department', 'department_name',
+                  'present_count', 'absent_count', 'late_count', 'total_days', 'attendance_rate',
+                  'average_rating', 'goals_met_count', 'total_reviews',
+                  'initial_salary', 'current_salary', 'growth_percentage', 'total_bonus')
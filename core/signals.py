@@ -0,0 +1,104 @@
+# core/signals.py
+from django.db.backends.signals import connection_created
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import Signal, receiver
+
+from .cache import bump_data_versions
+from .instrumentation import install_query_recorder
+from .models import Department, Employee, Attendance, Performance, Salary
+from .projections import refresh_current_salary, apply_attendance_deltas, move_employee_attendance
+
+
+@receiver(pre_save, sender=Salary)
+def remember_salary_employee(sender, instance, **kwargs):
+    # An update may move the row to another employee; both projections need a refresh then
+    instance._previous_employee_id = None
+    if instance.pk:
+        instance._previous_employee_id = (
+            Salary.objects.filter(pk=instance.pk).values_list('employee_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Salary)
+def sync_current_salary_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    refresh_current_salary(instance.employee_id)
+    previous = getattr(instance, '_previous_employee_id', None)
+    if previous and previous != instance.employee_id:
+        refresh_current_salary(previous)
+
+
+@receiver(post_delete, sender=Salary)
+def sync_current_salary_on_delete(sender, instance, **kwargs):
+    refresh_current_salary(instance.employee_id)
+
+
+def _attendance_rollup_key(attendance):
+    department_id = Employee.objects.filter(id=attendance.employee_id).values_list(
+        'department_id', flat=True
+    ).first()
+    return department_id, attendance.date, attendance.status
+
+
+@receiver(pre_save, sender=Attendance)
+def remember_attendance_rollup_key(sender, instance, **kwargs):
+    instance._previous_rollup_key = None
+    if instance.pk:
+        instance._previous_rollup_key = Attendance.objects.filter(pk=instance.pk).values_list(
+            'employee__department_id', 'date', 'status'
+        ).first()
+
+
+@receiver(post_save, sender=Attendance)
+def sync_attendance_rollup_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    deltas = {}
+    previous = getattr(instance, '_previous_rollup_key', None)
+    if previous:
+        deltas[previous] = -1
+    key = _attendance_rollup_key(instance)
+    deltas[key] = deltas.get(key, 0) + 1
+    apply_attendance_deltas(deltas)
+
+
+@receiver(post_delete, sender=Attendance)
+def sync_attendance_rollup_on_delete(sender, instance, **kwargs):
+    apply_attendance_deltas({_attendance_rollup_key(instance): -1})
+
+
+@receiver(pre_save, sender=Employee)
+def remember_employee_department(sender, instance, **kwargs):
+    instance._previous_department_id = None
+    if instance.pk:
+        instance._previous_department_id = Employee.objects.filter(pk=instance.pk).values_list(
+            'department_id', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=Employee)
+def sync_attendance_rollup_on_transfer(sender, instance, created=False, raw=False, **kwargs):
+    previous = getattr(instance, '_previous_department_id', None)
+    if raw or created or previous is None or previous == instance.department_id:
+        return
+    move_employee_attendance(instance.id, previous, instance.department_id)
+
+
+# Sent by code that writes rows without going through save()/delete(), such as
+# COPY loads, upserts and projection rebuilds: bulk_write.send(sender=Attendance)
+bulk_write = Signal()
+
+VERSIONED_MODELS = (Department, Employee, Attendance, Performance, Salary)
+
+
+def bump_data_version(sender, **kwargs):
+    bump_data_versions(sender)
+
+
+for model in VERSIONED_MODELS:
+    for signal in (post_save, post_delete, bulk_write):
+        signal.connect(bump_data_version, sender=model)
+
+
+connection_created.connect(install_query_recorder, dispatch_uid='core.install_query_recorder')
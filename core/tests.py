@@ -1,12 +1,40 @@
 # core/tests.py
-from django.test import TestCase
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.http import HttpResponse
 from django.urls import reverse
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.contrib.auth.models import User
 from rest_framework.test import APIClient
 from rest_framework import status
+from prometheus_client import REGISTRY
+from asgiref.sync import async_to_sync, iscoroutinefunction
+import csv
+import json
+import os
+import tempfile
+import time
+from base64 import b64encode
 from datetime import date, timedelta
+from io import StringIO
+from decimal import Decimal
+from unittest import skipUnless
+from unittest.mock import patch
 
-from .models import Department, Employee, Attendance, Performance, Salary
+from . import columnar, db_router
+from .columnar import forget_snapshot, get_snapshot, np
+from .cache import bump_data_versions, get_analytics_cache, get_cache_stats
+from .management.commands.benchmark import ApiBenchmark, api_benchmark_settings, compare_results
+from .pagination import estimate_count
+from .partitions import list_partitions
+from .profiling import ProfilingMiddleware
+from .models import (
+    Department, Employee, Attendance, Performance, Salary, CurrentSalary, AttendanceRollup, DataVersion
+)
 
 
 class ModelTests(TestCase):
@@ -56,6 +84,9 @@ class ModelTests(TestCase):
 
 class APITests(TestCase):
     def setUp(self):
+        # Data versions only move on commit, which never happens inside a TestCase
+        get_analytics_cache().clear()
+
         # Create a user for authentication
         self.user = User.objects.create_user(
             username='testuser',
@@ -118,4 +149,1428 @@ class APITests(TestCase):
             None
         )
         self.assertIsNotNone(department_data)
-        self.assertEqual(department_data['employee_count'], 1)
\ No newline at end of file
+        self.assertEqual(department_data['employee_count'], 1)
+
+
+class CurrentSalaryProjectionTests(TestCase):
+    def setUp(self):
+        get_analytics_cache().clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.department = Department.objects.create(name="Engineering", location="San Francisco")
+        self.employee = Employee.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            phone_number="555-1234",
+            hire_date=date.today() - timedelta(days=730),
+            position="Developer",
+            department=self.department
+        )
+        self.initial = Salary.objects.create(
+            employee=self.employee,
+            amount=Decimal('80000.00'),
+            effective_date=date.today() - timedelta(days=730)
+        )
+        self.raise_ = Salary.objects.create(
+            employee=self.employee,
+            amount=Decimal('90000.00'),
+            bonus=Decimal('5000.00'),
+            effective_date=date.today() - timedelta(days=365)
+        )
+
+    def test_projection_follows_salary_writes(self):
+        current = CurrentSalary.objects.get(employee=self.employee)
+        self.assertEqual(current.salary, self.raise_)
+        self.assertEqual(current.amount, Decimal('90000.00'))
+        self.assertEqual(current.total_bonus, Decimal('5000.00'))
+
+        self.raise_.amount = Decimal('95000.00')
+        self.raise_.save()
+        self.assertEqual(CurrentSalary.objects.get(employee=self.employee).amount, Decimal('95000.00'))
+
+        self.raise_.delete()
+        current = CurrentSalary.objects.get(employee=self.employee)
+        self.assertEqual(current.salary, self.initial)
+        self.assertEqual(current.total_bonus, Decimal('0.00'))
+
+        self.initial.delete()
+        self.assertFalse(CurrentSalary.objects.filter(employee=self.employee).exists())
+
+    def test_salary_stats_reads_projection(self):
+        response = self.client.get(reverse('salary-salary-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['average_salary'], Decimal('90000.00'))
+        self.assertEqual(response.data['min_salary'], Decimal('90000.00'))
+        self.assertEqual(response.data['total_bonus_paid'], Decimal('5000.00'))
+
+        response = self.client.get(reverse('salary-department-salaries'), {'department': self.department.id})
+        self.assertEqual(response.data[0]['total_employees'], 1)
+        self.assertEqual(response.data[0]['average_salary'], Decimal('90000.00'))
+
+    def test_rebuild_and_check_command(self):
+        # bulk_create bypasses the signals, leaving the projection stale
+        Salary.objects.bulk_create([Salary(
+            employee=self.employee,
+            amount=Decimal('99000.00'),
+            effective_date=date.today()
+        )])
+        with self.assertRaises(CommandError):
+            call_command('rebuild_salary_projection', '--check', stdout=StringIO())
+
+        call_command('rebuild_salary_projection', stdout=StringIO())
+        call_command('rebuild_salary_projection', '--check', stdout=StringIO())
+        self.assertEqual(CurrentSalary.objects.get(employee=self.employee).amount, Decimal('99000.00'))
+
+
+class AttendanceRollupTests(TestCase):
+    def setUp(self):
+        get_analytics_cache().clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.engineering = Department.objects.create(name="Engineering", location="San Francisco")
+        self.sales = Department.objects.create(name="Sales", location="Chicago")
+        self.employee = Employee.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            phone_number="555-1234",
+            hire_date=date.today() - timedelta(days=365),
+            position="Developer",
+            department=self.engineering
+        )
+        self.today = date.today()
+        self.yesterday = self.today - timedelta(days=1)
+        self.attendance = Attendance.objects.create(employee=self.employee, date=self.today, status='present')
+        Attendance.objects.create(employee=self.employee, date=self.yesterday, status='late')
+
+    def rollup_counts(self):
+        return {
+            (row.department_id, row.date, row.status): row.count
+            for row in AttendanceRollup.objects.filter(count__gt=0)
+        }
+
+    def test_rollup_follows_attendance_writes(self):
+        self.assertEqual(self.rollup_counts(), {
+            (self.engineering.id, self.today, 'present'): 1,
+            (self.engineering.id, self.yesterday, 'late'): 1,
+        })
+
+        self.attendance.status = 'absent'
+        self.attendance.save()
+        self.employee.department = self.sales
+        self.employee.save()
+        self.assertEqual(self.rollup_counts(), {
+            (self.sales.id, self.today, 'absent'): 1,
+            (self.sales.id, self.yesterday, 'late'): 1,
+        })
+
+        self.attendance.delete()
+        self.assertEqual(self.rollup_counts(), {(self.sales.id, self.yesterday, 'late'): 1})
+
+    def test_summary_endpoints_accept_date_range(self):
+        response = self.client.get(reverse('attendance-status-summary'))
+        self.assertEqual(list(response.data), [
+            {'status': 'late', 'count': 1},
+            {'status': 'present', 'count': 1},
+        ])
+
+        response = self.client.get(reverse('attendance-department-attendance'), {
+            'department': self.engineering.id,
+            'start': self.today.isoformat(),
+            'end': self.today.isoformat(),
+        })
+        self.assertEqual(list(response.data), [{'status': 'present', 'count': 1}])
+
+        response = self.client.get(reverse('attendance-status-summary'), {'start': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rebuild_and_check_command(self):
+        AttendanceRollup.objects.all().delete()
+        with self.assertRaises(CommandError):
+            call_command('rebuild_attendance_rollup', '--check', stdout=StringIO(), stderr=StringIO())
+
+        call_command('rebuild_attendance_rollup', '--start', self.today.isoformat(), stdout=StringIO())
+        self.assertEqual(self.rollup_counts(), {(self.engineering.id, self.today, 'present'): 1})
+
+        call_command('rebuild_attendance_rollup', stdout=StringIO())
+        call_command('rebuild_attendance_rollup', '--check', stdout=StringIO())
+
+
+class AttendanceBulkIngestTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.department = Department.objects.create(name="Engineering", location="San Francisco")
+        self.employee = Employee.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            phone_number="555-1234",
+            hire_date=date(2023, 1, 2),
+            position="Developer",
+            department=self.department
+        )
+        Attendance.objects.create(employee=self.employee, date=date(2024, 3, 1), status='absent')
+
+    def test_csv_upload_upserts_and_reports_errors(self):
+        body = (
+            "employee,date,clock_in,clock_out,status,notes\n"
+            f"{self.employee.id},2024-03-01,09:00,17:00,present,badge fixed\n"
+            f"{self.employee.id},2024-03-04,09:30,17:00,late,\n"
+            f"{self.employee.id},2024-03-05,,,sick,\n"
+            "999999,2024-03-05,,,absent,\n"
+        )
+        response = self.client.post(reverse('attendance-bulk-ingest'), body, content_type='text/csv')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['processed'], 4)
+        self.assertEqual(response.data['upserted'], 2)
+        self.assertEqual([error['line'] for error in response.data['errors']], [4, 5])
+        self.assertIn('status', response.data['errors'][0]['errors'])
+
+        updated = Attendance.objects.get(employee=self.employee, date=date(2024, 3, 1))
+        self.assertEqual((updated.status, updated.notes), ('present', 'badge fixed'))
+        self.assertEqual(Attendance.objects.count(), 2)
+        call_command('rebuild_attendance_rollup', '--check', stdout=StringIO())
+
+    def test_ndjson_upload(self):
+        body = "\n".join([
+            f'{{"employee": {self.employee.id}, "date": "2024-03-04", "status": "leave"}}',
+            'not json',
+        ])
+        response = self.client.post(reverse('attendance-bulk-ingest'), body, content_type='application/x-ndjson')
+
+        self.assertEqual(response.data['upserted'], 1)
+        self.assertEqual(response.data['errors'][0]['line'], 2)
+
+        response = self.client.post(reverse('attendance-bulk-ingest'), {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+    def test_mistyped_fields_are_reported_per_row(self):
+        body = "\n".join([
+            f'{{"employee": {self.employee.id}, "date": 20240101, "status": "present"}}',
+            f'{{"employee": {self.employee.id}, "date": "2024-03-04", "clock_in": 900, "status": "present"}}',
+            f'{{"employee": {self.employee.id}, "date": "2024-03-04", "status": []}}',
+            f'{{"employee": [], "date": "2024-03-04", "status": "present", "notes": {{}}}}',
+            f'{{"employee": {self.employee.id}, "date": "2024-03-04", "status": "late"}}',
+        ])
+        response = self.client.post(reverse('attendance-bulk-ingest'), body, content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['upserted'], 1)
+        self.assertEqual(
+            [sorted(error['errors']) for error in response.data['errors']],
+            [['date'], ['clock_in'], ['status'], ['employee', 'notes']]
+        )
+
+    def test_chunked_upload_without_content_length(self):
+        body = f"employee,date,status\n{self.employee.id},2024-03-04,late\n".encode()
+        response = self.client.post(
+            reverse('attendance-bulk-ingest'), body, content_type='text/csv',
+            CONTENT_LENGTH='', HTTP_TRANSFER_ENCODING='chunked'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['upserted'], 1)
+
+        response = self.client.post(reverse('attendance-bulk-ingest'), b'', content_type='text/csv')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.department = Department.objects.create(name="Engineering", location="San Francisco")
+        self.employee = Employee.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            phone_number="555-1234",
+            hire_date=date(2023, 1, 2),
+            position="Developer",
+            department=self.department
+        )
+        Attendance.objects.create(employee=self.employee, date=date(2024, 3, 1), status='present',
+                                  clock_in="09:00:00", notes='on time, badge "ok"')
+        Attendance.objects.create(employee=self.employee, date=date(2024, 3, 4), status='absent')
+        Salary.objects.create(employee=self.employee, amount=Decimal('80000.00'), effective_date=date(2023, 1, 2))
+
+    def test_csv_export_honors_filters(self):
+        response = self.client.get(reverse('attendance-export'), {'status': 'present'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.reader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0], ['id', 'employee', 'date', 'clock_in', 'clock_out', 'status', 'notes'])
+        self.assertEqual(rows[1][1:], [str(self.employee.id), '2024-03-01', '09:00:00', '', 'present',
+                                       'on time, badge "ok"'])
+        self.assertEqual(len(rows), 2)
+
+    def test_ndjson_export(self):
+        response = self.client.get(reverse('salary-export'), {'output': 'ndjson'})
+
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        record = json.loads(lines[0])
+        self.assertEqual(record['employee'], self.employee.id)
+        self.assertEqual(record['amount'], '80000.00')
+        self.assertEqual(record['effective_date'], '2023-01-02')
+
+        response = self.client.get(reverse('salary-export'), {'output': 'xlsx'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.department = Department.objects.create(name="Engineering", location="San Francisco")
+        self.employees = [
+            Employee.objects.create(
+                first_name="John",
+                last_name=f"Doe {i}",
+                email=f"john.doe{i}@example.com",
+                phone_number="555-1234",
+                hire_date=date(2023, 1, 2),
+                position="Developer",
+                department=self.department
+            )
+            for i in range(3)
+        ]
+        # Several rows share each date so the id tiebreak matters
+        for day in range(8):
+            for employee in self.employees:
+                Attendance.objects.create(employee=employee, date=date(2024, 3, 1) + timedelta(days=day),
+                                          status='present')
+
+    def walk(self, url, params, link='next'):
+        seen = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend((row['date'], row['id']) for row in response.data['results'])
+            if not response.data[link]:
+                return seen, response
+            response = self.client.get(response.data[link])
+
+    def test_keyset_pages_follow_composite_ordering(self):
+        expected = list(Attendance.objects.order_by('-date', '-id').values_list('date', 'id'))
+        expected = [(day.isoformat(), pk) for day, pk in expected]
+
+        seen, last_page = self.walk(reverse('attendance-list'), {'paginate': 'keyset', 'page_size': 5})
+        self.assertEqual(seen, expected)
+        self.assertNotIn('count', last_page.data)
+
+        # Walking back from the last page returns the earlier pages in order
+        back, first_page = self.walk(last_page.data['previous'], {}, link='previous')
+        self.assertEqual(first_page.data['previous'], None)
+        self.assertCountEqual(back, expected[:len(expected) - len(last_page.data['results'])])
+
+        seen, _ = self.walk(reverse('attendance-list'), {'cursor': '', 'paginate': 'keyset',
+                                                         'ordering': 'date', 'include_count': 1})
+        self.assertEqual(seen, sorted(expected))
+
+    def test_page_links_do_not_depend_on_the_estimated_count(self):
+        url = reverse('attendance-list')
+        params = {'employee': self.employees[0].id, 'page_size': 3}
+        for estimate in ((2, False), (1000, False)):
+            with patch('core.pagination.estimate_count', return_value=estimate):
+                seen, last_page = self.walk(url, params)
+            self.assertEqual(len(seen), 8)
+            self.assertEqual(last_page.data['next'], None)
+            self.assertEqual(last_page.data['count'], max(estimate[0], 8))
+        self.assertEqual(self.client.get(url, {**params, 'page': 4}).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(url, {**params, 'page': 0}).status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(url, {**params, 'page': 2})
+        self.assertEqual(response.data['count'], 8)
+        self.assertNotIn('page=', response.data['previous'])
+
+    def test_unindexed_ordering_falls_back_to_page_numbers(self):
+        response = self.client.get(reverse('attendance-list'), {'paginate': 'keyset', 'ordering': 'status'})
+        self.assertEqual(response.data['count'], 24)
+        self.assertIn('results', response.data)
+
+        response = self.client.get(reverse('attendance-list'), {'paginate': 'keyset', 'cursor': 'garbage'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Requests every GET route of the API at two data sizes and fails when the number
+    of queries grows with the number of rows on the page (an N+1 pattern) or
+    exceeds MAX_QUERIES.
+    """
+    MAX_QUERIES = 6
+    PAGE_SIZE = 100
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.department = Department.objects.create(name="Engineering", location="San Francisco")
+        self.employee_count = 0
+
+    def add_employees(self, count):
+        for _ in range(count):
+            self.employee_count += 1
+            employee = Employee.objects.create(
+                first_name="John",
+                last_name=f"Doe {self.employee_count}",
+                email=f"john.doe{self.employee_count}@example.com",
+                phone_number="555-1234",
+                hire_date=date(2022, 1, 3),
+                position="Developer",
+                department=self.department
+            )
+            for day in range(3):
+                Attendance.objects.create(employee=employee, date=date(2024, 3, 4) + timedelta(days=day),
+                                          status='present', clock_in="09:00:00", clock_out="17:00:00")
+            for month in (1, 7):
+                Performance.objects.create(employee=employee, review_date=date(2023, month, 1),
+                                           reviewer=self.department.manager, rating=4,
+                                           comments="Solid work", goals_met=True)
+                Salary.objects.create(employee=employee, amount=Decimal('80000.00') + month,
+                                      effective_date=date(2022 + month // 7, 1, 3), bonus=Decimal('100.00'))
+            if self.department.manager is None:
+                self.department.manager = employee
+                self.department.save()
+
+    def routes(self):
+        from employee_analytics.urls import router
+
+        for prefix, viewset, basename in router.registry:
+            model = viewset.queryset.model
+            instance = model.objects.order_by('id').first()
+            yield f'{basename}-list', {}, {'page_size': self.PAGE_SIZE}
+            yield f'{basename}-detail', {'pk': instance.pk}, {}
+            for extra in viewset.get_extra_actions():
+                if 'get' not in extra.mapping:
+                    continue
+                kwargs = {'pk': instance.pk} if extra.detail else {}
+                params = {'department': self.department.id, 'page_size': self.PAGE_SIZE}
+                yield f'{basename}-{extra.url_name}', kwargs, params
+
+    def count_queries(self):
+        counts = {}
+        for name, kwargs, params in self.routes():
+            # Every request would otherwise count against the user throttle, and
+            # analytics would be answered from the cache or the columnar snapshot
+            cache.clear()
+            get_analytics_cache().clear()
+            forget_snapshot()
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(reverse(name, kwargs=kwargs), params)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, name)
+            counts[name] = len(context.captured_queries)
+        return counts
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.add_employees(2)
+        small = self.count_queries()
+        self.add_employees(10)
+        large = self.count_queries()
+
+        for name, count in small.items():
+            with self.subTest(endpoint=name):
+                self.assertEqual(large[name], count, f'{name} issues more queries for more rows')
+                self.assertLessEqual(count, self.MAX_QUERIES)
+
+
+class FastReadPathTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.department = Department.objects.create(name="Engineering", location="San Francisco")
+        self.employee = Employee.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            phone_number="555-1234",
+            hire_date=date(2023, 1, 2),
+            position="Developer",
+            department=self.department
+        )
+        self.department.manager = self.employee
+        self.department.save()
+        Attendance.objects.create(employee=self.employee, date=date(2024, 3, 1), status='present',
+                                  clock_in="09:00:00")
+        # A review without reviewer exercises the omitted reviewer_name key
+        Performance.objects.create(employee=self.employee, review_date=date(2024, 1, 1), rating=4,
+                                   comments="Good", reviewer=None)
+        Performance.objects.create(employee=self.employee, review_date=date(2024, 6, 1), rating=5,
+                                   comments="Great", reviewer=self.employee)
+        Salary.objects.create(employee=self.employee, amount=Decimal('80000.50'), effective_date=date(2023, 1, 2))
+
+    def test_fast_path_matches_serializer_output(self):
+        for basename in ['department', 'employee', 'attendance', 'performance', 'salary']:
+            with self.subTest(endpoint=basename):
+                # Stay under the user throttle
+                cache.clear()
+                url = reverse(f'{basename}-list')
+                self.assertEqual(self.client.get(url, {'fast': 1}).content, self.client.get(url).content)
+                self.assertEqual(
+                    self.client.get(url, {'fast': 1, 'paginate': 'keyset'}).content,
+                    self.client.get(url, {'paginate': 'keyset'}).content
+                )
+
+                pk = self.client.get(url).data['results'][0]['id']
+                url = reverse(f'{basename}-detail', kwargs={'pk': pk})
+                self.assertEqual(self.client.get(url, {'fast': 1}).content, self.client.get(url).content)
+
+        cache.clear()
+        response = self.client.get(reverse('employee-detail', kwargs={'pk': 0}), {'fast': 1})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get('/api/employees/abc/', {'fast': 1})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class AnalyticsCacheTests(TestCase):
+    def setUp(self):
+        get_analytics_cache().clear()
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.department = Department.objects.create(name="Engineering", location="San Francisco")
+        self.employee = Employee.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            phone_number="555-1234",
+            hire_date=date(2022, 1, 3),
+            position="Developer",
+            department=self.department
+        )
+        Performance.objects.create(employee=self.employee, review_date=date(2023, 1, 1),
+                                   rating=4, comments="Solid work", goals_met=True)
+
+    def test_writes_invalidate_cached_responses(self):
+        url = reverse('performance-rating-distribution')
+        self.assertEqual(list(self.client.get(url).data), [{'rating': 4, 'count': 1}])
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(list(response.data), [{'rating': 4, 'count': 1}])
+        # Only the data version lookup reaches the database
+        self.assertFalse(any('core_performance' in query['sql'] for query in context.captured_queries))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Performance.objects.create(employee=self.employee, review_date=date(2023, 7, 1),
+                                       rating=2, comments="Missed targets", goals_met=False)
+        self.assertEqual(DataVersion.objects.get(label='core.performance').version, 1)
+        self.assertEqual(list(self.client.get(url).data), [{'rating': 2, 'count': 1}, {'rating': 4, 'count': 1}])
+        self.assertEqual(get_cache_stats('performance-rating-distribution'),
+                         {'hits': 1, 'misses': 2, 'hit_ratio': 1 / 3})
+
+    def test_bulk_ingest_bumps_attendance_version(self):
+        body = f"employee,date,status\n{self.employee.id},2024-03-04,present\n"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('attendance-bulk-ingest'), data=body, content_type='text/csv')
+        self.assertEqual(DataVersion.objects.get(label='core.attendance').version, 1)
+
+    def test_conditional_get_answers_not_modified(self):
+        url = reverse('employee-list')
+        response = self.client.get(url)
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(len(context.captured_queries), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employee.position = "Lead Developer"
+            self.employee.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+        response = self.client.get(reverse('department-analytics'),
+                                   HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_department_rename_invalidates_employee_analytics(self):
+        Salary.objects.create(employee=self.employee, amount=Decimal('80000.00'),
+                              effective_date=date(2022, 1, 3), bonus=Decimal('0'))
+        for name in ('employee-salary-leaderboard', 'employee-scorecards'):
+            rows = self.client.get(reverse(name)).data
+            rows = rows['results'] if isinstance(rows, dict) else rows
+            self.assertEqual(rows[0]['department_name'], 'Engineering', name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.department.name = 'Platform'
+            self.department.save()
+        for name in ('employee-salary-leaderboard', 'employee-scorecards'):
+            rows = self.client.get(reverse(name)).data
+            rows = rows['results'] if isinstance(rows, dict) else rows
+            self.assertEqual(rows[0]['department_name'], 'Platform', name)
+
+    def test_warm_command(self):
+        out = StringIO()
+        with self.assertRaisesMessage(CommandError, 'local to each process'):
+            call_command('warm_analytics_cache', stdout=StringIO())
+        call_command('warm_analytics_cache', '--local', stdout=out)
+        self.assertIn('Warmed 13 analytics responses', out.getvalue())
+
+        response = self.client.get(reverse('salary-department-salaries'), {'department': self.department.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(get_cache_stats('salary-department-salaries')['hits'], 1)
+
+
+class EmployeeScorecardTests(TestCase):
+    def setUp(self):
+        get_analytics_cache().clear()
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.department = Department.objects.create(name="Engineering", location="San Francisco")
+        self.employees = []
+        for index in range(3):
+            employee = Employee.objects.create(
+                first_name="John",
+                last_name=f"Doe {index}",
+                email=f"john.doe{index}@example.com",
+                phone_number="555-1234",
+                hire_date=date(2022, 1, 3),
+                position="Developer",
+                department=self.department
+            )
+            Attendance.objects.create(employee=employee, date=date(2024, 3, 4), status='present')
+            Attendance.objects.create(employee=employee, date=date(2024, 3, 5), status='late')
+            Performance.objects.create(employee=employee, review_date=date(2023, 1, 1),
+                                       rating=3 + index % 2, comments="Solid work", goals_met=True)
+            Salary.objects.create(employee=employee, amount=Decimal('80000.00'),
+                                  effective_date=date(2022, 1, 3), bonus=Decimal('500.00'))
+            Salary.objects.create(employee=employee, amount=Decimal('88000.00') + index,
+                                  effective_date=date(2023, 1, 3), bonus=Decimal('1000.00'))
+            self.employees.append(employee)
+
+    def test_scorecards_match_detail_actions(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('employee-scorecards'),
+                                       {'department': self.department.id, 'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3)
+        # Data versions, department filter, count, page and two grouped metric queries
+        self.assertEqual(len(context.captured_queries), 6)
+
+        for row in response.data['results']:
+            for name in ('attendance_analytics', 'performance_trend', 'salary_growth'):
+                detail = self.client.get(reverse(f"employee-{name.replace('_', '-')}", kwargs={'pk': row['id']})).data
+                for field, value in detail.items():
+                    self.assertEqual(row[field], value, f'{name}.{field}')
+
+    def test_salary_leaderboard(self):
+        url = reverse('employee-salary-leaderboard')
+        response = self.client.get(url, {'department': self.department.id, 'top': 2})
+        self.assertEqual([row['id'] for row in response.data], [self.employees[2].id, self.employees[1].id])
+
+        leader = response.data[0]
+        self.assertEqual(leader['initial_salary'], '80000.00')
+        self.assertEqual(leader['current_salary'], '88002.00')
+        self.assertAlmostEqual(leader['growth_percentage'], 10.0025)
+        years = (date.today() - date(2022, 1, 3)).days / 365.25
+        self.assertAlmostEqual(leader['salary_cagr'], ((88002 / 80000) ** (1 / years) - 1) * 100)
+        self.assertEqual(leader['total_bonus'], '1500.00')
+
+        response = self.client.get(url, {'sort': '+current_salary'})
+        self.assertEqual([row['id'] for row in response.data], [employee.id for employee in self.employees])
+
+        response = self.client.get(url, {'sort': 'name'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_department_dashboard(self):
+        empty = Department.objects.create(name="Sales", location="Chicago")
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('department-dashboard'))
+        # Data versions plus one query per source
+        self.assertEqual(len(context.captured_queries), 4)
+
+        card, empty_card = response.data
+        self.assertEqual(empty_card['id'], empty.id)
+        self.assertEqual(empty_card['employee_count'], 0)
+        self.assertEqual(empty_card['attendance'], {})
+
+        params = {'department': self.department.id}
+        salaries = self.client.get(reverse('salary-department-salaries'), params).data[0]
+        performance = self.client.get(reverse('performance-department-performance'), params).data[0]
+        attendance = self.client.get(reverse('attendance-department-attendance'), params).data
+        self.assertEqual(card['employee_count'], 3)
+        for field in ('average_salary', 'total_employees', 'total_bonus'):
+            self.assertEqual(card['salary'][field], salaries[field])
+        for field in ('average_rating', 'goals_met_percentage', 'review_count'):
+            self.assertEqual(card['performance'][field], performance[field])
+        self.assertEqual(card['attendance'], {row['status']: row['count'] for row in attendance})
+
+        out = StringIO()
+        call_command('benchmark', 'dashboard', '--repeat', '1', '--target-ms', '10000', stdout=out)
+        self.assertIn('within the 10000 ms target', out.getvalue())
+
+    def test_department_salary_distribution(self):
+        Salary.objects.create(employee=self.employees[0], amount=Decimal('101000.00'),
+                              effective_date=date(2024, 1, 3))
+        response = self.client.get(reverse('department-analytics'), {'bucket_width': '5000'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        card = next(row for row in response.data if row['id'] == self.department.id)
+
+        # Current salaries are 101000, 88001 and 88002; none of the history counts
+        self.assertEqual(card['employee_count'], 3)
+        self.assertEqual(card['min_salary'], '88001.00')
+        self.assertEqual(card['max_salary'], '101000.00')
+        self.assertEqual(card['median_salary'], '88002.00')
+        self.assertEqual(card['p25_salary'], '88001.50')
+        self.assertEqual(card['p90_salary'], '98400.40')
+        self.assertEqual(card['average_salary'], '92334.33')
+        self.assertEqual([bucket['count'] for bucket in card['salary_histogram']], [2, 0, 0, 1])
+        self.assertEqual(card['salary_histogram'][0]['min_salary'], '85000.00')
+
+        response = self.client.get(reverse('department-analytics'), {'bucket_width': '-1'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_scorecards_by_ids(self):
+        ids = f'{self.employees[0].id},{self.employees[2].id}'
+        response = self.client.get(reverse('employee-scorecards'), {'ids': ids})
+        self.assertEqual([row['id'] for row in response.data['results']],
+                         [self.employees[0].id, self.employees[2].id])
+
+        response = self.client.get(reverse('employee-scorecards'), {'ids': 'one,two'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TimeseriesTests(TestCase):
+    def setUp(self):
+        get_analytics_cache().clear()
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.engineering = Department.objects.create(name="Engineering", location="San Francisco")
+        self.sales = Department.objects.create(name="Sales", location="Chicago")
+        self.employees = {}
+        for department in (self.engineering, self.sales):
+            employee = Employee.objects.create(
+                first_name="John",
+                last_name=department.name,
+                email=f"john.{department.name.lower()}@example.com",
+                phone_number="555-1234",
+                hire_date=date(2022, 1, 3),
+                position="Developer",
+                department=department
+            )
+            self.employees[department.name] = employee
+            for day, status_value in ((date(2024, 1, 30), 'present'), (date(2024, 1, 31), 'late'),
+                                      (date(2024, 2, 1), 'present')):
+                Attendance.objects.create(employee=employee, date=day, status=status_value)
+            Performance.objects.create(employee=employee, review_date=date(2024, 1, 15),
+                                       rating=4, comments="Solid work", goals_met=True)
+            Performance.objects.create(employee=employee, review_date=date(2024, 2, 15),
+                                       rating=2, comments="Missed targets", goals_met=False)
+
+    @staticmethod
+    def bucket(period, **counts):
+        row = {'period': period, 'total': 0}
+        row.update({value: 0 for value, label in Attendance.STATUS_CHOICES})
+        row.update(counts)
+        return row
+
+    def test_attendance_timeseries(self):
+        url = reverse('attendance-timeseries')
+        response = self.client.get(url)
+        self.assertEqual(list(response.data), [
+            self.bucket(date(2024, 1, 1), present=2, late=2, total=4),
+            self.bucket(date(2024, 2, 1), present=2, late=0, total=2),
+        ])
+
+        response = self.client.get(url, {'interval': 'week', 'department': self.sales.id})
+        self.assertEqual(list(response.data), [
+            self.bucket(date(2024, 1, 29), present=2, late=1, total=3),
+        ])
+
+        response = self.client.get(url, {
+            'interval': 'day', 'employee': self.employees['Engineering'].id,
+            'start': '2024-01-31', 'end': '2024-01-31',
+        })
+        self.assertEqual(list(response.data), [
+            self.bucket(date(2024, 1, 31), late=1, total=1),
+        ])
+
+        response = self.client.get(url, {'interval': 'year'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rating_trends(self):
+        employee = self.employees['Engineering']
+        Performance.objects.create(employee=employee, review_date=date(2024, 3, 15),
+                                   rating=5, comments="Great quarter", goals_met=True)
+        url = reverse('performance-rating-trends')
+        response = self.client.get(url, {'department': self.engineering.id, 'window': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = response.data['results']
+        self.assertEqual([row['rating'] for row in rows], [4, 2, 5])
+        self.assertEqual([row['rolling_average'] for row in rows], [4.0, 3.0, 3.5])
+        self.assertEqual([row['rating_delta'] for row in rows], [None, -2, 3])
+        self.assertEqual(rows[0]['employee_name'], 'John Engineering')
+        # One slope per employee, in rating points per year
+        self.assertEqual(len({row['trend_slope'] for row in rows}), 1)
+        self.assertGreater(rows[0]['trend_slope'], 0)
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_performance_timeseries(self):
+        response = self.client.get(reverse('performance-timeseries'), {'department': self.engineering.id})
+        self.assertEqual(list(response.data), [
+            {'period': date(2024, 1, 1), 'review_count': 1, 'average_rating': 4.0, 'goals_met_percentage': 100.0},
+            {'period': date(2024, 2, 1), 'review_count': 1, 'average_rating': 2.0, 'goals_met_percentage': 0.0},
+        ])
+
+
+class AttendancePartitionTests(TestCase):
+    def setUp(self):
+        self.department = Department.objects.create(name="Engineering", location="San Francisco")
+        self.employee = Employee.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            phone_number="555-1234",
+            hire_date=date(2020, 1, 6),
+            position="Developer",
+            department=self.department
+        )
+        self.today = date.today()
+        self.old_day = (self.today.replace(day=1) - timedelta(days=400)).replace(day=15)
+        Attendance.objects.create(employee=self.employee, date=self.old_day, status='present')
+        Attendance.objects.create(employee=self.employee, date=self.today, status='late')
+
+    def partitions(self):
+        with connection.cursor() as cursor:
+            return list_partitions(cursor)
+
+    def test_convert_create_and_expire(self):
+        call_command('attendance_partitions', 'convert', '--months-ahead', '1', stdout=StringIO())
+        partitions = self.partitions()
+        self.assertEqual(partitions[0][1], self.old_day.replace(day=1))
+        self.assertEqual(partitions[-1][1:], (None, None))
+        self.assertEqual(Attendance.objects.count(), 2)
+        self.assertEqual(estimate_count(Attendance.objects.all()), (2, True))
+
+        # Ids keep coming from a sequence and (employee, date) stays unique
+        tomorrow = Attendance.objects.create(employee=self.employee, date=self.today + timedelta(days=1),
+                                             status='present')
+        self.assertGreater(tomorrow.id, Attendance.objects.filter(date=self.today).get().id)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Attendance.objects.create(employee=self.employee, date=self.today, status='absent')
+
+        call_command('attendance_partitions', 'create', '--months-ahead', '4', stdout=StringIO())
+        self.assertEqual(len(self.partitions()), len(partitions) + 3)
+
+        out = StringIO()
+        call_command('attendance_partitions', 'expire', '--retention-months', '12', '--drop', stdout=out)
+        self.assertIn('Dropped', out.getvalue())
+        self.assertFalse(Attendance.objects.filter(date=self.old_day).exists())
+        self.assertEqual(Attendance.objects.count(), 2)
+
+        # The expired month keeps its rollup count through rebuilds and checks
+        out = StringIO()
+        call_command('rebuild_attendance_rollup', stdout=out)
+        self.assertIn('its rollup counts are kept', out.getvalue())
+        call_command('rebuild_attendance_rollup', '--check', stdout=StringIO())
+        self.assertEqual(AttendanceRollup.objects.get(date=self.old_day).count, 1)
+        call_command('rebuild_attendance_rollup', '--end', str(self.old_day), stdout=StringIO())
+        self.assertEqual(AttendanceRollup.objects.get(date=self.old_day).count, 1)
+
+    def test_commands_require_partitioned_table(self):
+        with self.assertRaises(CommandError):
+            call_command('attendance_partitions', 'create', stdout=StringIO())
+
+
+class AsyncAnalyticsTests(TransactionTestCase):
+    # The async views query from worker threads with their own connections, which
+    # only see committed data
+    def setUp(self):
+        get_analytics_cache().clear()
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.department = Department.objects.create(name="Engineering", location="San Francisco")
+        employee = Employee.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            phone_number="555-1234",
+            hire_date=date(2022, 1, 3),
+            position="Developer",
+            department=self.department
+        )
+        Attendance.objects.create(employee=employee, date=date(2024, 3, 4), status='present')
+        Attendance.objects.create(employee=employee, date=date(2024, 3, 5), status='late')
+        Performance.objects.create(employee=employee, review_date=date(2023, 1, 1),
+                                   rating=4, comments="Solid work", goals_met=True)
+        Salary.objects.create(employee=employee, amount=Decimal('80000.00'),
+                              effective_date=date(2022, 1, 3), bonus=Decimal('500.00'))
+
+    def test_async_actions_match_sync_actions(self):
+        for name, params in (
+            ('department-dashboard', {'start': '2024-03-05'}),
+            ('department-analytics', {'bucket_width': '5000'}),
+            ('attendance-department-attendance', {'department': self.department.id, 'end': '2024-03-04'}),
+            ('performance-department-performance', {'department': self.department.id}),
+            ('salary-department-salaries', {'department': self.department.id}),
+        ):
+            async_response = self.client.get(reverse(f'async-{name}'), params)
+            get_analytics_cache().clear()
+            sync_response = self.client.get(reverse(name), params)
+            self.assertEqual(async_response.status_code, status.HTTP_200_OK, name)
+            self.assertEqual(async_response.content, sync_response.content, name)
+            self.assertEqual(async_response['ETag'], sync_response['ETag'], name)
+
+    def test_async_actions_share_checks_and_cache(self):
+        url = reverse('async-department-dashboard')
+        response = self.client.get(url, {'start': 'soon'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error', json.loads(response.content))
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        self.assertEqual(APIClient().get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(reverse('department-dashboard')).content, response.content)
+        self.assertEqual(get_cache_stats('department-dashboard')['hits'], 1)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class QueryInstrumentationTests(TestCase):
+    def setUp(self):
+        get_analytics_cache().clear()
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        Department.objects.create(name="Engineering", location="San Francisco")
+
+    def server_timing(self, response):
+        return dict(
+            (metric.split(';')[0], metric) for metric in response['Server-Timing'].split(', ')
+        )
+
+    @override_settings(REQUEST_INSTRUMENTATION_SAMPLE_RATE=1, SLOW_REQUEST_MS=0, SLOW_QUERY_MS=0)
+    def test_sampled_request_reports_queries(self):
+        with self.assertLogs('core.instrumentation', 'WARNING') as logs, \
+                CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('department-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        timing = self.server_timing(response)
+        self.assertEqual(set(timing), {'db', 'db-slowest', 'serialize', 'render', 'total'})
+        self.assertIn(f'desc="{len(context.captured_queries)} queries"', timing['db'])
+
+        events = [json.loads(line.split(':', 2)[2]) for line in logs.output]
+        slow_request = [event for event in events if event['event'] == 'slow_request'][0]
+        self.assertEqual(slow_request['view'], 'department-list')
+        self.assertEqual(slow_request['query_count'], len(context.captured_queries))
+        self.assertIn('serialize_ms', slow_request)
+        self.assertEqual(
+            len([event for event in events if event['event'] == 'slow_query']), len(context.captured_queries)
+        )
+
+    @override_settings(REQUEST_INSTRUMENTATION_SAMPLE_RATE=1)
+    def test_async_view_queries_are_counted(self):
+        response = self.client.get(reverse('async-department-dashboard'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Data versions plus the three queries run concurrently in worker threads
+        self.assertIn('desc="4 queries"', self.server_timing(response)['db'])
+
+    def test_unsampled_request_has_no_header(self):
+        response = self.client.get(reverse('department-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+@override_settings(METRICS_ENABLED=True)
+class MetricsTests(TestCase):
+    def setUp(self):
+        get_analytics_cache().clear()
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        Department.objects.create(name="Engineering", location="San Francisco")
+
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_requests_are_measured_per_viewset_action(self):
+        labels = {'view': 'SalaryViewSet.salary_stats', 'method': 'GET'}
+        requests = self.sample('api_request_duration_seconds_count', **labels)
+        db_time = self.sample('api_request_db_duration_seconds_sum', **labels)
+        misses = self.sample('analytics_cache_requests_total', endpoint='salary-salary-stats', outcome='miss')
+        hits = self.sample('analytics_cache_requests_total', endpoint='salary-salary-stats', outcome='hit')
+
+        for _ in range(2):
+            self.assertEqual(self.client.get(reverse('salary-salary-stats')).status_code, status.HTTP_200_OK)
+
+        self.assertEqual(self.sample('api_request_duration_seconds_count', **labels), requests + 2)
+        self.assertGreater(self.sample('api_request_db_duration_seconds_sum', **labels), db_time)
+        self.assertGreater(self.sample('api_response_size_bytes_count', **labels), 0)
+        self.assertEqual(
+            self.sample('analytics_cache_requests_total', endpoint='salary-salary-stats', outcome='miss'), misses + 1
+        )
+        self.assertEqual(
+            self.sample('analytics_cache_requests_total', endpoint='salary-salary-stats', outcome='hit'), hits + 1
+        )
+
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(
+            'api_request_duration_seconds_count{method="GET",view="SalaryViewSet.salary_stats"}',
+            response.content.decode()
+        )
+
+    def test_throttled_requests_are_counted(self):
+        rejected = self.sample('api_throttled_requests_total', view='DepartmentViewSet.list')
+        # Fill the user's throttle history for the current minute
+        cache.set(f'throttle_user_{self.user.pk}', [time.time()] * 30)
+        response = self.client.get(reverse('department-list'))
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.sample('api_throttled_requests_total', view='DepartmentViewSet.list'), rejected + 1)
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        get_analytics_cache().clear()
+        cache.clear()
+        self.profile_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.profile_dir.cleanup)
+        settings_override = override_settings(PROFILE_DIR=self.profile_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username='staff', password='testpassword', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        Department.objects.create(name="Engineering", location="San Francisco")
+
+    def test_staff_request_is_profiled(self):
+        response = self.client.get(reverse('department-dashboard'), HTTP_X_PROFILE='1')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        profile_id = response['X-Profile-Id']
+
+        with open(f'{self.profile_dir.name}/{profile_id}.json') as handle:
+            summary = json.load(handle)
+        self.assertEqual(summary['view'], 'department-dashboard')
+        self.assertEqual(summary['user'], 'staff')
+        self.assertGreater(summary['query_count'], 0)
+        self.assertEqual(len(summary['queries']), summary['query_count'])
+
+        out = StringIO()
+        call_command('profiles', stdout=out)
+        self.assertIn(profile_id, out.getvalue())
+        out = StringIO()
+        call_command('profiles', profile_id, '--top', '5', stdout=out)
+        self.assertIn('function calls', out.getvalue())
+        self.assertIn('Slowest queries', out.getvalue())
+
+    def test_only_staff_opt_in_requests_are_profiled(self):
+        response = self.client.get(reverse('department-list'))
+        self.assertFalse(response.has_header('X-Profile-Id'))
+
+        user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_authenticate(user=user)
+        response = self.client.get(reverse('department-list'), {'profile': '1'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertEqual(os.listdir(self.profile_dir.name), [])
+
+    def test_async_stack_is_profiled(self):
+        async def view(request):
+            return HttpResponse()
+
+        middleware = ProfilingMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        factory = RequestFactory()
+        response = async_to_sync(middleware)(factory.get('/api/departments/'))
+        self.assertFalse(response.has_header('X-Profile-Id'))
+
+        credentials = b64encode(b'staff:testpassword').decode()
+        request = factory.get('/api/departments/', {'profile': '1'}, HTTP_AUTHORIZATION=f'Basic {credentials}')
+        request.user = self.user
+        response = async_to_sync(middleware)(request)
+        with open(f"{self.profile_dir.name}/{response['X-Profile-Id']}.json") as handle:
+            self.assertEqual(json.load(handle)['user'], 'staff')
+
+
+class ApiBenchmarkTests(TransactionTestCase):
+    def test_every_route_is_measured(self):
+        call_command(
+            'generate_data', bulk=True, clear=True, employees=20, departments=2, attendance_days=5,
+            seed=42, workers=1, stdout=StringIO()
+        )
+        with api_benchmark_settings():
+            routes = ApiBenchmark(requests=2).run()
+
+        for route in ('department.list', 'department.analytics', 'attendance.export', 'salary.salary_stats'):
+            self.assertEqual(routes[route]['status'], 200, route)
+            self.assertEqual(routes[route]['requests'], 2)
+            self.assertGreater(routes[route]['queries'], 0)
+            self.assertGreater(routes[route]['peak_memory_kb'], 0)
+            self.assertLessEqual(routes[route]['p50_ms'], routes[route]['p99_ms'])
+        self.assertEqual(routes['attendance.create']['status'], 201)
+        self.assertEqual(routes['attendance.destroy']['status'], 204)
+        self.assertEqual(routes['attendance.bulk_ingest']['status'], 200)
+        # The benchmark deletes the rows it created
+        self.assertFalse(Attendance.objects.filter(date__gte=date(2100, 1, 1)).exists())
+
+    def test_compare_flags_regressions(self):
+        def result(p95, queries, memory=100, error=None):
+            stats = {'p95_ms': p95, 'queries': queries, 'peak_memory_kb': memory}
+            if error:
+                stats['error'] = error
+            return {'scales': {'1000': {'routes': {'salary.list': stats}}}}
+
+        baseline = result(10, 3)
+        self.assertEqual(compare_results(baseline, result(11, 3), 0.2, 2), [])
+        # Relative increases below the minimum delta are noise
+        self.assertEqual(compare_results(baseline, result(13, 3), 0.2, 5), [])
+        self.assertEqual(
+            compare_results(baseline, result(20, 4, memory=200), 0.2, 2),
+            [('1000', 'salary.list', 'queries', 3, 4), ('1000', 'salary.list', 'p95_ms', 10, 20),
+             ('1000', 'salary.list', 'peak_memory_kb', 100, 200)]
+        )
+        self.assertEqual(
+            compare_results(baseline, result(10, 3, error='HTTP 500'), 0.2, 2),
+            [('1000', 'salary.list', 'error', None, 'HTTP 500')]
+        )
+
+
+# The primary stands in for the replica, so routing is observed through using_replica()
+@override_settings(REPLICA_DATABASE_ALIAS='default', REPLICA_STICKY_SECONDS=60)
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def route(self, request, write=False):
+        seen = []
+
+        def view(request):
+            seen.append(db_router.using_replica())
+            if write:
+                Department.objects.create(name='Ops', location='Berlin')
+                seen.append(db_router.using_replica())
+            return HttpResponse()
+
+        db_router.ReplicaRoutingMiddleware(view)(request)
+        return seen
+
+    def test_reads_use_replica_until_the_client_writes(self):
+        client = {'HTTP_AUTHORIZATION': 'Basic client'}
+        other = {'HTTP_AUTHORIZATION': 'Basic other'}
+        self.assertEqual(self.route(self.factory.get('/api/departments/', **client)), [True])
+        self.assertEqual(self.route(self.factory.post('/api/departments/', **client), write=True), [False, False])
+        # A read-only request that writes switches to the primary from then on
+        self.assertEqual(self.route(self.factory.get('/api/departments/', **other), write=True), [True, False])
+        # Both clients wrote, so their reads stay on the primary for a while
+        self.assertEqual(self.route(self.factory.get('/api/departments/', **client)), [False])
+        self.assertEqual(self.route(self.factory.get('/api/departments/', **other)), [False])
+        self.assertEqual(self.route(self.factory.get('/api/departments/', HTTP_AUTHORIZATION='Basic third')), [True])
+
+        router = db_router.ReplicaRouter()
+        with override_settings(REPLICA_DATABASE_ALIAS='replica'):
+            self.assertEqual(router.db_for_read(Department), 'default')
+            self.assertFalse(router.allow_migrate('replica', 'core'))
+            token = db_router._state.set(db_router.ReplicaState(use_replica=True))
+            try:
+                self.assertEqual(router.db_for_read(Department), 'replica')
+                # Users and sessions are always read from the primary
+                self.assertEqual(router.db_for_read(User), 'default')
+                self.assertEqual(router.db_for_write(Department), 'default')
+                self.assertEqual(router.db_for_read(Department), 'default')
+            finally:
+                db_router._state.reset(token)
+
+    def test_streamed_exports_read_the_replica(self):
+        user = User.objects.create_user(username='testuser', password='testpassword')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        Department.objects.create(name='Ops', location='Berlin')
+        routed = []
+        db_for_read = db_router.ReplicaRouter.db_for_read
+
+        def spy(router, model, **hints):
+            if model._meta.app_label == 'core':
+                routed.append(db_router.using_replica())
+            return db_for_read(router, model, **hints)
+
+        with patch.object(db_router.ReplicaRouter, 'db_for_read', spy):
+            response = client.get(reverse('department-export'))
+            body = b''.join(response.streaming_content)
+        self.assertIn(b'Ops', body)
+        self.assertTrue(routed)
+        self.assertTrue(all(routed), routed)
+
+    def test_unavailable_replica_falls_back_to_primary(self):
+        self.addCleanup(setattr, db_router, '_replica_down_until', 0.0)
+        self.addCleanup(setattr, db_router, '_replica_up_until', 0.0)
+        db_router._replica_down_until = time.monotonic() + 60
+        self.assertEqual(self.route(self.factory.get('/api/departments/')), [False])
+        response = self.client.get(reverse('health_check'))
+        self.assertEqual(response.json()['replica'], 'unavailable')
+
+        db_router._replica_down_until = 0.0
+        self.assertEqual(self.route(self.factory.get('/api/departments/')), [True])
+        # A successful check is reused without connecting again
+        with patch.object(db_router.connections['default'], 'ensure_connection') as connect:
+            self.assertEqual(self.route(self.factory.get('/api/departments/')), [True])
+        connect.assert_not_called()
+        response = self.client.get(reverse('health_check'))
+        self.assertEqual(response.json()['replica'], 'healthy')
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        department = Department.objects.create(name="Engineering", location="San Francisco")
+        self.employees = {}
+        for first_name, last_name in [('Jonathan', 'Smith'), ('Joan', 'Smithers'), ('Mark', 'Jones')]:
+            self.employees[first_name] = Employee.objects.create(
+                first_name=first_name, last_name=last_name, email=f'{first_name.lower()}@example.com',
+                phone_number="555-1234", hire_date=date(2020, 1, 1), position="Developer", department=department
+            )
+
+    def search(self, basename, text, **params):
+        response = self.client.get(reverse(f'{basename}-list'), {'search': text, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_type_ahead_over_names_and_review_text(self):
+        names = [row['first_name'] for row in self.search('employee', 'jo smi').data['results']]
+        self.assertEqual(sorted(names), ['Joan', 'Jonathan'])
+        self.assertEqual(self.search('employee', 'mark@').data['count'], 1)
+
+        mark, joan = self.employees['Mark'], self.employees['Joan']
+        mentoring = Performance.objects.create(
+            employee=mark, review_date=date(2024, 1, 1), rating=4,
+            comments='Mentored the new hires', strengths='Communication'
+        )
+        named = Performance.objects.create(
+            employee=joan, review_date=date(2024, 1, 1), rating=3, comments='Steady year'
+        )
+        Performance.objects.create(employee=mark, review_date=date(2023, 1, 1), rating=3, comments='Quiet year')
+        # The last term matches word prefixes, after stemming
+        self.assertEqual([row['id'] for row in self.search('performance', 'communicat').data['results']], [mentoring.id])
+        self.assertEqual([row['id'] for row in self.search('performance', 'hire').data['results']], [mentoring.id])
+        # Name matches rank above text matches
+        text_match = Performance.objects.create(
+            employee=mark, review_date=date(2024, 6, 1), rating=5, comments='Paired with Joan on releases'
+        )
+        results = self.search('performance', 'joan').data['results']
+        self.assertEqual([row['id'] for row in results], [named.id, text_match.id])
+        # An explicit ordering wins over relevance, and the fast path answers the same
+        results = self.search('performance', 'joan', ordering='-review_date').data['results']
+        self.assertEqual([row['id'] for row in results], [text_match.id, named.id])
+        self.assertEqual(
+            self.search('performance', 'joan', fast=1).content, self.search('performance', 'joan').content
+        )
+        self.assertEqual(self.search('performance', '!!').data['count'], 4)
+
+    def test_search_indexes_command(self):
+        out = StringIO()
+        call_command('search_indexes', '--check', stdout=out)
+        self.assertIn('All search indexes exist', out.getvalue())
+
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX performance_search_idx')
+        with self.assertRaisesMessage(CommandError, 'performance_search_idx'):
+            call_command('search_indexes', '--check', stdout=StringIO())
+        out = StringIO()
+        call_command('search_indexes', stdout=out)
+        self.assertIn('Creating performance_search_idx', out.getvalue())
+        call_command('search_indexes', '--check', stdout=StringIO())
+
+
+@skipUnless(np, 'NumPy is not installed')
+class ColumnarAggregateTests(TestCase):
+    def setUp(self):
+        forget_snapshot()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            engineering = Department.objects.create(name="Engineering", location="San Francisco")
+            sales = Department.objects.create(name="Sales", location="Boston")
+            self.employees = [
+                Employee.objects.create(
+                    first_name=f"Employee{index}", last_name="Doe", email=f"employee{index}@example.com",
+                    phone_number="555-1234", hire_date=date(2020 + index, 1, 1), position=position,
+                    department=department
+                )
+                for index, (department, position) in enumerate([
+                    (engineering, 'Developer'), (engineering, 'Developer'), (sales, 'Manager'),
+                ])
+            ]
+            for employee, amount in zip(self.employees, ('50000', '70000', '90000')):
+                Salary.objects.create(employee=employee, amount=Decimal(amount),
+                                      effective_date=date(2023, 1, 1), bonus=Decimal('1000'))
+            for day in range(4):
+                for employee, status_value in zip(self.employees, ('present', 'late', 'absent')):
+                    Attendance.objects.create(
+                        employee=employee, date=date(2024, 3, 4) + timedelta(days=day), status=status_value,
+                        clock_in=None if status_value == 'absent' else '09:00',
+                        clock_out=None if status_value == 'absent' else '17:30',
+                    )
+        self.departments = (engineering, sales)
+
+    def aggregate(self, basename, **params):
+        response = self.client.get(reverse(f'{basename}-aggregate'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return response.data
+
+    def test_aggregates_match_the_database(self):
+        engineering, sales = self.departments
+        data = self.aggregate('attendance', group_by='department,status')
+        self.assertEqual(data['rows'], 12)
+        self.assertEqual(
+            [(row['department'], row['status'], row['total_days']) for row in data['results']],
+            [(engineering.id, 'present', 4), (engineering.id, 'late', 4), (sales.id, 'absent', 4)]
+        )
+        data = self.aggregate('attendance', group_by='department', start='2024-03-05', end='2024-03-06')
+        engineering_row = data['results'][0]
+        self.assertEqual(engineering_row['total_days'], 4)
+        self.assertEqual(engineering_row['attendance_rate'], 50.0)
+        self.assertEqual(engineering_row['late_rate'], 50.0)
+        self.assertEqual(engineering_row['average_clock_in_minutes'], 540.0)
+        self.assertEqual(engineering_row['average_hours'], 8.5)
+        self.assertEqual(data['results'][1]['average_hours'], None)
+        data = self.aggregate('attendance', group_by='weekday', position='Manager')
+        self.assertEqual([row['weekday'] for row in data['results']], ['monday', 'tuesday', 'wednesday', 'thursday'])
+        self.assertEqual(
+            self.aggregate('attendance', is_active='false', group_by='month'),
+            {'group_by': ['month'], 'rows': 0, 'results': [],
+             'snapshot_refreshed_at': get_snapshot().refreshed}
+        )
+
+        data = self.aggregate('salary', group_by='department')
+        self.assertEqual(
+            [(row['employee_count'], row['average_salary'], row['median_salary'], row['total_bonus'])
+             for row in data['results']],
+            [(2, 60000.0, 60000.0, 2000.0), (1, 90000.0, 90000.0, 1000.0)]
+        )
+        data = self.aggregate('salary', group_by='salary_band', band_width='25000')
+        self.assertEqual([(row['salary_band'], row['employee_count']) for row in data['results']],
+                         [(50000, 2), (75000, 1)])
+
+        for basename, params in (
+            ('attendance', {'group_by': 'department,salary'}),
+            ('attendance', {'group_by': 'month,month'}),
+            ('attendance', {'status': 'sick'}),
+            ('attendance', {'start': 'soon'}),
+            ('salary', {'group_by': 'status'}),
+            ('salary', {'band_width': '0'}),
+            ('salary', {'is_active': 'maybe'}),
+        ):
+            response = self.client.get(reverse(f'{basename}-aggregate'), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+            self.assertIn('error', response.data)
+
+    def test_snapshot_refreshes_incrementally(self):
+        snapshot = get_snapshot()
+        self.assertIs(get_snapshot(), snapshot)
+        response = self.client.get(reverse('attendance-snapshot'))
+        self.assertEqual(response.data['attendance_rows'], 12)
+        self.assertEqual(response.data['attendance_through'], date(2024, 3, 7))
+        self.assertEqual(response.data['memory_bytes']['attendance.date'], 12 * 4)
+        self.assertEqual(response.data['total_memory_bytes'], sum(response.data['memory_bytes'].values()))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.create(employee=self.employees[2], date=date(2024, 3, 8), status='present')
+            # Rows dated on the latest loaded day are re-read, older ones wait for a full reload
+            Attendance.objects.filter(date=date(2024, 3, 7), employee=self.employees[0]).update(status='late')
+            Attendance.objects.filter(date=date(2024, 3, 4), employee=self.employees[0]).update(status='late')
+            bump_data_versions(Attendance)
+        refreshed = get_snapshot()
+        self.assertIsNot(refreshed, snapshot)
+        self.assertIs(refreshed.employees, snapshot.employees)
+        self.assertEqual(refreshed.full_refreshed, snapshot.full_refreshed)
+        data = self.aggregate('attendance', group_by='status')
+        self.assertEqual([(row['status'], row['total_days']) for row in data['results']],
+                         [('present', 4), ('absent', 4), ('late', 5)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Salary.objects.create(employee=self.employees[0], amount=Decimal('55000'),
+                                  effective_date=date(2024, 1, 1), bonus=Decimal('0'))
+        data = self.aggregate('salary', department=str(self.departments[0].id))
+        self.assertEqual(data['results'][0]['average_salary'], 62500.0)
+
+        forget_snapshot()
+        data = self.aggregate('attendance', group_by='status')
+        self.assertEqual([(row['status'], row['total_days']) for row in data['results']],
+                         [('present', 3), ('absent', 4), ('late', 6)])
+
+    def test_rows_committed_during_a_refresh_are_read_by_the_next_one(self):
+        get_snapshot()
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.create(employee=self.employees[0], date=date(2024, 3, 8), status='present')
+        copy_columns, late = columnar._copy_columns, []
+
+        def racing_copy(*args):
+            # Committed after the refresh read the highest id, before it copied the rows
+            if not late:
+                late.append(Attendance.objects.create(employee=self.employees[1], date=date(2024, 3, 1),
+                                                      status='late'))
+            return copy_columns(*args)
+
+        with patch('core.columnar._copy_columns', racing_copy):
+            self.assertEqual(get_snapshot().rows, 13)
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_data_versions(Attendance)
+        snapshot = get_snapshot()
+        self.assertEqual(snapshot.rows, 14)
+        self.assertEqual(snapshot.max_id, late[0].id)
+
+
+class GenerateDataTests(TransactionTestCase):
+    def test_bulk_mode_is_reproducible(self):
+        options = {
+            'employees': 20, 'departments': 3, 'attendance_days': 10, 'seed': 42,
+            'start_date': '2024-01-01', 'bulk': True, 'workers': 2, 'batch_size': 50, 'clear': True,
+        }
+
+        snapshots = []
+        for _ in range(2):
+            call_command('generate_data', stdout=StringIO(), **options)
+            snapshots.append((
+                list(Employee.objects.order_by('id').values_list('email', 'hire_date', 'position')),
+                list(Attendance.objects.order_by('employee_id', 'date').values_list('date', 'status', 'notes')),
+                list(Salary.objects.order_by('employee_id', 'effective_date').values_list('amount', flat=True)),
+            ))
+
+        self.assertEqual(snapshots[0], snapshots[1])
+        # 2024-01-01 to 2024-01-11 has 9 working days
+        self.assertEqual(Attendance.objects.count(), 20 * 9)
+        self.assertEqual(CurrentSalary.objects.count(), 20)
+        self.assertEqual(AttendanceRollup.objects.aggregate(total=Sum('count'))['total'], 20 * 9)
@@ -1,7 +1,12 @@
 # core/views.py
-from django.db.models import Count, Avg, Sum, F, Q, FloatField, Case, When, Value
-from django.db.models import Min, Max, OuterRef, Subquery
-from django.db.models.functions import Coalesce
+from decimal import Decimal
+from functools import partial
+
+from django.db.models import Count, Avg, Sum, Q, FloatField
+from django.db.models import F, Value, Window, RowRange
+from django.db.models.functions import Coalesce, Concat, Extract, Lag, Trunc
+from django.contrib.postgres.aggregates import RegrSlope
+from django.utils.dateparse import parse_date
 from rest_framework import viewsets, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -9,18 +14,143 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.throttling import UserRateThrottle
 
-from .models import Department, Employee, Attendance, Performance, Salary
+from .models import (
+    Department, Employee, Attendance, Performance, Salary, AttendanceRollup
+)
+from .analytics import (
+    attendance_by_department, build_dashboard, build_salary_analytics, current_salary_stats,
+    department_attendance_summary, department_headcounts, department_performance_summary,
+    department_salary_distribution, department_salary_summary, performance_by_department,
+    run_plan, salary_histograms
+)
+from .cache import ConditionalGetMixin, cached_analytics
+from .columnar import (
+    ATTENDANCE_DIMENSIONS, SALARY_BAND_DEFAULT_WIDTH, SALARY_DIMENSIONS, STATUS_CODES,
+    ColumnarUnavailable, aggregate_attendance, aggregate_salaries, get_snapshot
+)
+from .exports import ExportMixin
+from .fastpath import FastReadMixin
+from .ingest import CSV_CONTENT_TYPES, NDJSON_CONTENT_TYPES, ingest_attendance, request_body_stream
+from .instrumentation import timed_serialization
+from .pagination import EstimatedCountPagination
+from .scorecards import attach_scorecards, with_salary_growth
+from .search import RankedSearchFilter
 from .serializers import (
     DepartmentSerializer, EmployeeSerializer, AttendanceSerializer,
-    PerformanceSerializer, SalarySerializer, DepartmentAnalyticsSerializer,
+    PerformanceSerializer, SalarySerializer,
     EmployeeAttendanceAnalyticsSerializer, PerformanceTrendSerializer,
-    SalaryGrowthSerializer
+    SalaryGrowthSerializer, EmployeeScorecardSerializer, SalaryLeaderboardSerializer
 )
 
 
-class DepartmentViewSet(viewsets.ModelViewSet):
+def date_param(query_params, param):
+    """Return the optional ?<param>= date, or raise ValueError."""
+    value = query_params.get(param)
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError(f"Invalid {param} date '{value}', expected YYYY-MM-DD")
+    return parsed
+
+
+def filter_date_range(queryset, field, query_params):
+    """Restrict ``queryset`` to the optional ?start=&end= dates (inclusive) on ``field``."""
+    for param, lookup in (('start', 'gte'), ('end', 'lte')):
+        parsed = date_param(query_params, param)
+        if parsed is not None:
+            queryset = queryset.filter(**{f'{field}__{lookup}': parsed})
+    return queryset
+
+
+TIMESERIES_INTERVALS = ('day', 'week', 'month')
+
+HISTOGRAM_DEFAULT_WIDTH = '10000'
+
+LEADERBOARD_SORT_FIELDS = ('growth_percentage', 'salary_cagr', 'current_salary', 'total_bonus')
+LEADERBOARD_DEFAULT_TOP = 10
+LEADERBOARD_MAX_TOP = 1000
+
+TREND_DEFAULT_WINDOW = 3
+TREND_MAX_WINDOW = 20
+# Seconds per average year, to express rating slopes per year
+SECONDS_PER_YEAR = 365.25 * 24 * 3600
+
+
+def timeseries_interval(query_params):
+    interval = query_params.get('interval', 'month')
+    if interval not in TIMESERIES_INTERVALS:
+        raise ValueError(f"Invalid interval '{interval}', use day, week or month")
+    return interval
+
+
+def id_param(query_params, name):
+    """Return the optional integer ?<name>= parameter, or raise ValueError."""
+    value = query_params.get(name)
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name} id '{value}'")
+
+
+def department_param(query_params):
+    """Return the required ?department= id, or raise ValueError."""
+    department_id = id_param(query_params, 'department')
+    if department_id is None:
+        raise ValueError("Department ID is required")
+    return department_id
+
+
+def columnar_params(query_params, dimensions):
+    """
+    Parse ?group_by= (comma separated ``dimensions``), ?department=, ?position=,
+    ?is_active= and ?band_width= of the columnar aggregates, or raise ValueError.
+    """
+    group_by = [name for name in query_params.get('group_by', '').split(',') if name]
+    unknown = [name for name in group_by if name not in dimensions]
+    if unknown or len(set(group_by)) != len(group_by):
+        raise ValueError(f"Invalid group_by '{query_params.get('group_by')}', use a comma separated "
+                         f"list of distinct {', '.join(dimensions)}")
+    is_active = query_params.get('is_active')
+    if is_active and is_active.lower() not in ('true', 'false'):
+        raise ValueError(f"Invalid is_active '{is_active}', use true or false")
+    try:
+        band_width = int(query_params.get('band_width', SALARY_BAND_DEFAULT_WIDTH))
+    except ValueError:
+        band_width = 0
+    if band_width <= 0:
+        raise ValueError("band_width must be a positive integer")
+    return group_by, {
+        'department': id_param(query_params, 'department'),
+        'position': query_params.get('position') or None,
+        'is_active': is_active.lower() == 'true' if is_active else None,
+        'band_width': band_width,
+    }
+
+
+def columnar_response(aggregate, *args, **kwargs):
+    """Run ``aggregate`` on the process's columnar snapshot; errors become 400 or 503 responses."""
+    try:
+        snapshot = get_snapshot()
+    except ColumnarUnavailable as exc:
+        return Response({"error": str(exc)}, status=503)
+    try:
+        result = aggregate(snapshot, *args, **kwargs)
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=400)
+    result['snapshot_refreshed_at'] = snapshot.refreshed
+    return Response(result)
+
+
+class DepartmentViewSet(ConditionalGetMixin, FastReadMixin, ExportMixin, viewsets.ModelViewSet):
     queryset = Department.objects.all()
     serializer_class = DepartmentSerializer
+    versioned_models = (Department,)
     permission_classes = [IsAuthenticated]
     throttle_classes = [UserRateThrottle]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -29,30 +159,59 @@ class DepartmentViewSet(viewsets.ModelViewSet):
     ordering_fields = ['name', 'location']
 
     @action(detail=False, methods=['get'])
+    @cached_analytics(Department, Employee, Salary)
     def analytics(self, request):
-        departments = Department.objects.annotate(
-            employee_count=Count('employees', distinct=True),
-            average_salary=Coalesce(
-                Avg('employees__salaries__amount', filter=Q(
-                    employees__salaries__effective_date=F('employees__salaries__employee__salaries__effective_date')
-                )),
-                0,
-                output_field=FloatField()
-            )
-        )
-        serializer = DepartmentAnalyticsSerializer(departments, many=True)
-        return Response(serializer.data)
-
+        """
+        Headcount and current salary distribution per department: average, min/max,
+        p25/median/p75/p90 and a histogram with ?bucket_width= (default 10000) wide
+        buckets. One aggregate query over the current salary projection plus one
+        grouped query for the histograms.
+        """
+        return run_plan(self.plan_analytics, request)
+
+    def plan_analytics(self, request):
+        try:
+            bucket_width = Decimal(request.query_params.get('bucket_width', HISTOGRAM_DEFAULT_WIDTH))
+        except ArithmeticError:
+            bucket_width = None
+        if bucket_width is None or not bucket_width.is_finite() or bucket_width <= 0:
+            raise ValueError("bucket_width must be a positive number")
+
+        queries = [(department_salary_distribution,), (salary_histograms, bucket_width)]
+        return queries, partial(build_salary_analytics, bucket_width)
 
-class EmployeeViewSet(viewsets.ModelViewSet):
-    queryset = Employee.objects.all()
+    @action(detail=False, methods=['get'])
+    @cached_analytics(Department, Employee, Attendance, Performance, Salary)
+    def dashboard(self, request):
+        """
+        Headcount, current salary, attendance (optionally between ?start= and ?end=)
+        and performance metrics for every department in three queries: one per
+        source, each grouped by department.
+        """
+        return run_plan(self.plan_dashboard, request)
+
+    def plan_dashboard(self, request):
+        rollup = filter_date_range(AttendanceRollup.objects.all(), 'date', request.query_params)
+        queries = [
+            (department_headcounts, self.filter_queryset(self.get_queryset())),
+            (attendance_by_department, rollup),
+            (performance_by_department,),
+        ]
+        return queries, build_dashboard
+
+
+class EmployeeViewSet(ConditionalGetMixin, FastReadMixin, ExportMixin, viewsets.ModelViewSet):
+    queryset = Employee.objects.select_related('department')
     serializer_class = EmployeeSerializer
+    versioned_models = (Employee, Department)
     permission_classes = [IsAuthenticated]
     throttle_classes = [UserRateThrottle]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, RankedSearchFilter, filters.OrderingFilter]
     filterset_fields = ['department', 'position', 'is_active']
     search_fields = ['first_name', 'last_name', 'email', 'position']
     ordering_fields = ['first_name', 'last_name', 'hire_date']
+    keyset_fields = ['hire_date']
+    keyset_default = ('-hire_date', '-id')
 
     @action(detail=True, methods=['get'])
     def attendance_analytics(self, request, pk=None):
@@ -71,7 +230,9 @@ class EmployeeViewSet(viewsets.ModelViewSet):
         ).first()
 
         serializer = EmployeeAttendanceAnalyticsSerializer(analytics)
-        return Response(serializer.data)
+        with timed_serialization():
+            data = serializer.data
+        return Response(data)
 
     @action(detail=True, methods=['get'])
     def performance_trend(self, request, pk=None):
@@ -83,78 +244,226 @@ class EmployeeViewSet(viewsets.ModelViewSet):
         ).first()
 
         serializer = PerformanceTrendSerializer(trend)
-        return Response(serializer.data)
+        with timed_serialization():
+            data = serializer.data
+        return Response(data)
 
     @action(detail=True, methods=['get'])
     def salary_growth(self, request, pk=None):
         employee = self.get_object()
+        growth = with_salary_growth(Employee.objects.filter(id=employee.id)).first()
 
-        # Get initial and current salary
-        initial_salary = Salary.objects.filter(employee=employee).order_by('effective_date').first()
-        current_salary = Salary.objects.filter(employee=employee).order_by('-effective_date').first()
-
-        if initial_salary and current_salary:
-            growth = Employee.objects.filter(id=employee.id).annotate(
-                initial_salary=Value(initial_salary.amount),
-                current_salary=Value(current_salary.amount),
-                growth_percentage=(
-                        (Value(current_salary.amount) - Value(initial_salary.amount)) * 100.0 /
-                        Value(initial_salary.amount)
-                ),
-                total_bonus=Coalesce(Sum('salaries__bonus'), 0)
-            ).first()
-
-            serializer = SalaryGrowthSerializer(growth)
-            return Response(serializer.data)
-        else:
+        if growth.initial_salary is None or growth.current_salary is None:
             return Response({"error": "Salary data not available"}, status=404)
 
+        serializer = SalaryGrowthSerializer(growth)
+        with timed_serialization():
+            data = serializer.data
+        return Response(data)
 
-class AttendanceViewSet(viewsets.ModelViewSet):
-    queryset = Attendance.objects.all()
+    @action(detail=False, methods=['get'])
+    @cached_analytics(Employee, Department, Salary, per_department=True)
+    def salary_leaderboard(self, request):
+        """
+        The ?top= (default 10) employees matching the list filters (e.g. ?department=)
+        ranked by ?sort=growth_percentage (default), salary_cagr, current_salary or
+        total_bonus; descending unless the field is prefixed with '+'.
+        """
+        sort = request.query_params.get('sort', 'growth_percentage')
+        field = sort.lstrip('+-')
+        if field not in LEADERBOARD_SORT_FIELDS:
+            return Response(
+                {"error": f"Invalid sort '{sort}', use one of {', '.join(LEADERBOARD_SORT_FIELDS)}"},
+                status=400
+            )
+        try:
+            top = int(request.query_params.get('top', LEADERBOARD_DEFAULT_TOP))
+        except ValueError:
+            return Response({"error": "top must be an integer"}, status=400)
+        top = max(1, min(top, LEADERBOARD_MAX_TOP))
+
+        ordering = F(field).asc(nulls_last=True) if sort.startswith('+') else F(field).desc(nulls_last=True)
+        leaders = with_salary_growth(
+            self.filter_queryset(self.get_queryset())
+        ).filter(initial_salary__isnull=False).order_by(ordering, 'id')[:top]
+
+        serializer = SalaryLeaderboardSerializer(leaders, many=True)
+        with timed_serialization():
+            data = serializer.data
+        return Response(data)
+
+    @action(detail=False, methods=['get'])
+    @cached_analytics(Employee, Department, Attendance, Performance, Salary, per_department=True)
+    def scorecards(self, request):
+        """
+        Attendance, performance and salary growth metrics for every employee matching
+        the list filters (e.g. ?department=) or an ?ids=1,2,3 list, one page at a time.
+        """
+        employees = with_salary_growth(self.filter_queryset(self.get_queryset()))
+        ids = request.query_params.get('ids')
+        if ids:
+            try:
+                employees = employees.filter(id__in=[int(pk) for pk in ids.split(',') if pk.strip()])
+            except ValueError:
+                return Response({"error": "ids must be a comma-separated list of employee ids"}, status=400)
+        if not employees.ordered:
+            employees = employees.order_by('id')
+
+        page = self.paginate_queryset(employees)
+        if page is not None:
+            serializer = EmployeeScorecardSerializer(attach_scorecards(page), many=True)
+            with timed_serialization():
+                data = serializer.data
+            return self.get_paginated_response(data)
+
+        serializer = EmployeeScorecardSerializer(attach_scorecards(list(employees)), many=True)
+        with timed_serialization():
+            data = serializer.data
+        return Response(data)
+
+
+class AttendanceViewSet(ConditionalGetMixin, FastReadMixin, ExportMixin, viewsets.ModelViewSet):
+    queryset = Attendance.objects.select_related('employee')
     serializer_class = AttendanceSerializer
+    versioned_models = (Attendance, Employee)
     permission_classes = [IsAuthenticated]
     throttle_classes = [UserRateThrottle]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, RankedSearchFilter, filters.OrderingFilter]
     filterset_fields = ['employee', 'date', 'status']
-    search_fields = ['employee__first_name', 'employee__last_name', 'notes']
+    search_fields = ['employee__first_name', 'employee__last_name']
+    search_vector_fields = ['notes']
     ordering_fields = ['date', 'status']
+    keyset_fields = ['date']
+    keyset_default = ('-date', '-id')
 
     @action(detail=False, methods=['get'])
+    @cached_analytics(Attendance)
     def status_summary(self, request):
-        summary = Attendance.objects.values('status').annotate(
-            count=Count('id')
+        try:
+            rollup = filter_date_range(AttendanceRollup.objects.all(), 'date', request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+
+        summary = rollup.filter(count__gt=0).values('status').annotate(
+            count=Sum('count')
         ).order_by('status')
 
         return Response(summary)
 
     @action(detail=False, methods=['get'])
+    @cached_analytics(Attendance, Employee, per_department=True)
     def department_attendance(self, request):
-        department_id = request.query_params.get('department')
+        """Attendance counts per status of a ?department=, optionally between ?start= and ?end=."""
+        return run_plan(self.plan_department_attendance, request)
 
-        if not department_id:
-            return Response({"error": "Department ID is required"}, status=400)
+    def plan_department_attendance(self, request):
+        department_id = department_param(request.query_params)
+        rollup = filter_date_range(
+            AttendanceRollup.objects.filter(department_id=department_id), 'date', request.query_params
+        )
+        return [(department_attendance_summary, rollup)], lambda summary: summary
 
-        summary = Attendance.objects.filter(
-            employee__department_id=department_id
-        ).values('status').annotate(
-            count=Count('id')
-        ).order_by('status')
+    @action(detail=False, methods=['get'])
+    @cached_analytics(Attendance, Employee)
+    def timeseries(self, request):
+        """
+        Attendance counts per ?interval=day|week|month bucket between ?start= and ?end=,
+        org-wide, for a ?department= (both read the rollup) or for an ?employee=.
+        """
+        try:
+            interval = timeseries_interval(request.query_params)
+            employee_id = id_param(request.query_params, 'employee')
+            department_id = id_param(request.query_params, 'department')
+            if employee_id is not None:
+                # Range scan on the (employee, date) unique index
+                source = Attendance.objects.filter(employee_id=employee_id)
+                total = Count('id')
+                statuses = {
+                    value: Count('id', filter=Q(status=value)) for value, label in Attendance.STATUS_CHOICES
+                }
+            else:
+                source = AttendanceRollup.objects.all()
+                if department_id is not None:
+                    source = source.filter(department_id=department_id)
+                total = Coalesce(Sum('count'), 0)
+                statuses = {
+                    value: Coalesce(Sum('count', filter=Q(status=value)), 0)
+                    for value, label in Attendance.STATUS_CHOICES
+                }
+            source = filter_date_range(source, 'date', request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+
+        series = source.annotate(period=Trunc('date', interval)).values('period').annotate(
+            **statuses, total=total
+        ).order_by('period')
+
+        return Response(series)
+
+    @action(detail=False, methods=['post'])
+    def bulk_ingest(self, request):
+        content_type = request.content_type.split(';')[0].strip().lower()
+        if content_type not in CSV_CONTENT_TYPES + NDJSON_CONTENT_TYPES:
+            return Response(
+                {"error": "Upload attendance as text/csv or application/x-ndjson"},
+                status=415
+            )
 
-        return Response(summary)
+        # Read the raw body line by line instead of request.data so memory stays flat
+        stream = request_body_stream(request)
+        if stream is None:
+            return Response({"error": "Request body is empty"}, status=400)
+
+        report = ingest_attendance(stream, content_type)
+        return Response(report)
 
+    @action(detail=False, methods=['get'])
+    def aggregate(self, request):
+        """
+        Attendance counts and rates per ?group_by= combination of department,
+        position, employee, hire_year, hire_month, salary_band (?band_width= wide),
+        year, month, weekday and status, for the rows matching ?department=,
+        ?position=, ?is_active=, ?status=, ?start= and ?end=. Computed in memory
+        from the columnar snapshot instead of the database.
+        """
+        try:
+            group_by, params = columnar_params(request.query_params, ATTENDANCE_DIMENSIONS)
+            status = request.query_params.get('status') or None
+            if status is not None and status not in STATUS_CODES:
+                raise ValueError(f"Invalid status '{status}', use {', '.join(STATUS_CODES)}")
+            start = date_param(request.query_params, 'start')
+            end = date_param(request.query_params, 'end')
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+
+        return columnar_response(aggregate_attendance, group_by, status=status, start=start, end=end, **params)
+
+    @action(detail=False, methods=['get'])
+    def snapshot(self, request):
+        """Size, freshness and memory per column of this process's columnar snapshot."""
+        try:
+            snapshot = get_snapshot()
+        except ColumnarUnavailable as exc:
+            return Response({"error": str(exc)}, status=503)
+        return Response(snapshot.describe())
 
-class PerformanceViewSet(viewsets.ModelViewSet):
-    queryset = Performance.objects.all()
+
+class PerformanceViewSet(ConditionalGetMixin, FastReadMixin, ExportMixin, viewsets.ModelViewSet):
+    queryset = Performance.objects.select_related('employee', 'reviewer')
     serializer_class = PerformanceSerializer
+    versioned_models = (Performance, Employee)
     permission_classes = [IsAuthenticated]
     throttle_classes = [UserRateThrottle]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, RankedSearchFilter, filters.OrderingFilter]
     filterset_fields = ['employee', 'review_date', 'rating', 'goals_met']
-    search_fields = ['employee__first_name', 'employee__last_name', 'comments']
+    search_fields = ['employee__first_name', 'employee__last_name']
+    search_vector_fields = ['comments', 'strengths', 'improvement_areas']
     ordering_fields = ['review_date', 'rating']
+    keyset_fields = ['review_date']
+    keyset_default = ('-review_date', '-id')
 
     @action(detail=False, methods=['get'])
+    @cached_analytics(Performance)
     def rating_distribution(self, request):
         distribution = Performance.objects.values('rating').annotate(
             count=Count('id')
@@ -163,82 +472,130 @@ class PerformanceViewSet(viewsets.ModelViewSet):
         return Response(distribution)
 
     @action(detail=False, methods=['get'])
+    @cached_analytics(Performance, Employee, Department, per_department=True)
     def department_performance(self, request):
-        department_id = request.query_params.get('department')
+        """Average rating, goals met percentage and review count of a ?department=."""
+        return run_plan(self.plan_department_performance, request)
 
-        if not department_id:
-            return Response({"error": "Department ID is required"}, status=400)
+    def plan_department_performance(self, request):
+        department_id = department_param(request.query_params)
+        return [(department_performance_summary, department_id)], lambda summary: summary
 
-        performance = Performance.objects.filter(
-            employee__department_id=department_id
-        ).values('employee__department__name').annotate(
+    @action(detail=False, methods=['get'])
+    @cached_analytics(Performance, Employee)
+    def timeseries(self, request):
+        """
+        Review count, average rating and goals met percentage per ?interval=day|week|month
+        bucket between ?start= and ?end=, org-wide, for a ?department= or an ?employee=.
+        """
+        try:
+            interval = timeseries_interval(request.query_params)
+            employee_id = id_param(request.query_params, 'employee')
+            department_id = id_param(request.query_params, 'department')
+            reviews = filter_date_range(Performance.objects.all(), 'review_date', request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+
+        if employee_id is not None:
+            reviews = reviews.filter(employee_id=employee_id)
+        elif department_id is not None:
+            reviews = reviews.filter(employee__department_id=department_id)
+
+        series = reviews.annotate(period=Trunc('review_date', interval)).values('period').annotate(
+            review_count=Count('id'),
             average_rating=Avg('rating'),
-            goals_met_percentage=Count(
-                Case(When(goals_met=True, then=1))
-            ) * 100.0 / Count('id'),
-            review_count=Count('id')
-        )
-
-        return Response(performance)
+            goals_met_percentage=Count('id', filter=Q(goals_met=True)) * 100.0 / Count('id')
+        ).order_by('period')
 
+        return Response(series)
 
-class SalaryViewSet(viewsets.ModelViewSet):
-    queryset = Salary.objects.all()
+    @action(detail=False, methods=['get'])
+    @cached_analytics(Performance, Employee, per_department=True)
+    def rating_trends(self, request):
+        """
+        Every review of a ?department= (or one ?employee=) with the average of the
+        last ?window= reviews (default 3), the change since the previous review and
+        the employee's rating trend in points per year, computed in one query with
+        window functions. Optional ?start=/?end= limit the reviews considered.
+        """
+        try:
+            employee_id = id_param(request.query_params, 'employee')
+            department_id = id_param(request.query_params, 'department')
+            window = int(request.query_params.get('window', TREND_DEFAULT_WINDOW))
+            reviews = filter_date_range(Performance.objects.all(), 'review_date', request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+
+        if employee_id is not None:
+            reviews = reviews.filter(employee_id=employee_id)
+        elif department_id is not None:
+            reviews = reviews.filter(employee__department_id=department_id)
+        else:
+            return Response({"error": "Department ID or employee ID is required"}, status=400)
+        window = max(1, min(window, TREND_MAX_WINDOW))
+
+        history = {'partition_by': [F('employee_id')], 'order_by': [F('review_date').asc(), F('id').asc()]}
+        trends = reviews.annotate(
+            employee_name=Concat('employee__first_name', Value(' '), 'employee__last_name'),
+            rolling_average=Window(Avg('rating'), frame=RowRange(start=-(window - 1), end=0), **history),
+            rating_delta=F('rating') - Window(Lag('rating'), **history),
+            trend_slope=Window(
+                RegrSlope('rating', Extract('review_date', 'epoch') / Value(SECONDS_PER_YEAR)),
+                partition_by=[F('employee_id')]
+            ),
+        ).values(
+            'id', 'employee', 'employee_name', 'review_date', 'rating', 'goals_met',
+            'rolling_average', 'rating_delta', 'trend_slope'
+        ).order_by('employee_id', 'review_date', 'id')
+
+        # Page numbers rather than keyset pagination: a keyset predicate would drop
+        # the earlier reviews the windows of the page need
+        paginator = EstimatedCountPagination()
+        page = paginator.paginate_queryset(trends, request, view=self)
+        return paginator.get_paginated_response(page)
+
+
+class SalaryViewSet(ConditionalGetMixin, FastReadMixin, ExportMixin, viewsets.ModelViewSet):
+    queryset = Salary.objects.select_related('employee')
     serializer_class = SalarySerializer
+    versioned_models = (Salary, Employee)
     permission_classes = [IsAuthenticated]
     throttle_classes = [UserRateThrottle]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, RankedSearchFilter, filters.OrderingFilter]
     filterset_fields = ['employee', 'effective_date', 'salary_type']
-    search_fields = ['employee__first_name', 'employee__last_name', 'notes']
+    search_fields = ['employee__first_name', 'employee__last_name']
+    search_vector_fields = ['notes']
     ordering_fields = ['effective_date', 'amount']
+    keyset_fields = ['effective_date']
+    keyset_default = ('-effective_date', '-id')
 
     @action(detail=False, methods=['get'])
+    @cached_analytics(Salary)
     def salary_stats(self, request):
-        stats = {
-            'average_salary': Salary.objects.filter(
-                id__in=Subquery(
-                    Salary.objects.filter(employee=OuterRef('employee'))
-                    .order_by('-effective_date')
-                    .values('id')[:1]
-                )
-            ).aggregate(avg=Avg('amount'))['avg'],
-            'min_salary': Salary.objects.filter(
-                id__in=Subquery(
-                    Salary.objects.filter(employee=OuterRef('employee'))
-                    .order_by('-effective_date')
-                    .values('id')[:1]
-                )
-            ).aggregate(min=Min('amount'))['min'],
-            'max_salary': Salary.objects.filter(
-                id__in=Subquery(
-                    Salary.objects.filter(employee=OuterRef('employee'))
-                    .order_by('-effective_date')
-                    .values('id')[:1]
-                )
-            ).aggregate(max=Max('amount'))['max'],
-            'total_bonus_paid': Salary.objects.aggregate(total=Sum('bonus'))['total']
-        }
-
-        return Response(stats)
+        # A single aggregate over the projection, so there is nothing for an async view to overlap
+        return Response(current_salary_stats())
 
     @action(detail=False, methods=['get'])
+    @cached_analytics(Salary, Employee, Department, per_department=True)
     def department_salaries(self, request):
-        department_id = request.query_params.get('department')
+        """Average current salary, headcount and total bonus of a ?department=."""
+        return run_plan(self.plan_department_salaries, request)
 
-        if not department_id:
-            return Response({"error": "Department ID is required"}, status=400)
+    def plan_department_salaries(self, request):
+        department_id = department_param(request.query_params)
+        return [(department_salary_summary, department_id)], lambda summary: summary
 
-        dept_salaries = Salary.objects.filter(
-            employee__department_id=department_id,
-            id__in=Subquery(
-                Salary.objects.filter(employee=OuterRef('employee'))
-                .order_by('-effective_date')
-                .values('id')[:1]
-            )
-        ).values('employee__department__name').annotate(
-            average_salary=Avg('amount'),
-            total_employees=Count('employee', distinct=True),
-            total_bonus=Sum('bonus')
-        )
-
-        return Response(dept_salaries)
\ No newline at end of file
+    @action(detail=False, methods=['get'])
+    def aggregate(self, request):
+        """
+        Headcount and current salary average, min, max, median and total bonus per
+        ?group_by= combination of department, position, hire_year, hire_month and
+        salary_band (?band_width= wide), for the employees matching ?department=,
+        ?position= and ?is_active=. Computed in memory from the columnar snapshot.
+        """
+        try:
+            group_by, params = columnar_params(request.query_params, SALARY_DIMENSIONS)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+
+        return columnar_response(aggregate_salaries, group_by, **params)
@@ -0,0 +1,8 @@
+# employee_analytics/asgi.py
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'employee_analytics.settings')
+
+application = get_asgi_application()
@@ -5,6 +5,8 @@ from django.db.utils import OperationalError
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 
+from core.db_router import replica_available, replica_configured
+
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
@@ -17,9 +19,14 @@ def health_check(request):
     except OperationalError:
         db_status = "unhealthy"
 
-    # Return health status
-    return JsonResponse({
+    health = {
         'status': 'healthy',
         'database': db_status,
         'api_version': 'v1'
-    })
\ No newline at end of file
+    }
+    # An unavailable replica only sends reads to the primary
+    if replica_configured():
+        health['replica'] = "healthy" if replica_available(fresh=True) else "unavailable"
+
+    # Return health status
+    return JsonResponse(health)
\ No newline at end of file
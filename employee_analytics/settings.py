@@ -25,6 +25,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     # Third-party apps
     'rest_framework',
@@ -36,6 +37,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.instrumentation.QueryInstrumentationMiddleware',
+    'core.db_router.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -43,6 +46,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'employee_analytics.urls'
@@ -64,6 +68,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'employee_analytics.wsgi.application'
+ASGI_APPLICATION = 'employee_analytics.asgi.application'
 
 # Database
 DATABASES = {
@@ -74,9 +79,94 @@ DATABASES = {
         'PASSWORD': os.environ.get('DB_PASSWORD', 'password'),
         'HOST': os.environ.get('DB_HOST', 'localhost'),
         'PORT': os.environ.get('DB_PORT', '5432'),
+        # Seconds to keep connections open between requests; also keeps the connections
+        # of the async views' query threads, which otherwise reconnect per query
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Read replica: set DB_REPLICA_HOST and/or DB_REPLICA_NAME (plus DB_REPLICA_PORT,
+# DB_REPLICA_USER and DB_REPLICA_PASSWORD where they differ from the primary) to
+# serve read-only API requests from a replica; see core/db_router.py
+REPLICA_DATABASE_ALIAS = 'replica'
+if os.environ.get('DB_REPLICA_HOST') or os.environ.get('DB_REPLICA_NAME'):
+    DATABASES[REPLICA_DATABASE_ALIAS] = {
+        **DATABASES['default'],
+        'NAME': os.environ.get('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'USER': os.environ.get('DB_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.environ.get('DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'HOST': os.environ.get('DB_REPLICA_HOST', DATABASES['default']['HOST']),
+        'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        # Tests read the replica's data from the test database
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+# Seconds a client's reads stay on the primary after it wrote, so it sees its writes
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+# Seconds a process reads from the primary after failing to connect to the replica
+REPLICA_RETRY_SECONDS = int(os.environ.get('REPLICA_RETRY_SECONDS', 30))
+# Seconds a successful replica connection check is reused before checking again
+REPLICA_CHECK_SECONDS = int(os.environ.get('REPLICA_CHECK_SECONDS', 10))
+
+# Seconds after which the columnar analytics snapshot (core.columnar) is reloaded in
+# full, picking up edits of older attendance rows that incremental refreshes skip
+COLUMNAR_FULL_REFRESH_SECONDS = int(os.environ.get('COLUMNAR_FULL_REFRESH_SECONDS', 3600))
+
+# Caches
+# Analytics responses are cached under per-model data versions, so entries never
+# need explicit invalidation; the backend only has to bound its size. LocMem and
+# the database/file backends cull at MAX_ENTRIES, Redis/Memcached evict by memory.
+ANALYTICS_CACHE_ALIAS = 'analytics'
+ANALYTICS_CACHE_BACKEND = os.environ.get(
+    'ANALYTICS_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+)
+ANALYTICS_CACHE = {
+    'BACKEND': ANALYTICS_CACHE_BACKEND,
+    'LOCATION': os.environ.get('ANALYTICS_CACHE_LOCATION', 'analytics'),
+    'TIMEOUT': int(os.environ.get('ANALYTICS_CACHE_TIMEOUT', 3600)),
+}
+if 'redis' not in ANALYTICS_CACHE_BACKEND and 'memcached' not in ANALYTICS_CACHE_BACKEND:
+    ANALYTICS_CACHE['OPTIONS'] = {'MAX_ENTRIES': int(os.environ.get('ANALYTICS_CACHE_MAX_ENTRIES', 1000))}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    ANALYTICS_CACHE_ALIAS: ANALYTICS_CACHE,
+}
+
+# Attendance partitioning (see `manage.py attendance_partitions`)
+ATTENDANCE_PARTITION_MONTHS_AHEAD = int(os.environ.get('ATTENDANCE_PARTITION_MONTHS_AHEAD', 3))
+ATTENDANCE_RETENTION_MONTHS = int(os.environ.get('ATTENDANCE_RETENTION_MONTHS', 36))
+ATTENDANCE_ARCHIVE_SCHEMA = os.environ.get('ATTENDANCE_ARCHIVE_SCHEMA', 'archive')
+
+# Request instrumentation: fraction (0-1) of requests whose SQL is counted and
+# timed into a Server-Timing header, and thresholds for logging them as slow
+REQUEST_INSTRUMENTATION_SAMPLE_RATE = float(os.environ.get('REQUEST_INSTRUMENTATION_SAMPLE_RATE', 0))
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 500))
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 100))
+# Prometheus request metrics served at /metrics; set PROMETHEUS_MULTIPROC_DIR to
+# aggregate them across gunicorn workers. Off by default: every request then pays
+# for timing its queries and, in multiprocess mode, for writing the samples
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'False') == 'True'
+
+# Staff requests with an X-Profile: 1 header or ?profile=1 run under cProfile and
+# their profiles are stored here (see `manage.py profiles`)
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'True') == 'True'
+PROFILE_DIR = os.environ.get('PROFILE_DIR', BASE_DIR / 'profiles')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core': {'handlers': ['console'], 'level': os.environ.get('CORE_LOG_LEVEL', 'INFO')},
+    },
+}
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -91,7 +181,7 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.AdaptivePagination',
     'PAGE_SIZE': 10,
     'DEFAULT_THROTTLE_CLASSES': [
         'rest_framework.throttling.AnonRateThrottle',
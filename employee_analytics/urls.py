@@ -6,6 +6,8 @@ from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 
+from core.async_views import async_urlpatterns
+from core.metrics import metrics_view
 from core.views import (
     DepartmentViewSet, EmployeeViewSet, AttendanceViewSet,
     PerformanceViewSet, SalaryViewSet
@@ -35,6 +37,8 @@ schema_view = get_schema_view(
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include(router.urls)),
+    # Async analytics actions running their independent queries concurrently
+    path('api/async/', include(async_urlpatterns(router))),
     path('api-auth/', include('rest_framework.urls')),
 
     # Swagger UI
@@ -43,4 +47,7 @@ urlpatterns = [
 
     # Health check endpoint
     path('health/', include('core.health_urls')),
+
+    # Prometheus metrics
+    path('metrics', metrics_view, name='metrics'),
 ]
\ No newline at end of file
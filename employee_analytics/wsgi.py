@@ -0,0 +1,8 @@
+# employee_analytics/wsgi.py
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'employee_analytics.settings')
+
+application = get_wsgi_application()